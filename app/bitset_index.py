@@ -0,0 +1,88 @@
+# bitset_index.py
+import numpy as np
+from scipy import sparse
+from portfolio_store import FIELDS
+
+_M1 = np.uint64(0x5555555555555555)
+_M2 = np.uint64(0x3333333333333333)
+_M4 = np.uint64(0x0F0F0F0F0F0F0F0F)
+_H01 = np.uint64(0x0101010101010101)
+
+
+def popcount(words):
+    """Set bits of every uint64 in words (SWAR bit counting, elementwise)"""
+    x = words - ((words >> np.uint64(1)) & _M1)
+    x = (x & _M2) + ((x >> np.uint64(2)) & _M2)
+    x = (x + (x >> np.uint64(4))) & _M4
+    return ((x * _H01) >> np.uint64(56)).astype(np.int32)
+
+
+class BitsetIndex:
+    """
+    Skill-set index over the rows of a PortfolioStore.
+
+    Every row's techstack is encoded once as a packed bitset of interned
+    skill IDs (see SkillVocabulary). The bitsets are stored word-major, so
+    scoring a query reads only the words where the query has a skill; an
+    AND over those finds the rows sharing a skill, and only their words are
+    popcounted. Scores are the Jaccard similarity of the skill sets.
+    """
+
+    def __init__(self, store, vocabulary, bits):
+        self.store = store
+        self.vocabulary = vocabulary
+        # (words x rows): word w of every row is one contiguous array
+        self.bits = bits
+        self.sizes = popcount(bits).sum(axis=0, dtype=np.int32)
+        self.reused = 0
+
+    def __len__(self):
+        return len(self.store)
+
+    @classmethod
+    def build(cls, store, vocabulary, previous=None):
+        """
+        Encode the rows of store, reusing the bitsets of rows with unchanged
+        content from previous; each distinct techstack is encoded once
+        """
+        if previous is not None and previous.vocabulary is vocabulary:
+            reused_at, reused_from, fresh_at = store.match(previous.store)
+        else:
+            reused_at = reused_from = np.zeros(0, dtype=np.int64)
+            fresh_at = np.arange(len(store))
+
+        bits = np.zeros((vocabulary.words, len(store)), dtype=np.uint64)
+        if len(reused_at):
+            bits[:, reused_at] = previous.bits[:, reused_from]
+        if len(fresh_at):
+            techstacks = store.codes[fresh_at, FIELDS.index("techstack")]
+            _, first, inverse = np.unique(techstacks, return_index=True, return_inverse=True)
+            texts = [store.value(i, "techstack") for i in fresh_at[first].tolist()]
+            bits[:, fresh_at] = vocabulary.bitsets(texts).T[:, inverse]
+
+        index = cls(store, vocabulary, bits)
+        index.reused = len(reused_at)
+        return index
+
+    def transform(self, texts):
+        """Packed skill bitsets of texts (len(texts) x words)"""
+        return self.vocabulary.bitsets(texts)
+
+    def score(self, query):
+        """
+        Jaccard similarity of one packed query bitset against every row, as
+        a sparse 1 x portfolio row holding the rows sharing a skill with it
+        """
+        active = np.flatnonzero(query)
+        if not len(active) or not len(self):
+            return sparse.csr_matrix((1, len(self)), dtype=np.float32)
+        # Rows sharing a skill: OR of (word & query word) != 0 over the active words
+        shares = np.zeros(len(self), dtype=bool)
+        for w in active.tolist():
+            shares |= (self.bits[w] & query[w]) != 0
+        candidates = np.flatnonzero(shares)
+        # Only the candidates' words are popcounted
+        shared = popcount(self.bits[np.ix_(active, candidates)] & query[active, None]).sum(axis=0)
+        union = self.sizes[candidates] + popcount(query).sum() - shared
+        scores = (shared / union).astype(np.float32)
+        return sparse.csr_matrix((scores, candidates, [0, len(candidates)]), shape=(1, len(self)))
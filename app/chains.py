@@ -1,19 +1,32 @@
+import json
 import os
-from langchain_groq import ChatGroq
-from langchain_core.prompts import PromptTemplate
-from langchain_core.output_parsers import JsonOutputParser
-from langchain_core.exceptions import OutputParserException
-from dotenv import load_dotenv
+import re
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 
-load_dotenv()
+from chunking import estimate_tokens, merge_jobs, split_text
 
-class Chain:
-    def __init__(self):
-        self.llm = ChatGroq(temperature=0, groq_api_key=os.getenv("GROQ_API_KEY"), model_name="llama-3.1-70b-versatile")
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+except ImportError:
+    pass
 
-    def extract_jobs(self, cleaned_text):
-        prompt_extract = PromptTemplate.from_template(
-            """
+try:
+    from langchain_core.exceptions import OutputParserException
+    from langchain_core.output_parsers import JsonOutputParser
+except ImportError:
+    # Offline use with a StubLLM does not need langchain
+    JsonOutputParser = None
+
+    class OutputParserException(ValueError):
+        pass
+
+DEFAULT_MODEL = "llama-3.1-70b-versatile"
+
+PROMPT_EXTRACT = """
             ### SCRAPED TEXT FROM WEBSITE:
             {page_data}
             ### INSTRUCTION:
@@ -22,19 +35,8 @@ class Chain:
             Only return the valid JSON.
             ### VALID JSON (NO PREAMBLE):
             """
-        )
-        chain_extract = prompt_extract | self.llm
-        res = chain_extract.invoke(input={"page_data": cleaned_text})
-        try:
-            json_parser = JsonOutputParser()
-            res = json_parser.parse(res.content)
-        except OutputParserException:
-            raise OutputParserException("Context too big. Unable to parse jobs.")
-        return res if isinstance(res, list) else [res]
 
-    def write_mail(self, job, links):
-        prompt_email = PromptTemplate.from_template(
-            """
+PROMPT_EMAIL = """
             ### JOB DESCRIPTION:
             {job_description}
 
@@ -51,10 +53,130 @@ class Chain:
             ### EMAIL (NO PREAMBLE):
 
             """
-        )
-        chain_email = prompt_email | self.llm
-        res = chain_email.invoke({"job_description": str(job), "link_list": links})
-        return res.content
+
+
+def _parse_json(text):
+    """JSON out of an LLM reply, allowing a ``` fence around it"""
+    if JsonOutputParser is not None:
+        return JsonOutputParser().parse(text)
+    fenced = re.search(r"```(?:json)?\s*(.*?)```", text, re.DOTALL)
+    try:
+        return json.loads(fenced.group(1) if fenced else text.strip())
+    except ValueError as e:
+        raise OutputParserException(f"Invalid json output: {text}") from e
+
+
+class Chain:
+    def __init__(self, llm=None, cache=None, model_name=DEFAULT_MODEL, temperature=0, chunk_tokens=None,
+                 overlap_tokens=None, max_workers=8):
+        """
+        llm is anything with invoke(prompt) returning a message with a
+        .content string; ChatGroq (GROQ_API_KEY from the environment) is
+        created when none is given, and llm_stub.StubLLM works offline.
+
+        cache is an optional llm_cache.LlmCache. Responses are looked up by
+        model, temperature and the rendered prompt before calling the model,
+        for deterministic (temperature 0) calls only.
+
+        With chunk_tokens set, extract_jobs handles page text longer than
+        that (estimated tokens, prompt excluded) with extract_jobs_chunked,
+        overlapping chunks by overlap_tokens (chunk_tokens // 8 by default)
+        and running up to max_workers of them at once.
+        """
+        if llm is None:
+            from langchain_groq import ChatGroq
+            llm = ChatGroq(temperature=temperature, groq_api_key=os.getenv("GROQ_API_KEY"), model_name=model_name)
+        self.llm = llm
+        self.model_name = getattr(llm, "model_name", model_name)
+        self.temperature = getattr(llm, "temperature", temperature)
+        self.cache = cache
+        self.chunk_tokens = chunk_tokens
+        self.overlap_tokens = overlap_tokens
+        self.max_workers = max_workers
+        # Model calls actually made ('calls') and the seconds spent waiting
+        # on them ('llm_seconds')
+        self.stats = Counter()
+        self._stats_lock = threading.Lock()
+
+    def _invoke(self, prompt, parse=None):
+        """
+        The model's reply to prompt, from the cache when possible, or
+        parse(reply) when parse is given. A fresh reply is parsed once,
+        before it is cached, so a reply that fails to parse is raised and
+        never stored.
+        """
+        key = None
+        if self.cache is not None and self.temperature == 0:
+            key = self.cache.key(self.model_name, self.temperature, prompt)
+            content = self.cache.get(key)
+            if content is not None:
+                return parse(content) if parse is not None else content
+        started = time.perf_counter()
+        content = self.llm.invoke(prompt).content
+        elapsed = time.perf_counter() - started
+        with self._stats_lock:
+            self.stats['calls'] += 1
+            self.stats['llm_seconds'] += elapsed
+        value = parse(content) if parse is not None else content
+        if key is not None:
+            self.cache.put(key, content, elapsed)
+        return value
+
+    def extract_jobs(self, cleaned_text):
+        if self.chunk_tokens and estimate_tokens(cleaned_text) > self.chunk_tokens:
+            return self.extract_jobs_chunked(cleaned_text)
+        return self._extract(cleaned_text)
+
+    def _extract(self, cleaned_text):
+        def parse(content):
+            try:
+                return _parse_json(content)
+            except OutputParserException:
+                raise OutputParserException("Context too big. Unable to parse jobs.")
+
+        res = self._invoke(PROMPT_EXTRACT.format(page_data=cleaned_text), parse=parse)
+        return res if isinstance(res, list) else [res]
+
+    def extract_jobs_chunked(self, cleaned_text, chunk_tokens=None, overlap_tokens=None, max_workers=None):
+        """
+        Map-reduce extraction for pages too big for one prompt: the text is
+        split on structural boundaries into overlapping chunks of at most
+        chunk_tokens (see chunking.split_text), jobs are extracted from all
+        chunks concurrently, and the lists are merged with duplicates
+        removed (chunking.merge_jobs). The wall time is about that of the
+        slowest chunk when max_workers covers them all. A chunk the model
+        still cannot handle is split in half again, twice at most.
+        """
+        chunk_tokens = chunk_tokens or self.chunk_tokens or 2000
+        if overlap_tokens is None:
+            overlap_tokens = self.overlap_tokens if self.overlap_tokens is not None else chunk_tokens // 8
+        chunks = split_text(cleaned_text, chunk_tokens, overlap_tokens)
+        with self._stats_lock:
+            self.stats['chunks'] += len(chunks)
+        workers = max(1, min(max_workers or self.max_workers, len(chunks)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            job_lists = list(executor.map(lambda chunk: self._extract_chunk(chunk, chunk_tokens, overlap_tokens),
+                                          chunks))
+        return merge_jobs(job_lists)
+
+    def _extract_chunk(self, text, chunk_tokens, overlap_tokens, depth=0):
+        try:
+            return self._extract(text)
+        except OutputParserException:
+            if depth >= 2 or chunk_tokens < 64:
+                raise
+        half, overlap = chunk_tokens // 2, overlap_tokens // 2
+        return merge_jobs([self._extract_chunk(part, half, overlap, depth + 1)
+                           for part in split_text(text, half, overlap)])
+
+    def write_mail(self, job, links):
+        return self._invoke(PROMPT_EMAIL.format(job_description=str(job), link_list=links))
+
+    def cache_stats(self):
+        """Cache counters (hit rate, latency saved) plus the model calls made and chunks extracted"""
+        stats = self.cache.report() if self.cache is not None else {}
+        return dict(stats, llm_calls=self.stats['calls'], llm_seconds=self.stats['llm_seconds'],
+                    chunks=self.stats['chunks'])
 
 if __name__ == "__main__":
-    print(os.getenv("GROQ_API_KEY"))
\ No newline at end of file
+    print(os.getenv("GROQ_API_KEY"))
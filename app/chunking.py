@@ -0,0 +1,124 @@
+# chunking.py
+import re
+
+# Structural boundaries from coarse to fine: paragraphs, lines, sentences,
+# words. Pages cleaned by utils.clean_text are a single line, so for them
+# sentence ends are the coarsest boundary left; stripping tags there can
+# also glue a sentence to the next one ("years.Skills"), which still counts.
+_SPLITTERS = (
+    re.compile(r'\n\s*\n'),
+    re.compile(r'\n'),
+    re.compile(r'(?<=[.!?;])\s+|(?<=[a-z0-9][.!?;])(?=[A-Z])'),
+    re.compile(r'\s+'),
+)
+_WORD_RE = re.compile(r'[a-z0-9]+')
+
+
+def estimate_tokens(text):
+    """Rough token count: about four characters per token for English text"""
+    return len(text) // 4 + 1
+
+
+def _pieces(text, max_tokens, level=0):
+    """text cut at the coarsest boundaries that give pieces within max_tokens"""
+    if estimate_tokens(text) <= max_tokens:
+        return [text]
+    if level == len(_SPLITTERS):
+        # A single word over budget: hard cut
+        size = max_tokens * 4
+        return [text[i:i + size] for i in range(0, len(text), size)]
+    pieces = []
+    for part in _SPLITTERS[level].split(text):
+        if part.strip():
+            pieces.extend(_pieces(part.strip(), max_tokens, level + 1))
+    return pieces
+
+
+def split_text(text, max_tokens, overlap_tokens=0):
+    """
+    Split text into chunks of at most max_tokens (estimated), cutting at
+    paragraph, line, sentence and word boundaries in that order of
+    preference, and packing consecutive pieces into each chunk. Each chunk
+    after the first starts with up to overlap_tokens of the end of the
+    previous one, so an item no longer than the overlap that straddles a
+    cut appears whole in at least one chunk.
+    """
+    overlap_tokens = min(overlap_tokens, max_tokens // 2)
+    chunks = []
+    current, tokens = [], 0
+    for piece in _pieces(text, max_tokens):
+        size = estimate_tokens(piece)
+        if current and tokens + size > max_tokens:
+            chunks.append(' '.join(current))
+            # Carry the tail of this chunk over, piece by piece
+            carried, carried_tokens = [], 0
+            for previous in reversed(current):
+                previous_tokens = estimate_tokens(previous)
+                if carried_tokens + previous_tokens > overlap_tokens or \
+                        carried_tokens + previous_tokens + size > max_tokens:
+                    break
+                carried.insert(0, previous)
+                carried_tokens += previous_tokens
+            current, tokens = carried, carried_tokens
+        current.append(piece)
+        tokens += size
+    if current:
+        chunks.append(' '.join(current))
+    return chunks
+
+
+def _words(value):
+    return frozenset(_WORD_RE.findall(str(value or '').lower()))
+
+
+def _details(job):
+    return _words(job.get('experience')), _words(job.get('skills'))
+
+
+def merge_jobs(job_lists, threshold=0.8):
+    """
+    Merge the job lists extracted from overlapping chunks of one page, in
+    order, dropping duplicates: jobs with the same role (ignoring case and
+    punctuation) whose descriptions share at least threshold of the words
+    of the shorter one. That covers a posting seen whole in two chunks as
+    well as one cut short at a chunk edge. A job without a description is
+    only a duplicate of one with the same role, experience and skills. Of
+    two duplicates the fuller one is kept, with any fields only the other
+    has filled in.
+    """
+    merged = []
+    by_role = {}
+    for jobs in job_lists:
+        for job in jobs:
+            if not isinstance(job, dict):
+                continue
+            role = ' '.join(sorted(_words(job.get('role'))))
+            words = _words(job.get('description'))
+            details = _details(job)
+            for kept in by_role.get(role, ()):
+                kept_words = kept[1]
+                smaller = min(len(words), len(kept_words))
+                if smaller:
+                    duplicate = len(words & kept_words) / smaller >= threshold
+                else:
+                    # No description to compare: only matching details make a duplicate
+                    duplicate = details == kept[2]
+                if duplicate:
+                    existing = kept[0]
+                    if len(str(job.get('description') or '')) > len(str(existing.get('description') or '')):
+                        fuller = dict(job)
+                        fuller.update((key, value) for key, value in existing.items()
+                                      if value and not fuller.get(key))
+                        existing.clear()
+                        existing.update(fuller)
+                        kept[1] = words
+                    else:
+                        existing.update((key, value) for key, value in job.items()
+                                        if value and not existing.get(key))
+                    kept[2] = _details(existing)
+                    break
+            else:
+                job = dict(job)
+                merged.append(job)
+                by_role.setdefault(role, []).append([job, words, details])
+    return merged
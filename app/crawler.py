@@ -0,0 +1,203 @@
+# crawler.py
+import re
+import time
+from collections import deque
+from urllib.parse import parse_qsl, urlencode, urljoin, urlparse, urlunparse
+from urllib.robotparser import RobotFileParser
+
+from bs4 import BeautifulSoup
+from scraper import HostLimiter, SimpleScraper
+
+# Paths that look like a single posting: /jobs/123, /careers/data-engineer ...
+JOB_PATH_RE = re.compile(
+    r'/(?:jobs?|careers?|positions?|openings?|vacanc(?:y|ies)|opportunit(?:y|ies)|postings?)/[^/?#]+',
+    re.IGNORECASE
+)
+JOB_QUERY_KEYS = ('gh_jid', 'jobid', 'job_id', 'jid', 'posting_id', 'requisitionid')
+PAGE_QUERY_RE = re.compile(r'(?:^|&)(?:page|p|pg|offset|start)=\d+', re.IGNORECASE)
+PAGE_PATH_RE = re.compile(r'/page/\d+/?$', re.IGNORECASE)
+NEXT_LINK_TEXT = ('next', 'next page', 'more jobs', 'load more', 'older', '›', '»', '>')
+TRACKING_PARAMS = {'gclid', 'fbclid', 'ref', 'source'}
+
+
+def normalize_url(url):
+    """Canonical form used for de-duplication: no fragment, no tracking params"""
+    parts = urlparse(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+             if not k.lower().startswith('utm_') and k.lower() not in TRACKING_PARAMS]
+    path = parts.path.rstrip('/') or '/'
+    return urlunparse((parts.scheme.lower(), parts.netloc.lower(), path, '', urlencode(sorted(query)), ''))
+
+
+class CareersCrawler:
+    """
+    Discover and scrape every posting reachable from a careers index page.
+
+    Index pages (the start page and its pagination) are fetched one at a time
+    and mined for job-detail links, which go into a de-duplicated frontier
+    and are scraped with SimpleScraper.scrape_many. robots.txt is honored per
+    host, including Crawl-delay, and every request made by the crawl goes
+    through one HostLimiter so per-host concurrency and politeness delays
+    hold across index and detail fetches alike. max_pages bounds the total
+    number of pages fetched.
+    """
+
+    def __init__(self, scraper=None, max_pages=100, max_workers=4, per_host=2,
+                 delay=1.0, respect_robots=True, timeout=10):
+        self.scraper = scraper or SimpleScraper()
+        self.max_pages = max_pages
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.respect_robots = respect_robots
+        self.limiter = HostLimiter(per_host, delay)
+        self._robots = {}
+        self.stats = {}
+
+    def _reset_stats(self):
+        self.stats = {
+            'index_pages': 0,
+            'job_pages': 0,
+            'links_seen': 0,
+            'duplicates': 0,
+            'robots_blocked': 0,
+            'elapsed': 0.0
+        }
+
+    def report(self):
+        """Crawl counters plus pages per second and de-duplication rate"""
+        pages = self.stats.get('index_pages', 0) + self.stats.get('job_pages', 0)
+        elapsed = self.stats.get('elapsed', 0.0)
+        links = self.stats.get('links_seen', 0)
+        return dict(
+            self.stats,
+            pages=pages,
+            pages_per_second=pages / elapsed if elapsed else 0.0,
+            dedup_rate=self.stats.get('duplicates', 0) / links if links else 0.0
+        )
+
+    def _allowed(self, url):
+        if not self.respect_robots:
+            return True
+        parts = urlparse(url)
+        host = parts.netloc.lower()
+        if host not in self._robots:
+            robots = RobotFileParser()
+            text = self._fetch_robots(f"{parts.scheme}://{parts.netloc}/robots.txt", host)
+            if text is None:
+                robots.allow_all = True
+            else:
+                robots.parse(text.splitlines())
+            crawl_delay = robots.crawl_delay(self.scraper.headers['User-Agent'])
+            if crawl_delay:
+                self.limiter.set_delay(host, max(float(crawl_delay), self.limiter.delay))
+            self._robots[host] = robots
+        return self._robots[host].can_fetch(self.scraper.headers['User-Agent'], url)
+
+    def _fetch_robots(self, url, host):
+        """robots.txt text, or None when it is missing or cannot be fetched"""
+        started = time.monotonic()
+        slot = self.limiter.acquire(host, timeout=self.timeout)
+        if slot is None:
+            return None
+        try:
+            remaining = self.timeout - (time.monotonic() - started) if self.timeout is not None else None
+            response, body = self.scraper.fetch_html(url, timeout=remaining, stop_early=False, content_types=None)
+            return body.decode(response.encoding or 'utf-8', 'replace') if body is not None else None
+        except Exception:
+            return None
+        finally:
+            slot.release()
+
+    def _fetch_index(self, url):
+        host = urlparse(url).netloc.lower()
+        slot = self.limiter.acquire(host, timeout=self.timeout)
+        if slot is None:
+            return None
+        try:
+            # Listing pages may embed JobPosting lists, so read them in full
+            _, body = self.scraper.fetch_html(url, timeout=self.timeout, stop_early=False)
+            return body
+        except Exception:
+            return None
+        finally:
+            slot.release()
+
+    @staticmethod
+    def _is_job_link(url, index_url):
+        parts = urlparse(url)
+        if normalize_url(url) == normalize_url(index_url):
+            return False
+        if any(key.lower() in JOB_QUERY_KEYS for key, _ in parse_qsl(parts.query)):
+            return True
+        return bool(JOB_PATH_RE.search(parts.path)) and not PAGE_PATH_RE.search(parts.path)
+
+    @staticmethod
+    def _is_next_link(anchor, url, index_url):
+        if 'next' in (anchor.get('rel') or []):
+            return True
+        if anchor.get_text(" ", strip=True).lower() in NEXT_LINK_TEXT:
+            return True
+        parts, index = urlparse(url), urlparse(index_url)
+        same_listing = parts.path.rstrip('/') == index.path.rstrip('/') or PAGE_PATH_RE.search(parts.path)
+        return bool(same_listing and (PAGE_QUERY_RE.search(parts.query) or PAGE_PATH_RE.search(parts.path)))
+
+    def _discover(self, html, index_url, seen):
+        """Split the links on an index page into new job URLs and new index URLs"""
+        soup = BeautifulSoup(html, self.scraper.parser)
+        jobs, pages = [], []
+        start_host = urlparse(index_url).netloc.lower()
+        for anchor in soup.find_all('a', href=True):
+            url = urljoin(index_url, anchor['href'])
+            if not url.startswith(('http://', 'https://')):
+                continue
+            self.stats['links_seen'] += 1
+            key = normalize_url(url)
+            if key in seen:
+                self.stats['duplicates'] += 1
+                continue
+            if self._is_next_link(anchor, url, index_url) and urlparse(url).netloc.lower() == start_host:
+                seen.add(key)
+                pages.append(url)
+            elif self._is_job_link(url, index_url):
+                seen.add(key)
+                jobs.append(url)
+        return jobs, pages
+
+    def crawl(self, start_url):
+        """Yield a scrape_job_info record for every job discovered from start_url"""
+        self._reset_stats()
+        started = time.monotonic()
+        seen = {normalize_url(start_url)}
+        index_frontier = deque([start_url])
+        budget = self.max_pages
+
+        try:
+            while index_frontier and budget > 0:
+                index_url = index_frontier.popleft()
+                if not self._allowed(index_url):
+                    self.stats['robots_blocked'] += 1
+                    continue
+                html = self._fetch_index(index_url)
+                budget -= 1
+                self.stats['index_pages'] += 1
+                if html is None:
+                    continue
+
+                jobs, pages = self._discover(html, index_url, seen)
+                index_frontier.extend(pages)
+
+                allowed = []
+                for url in jobs:
+                    if self._allowed(url):
+                        allowed.append(url)
+                    else:
+                        self.stats['robots_blocked'] += 1
+                allowed = allowed[:budget]
+                budget -= len(allowed)
+
+                for result in self.scraper.scrape_many(allowed, max_workers=self.max_workers,
+                                                       deadline=self.timeout * 3, limiter=self.limiter):
+                    self.stats['job_pages'] += 1
+                    yield result
+        finally:
+            self.stats['elapsed'] = time.monotonic() - started
@@ -0,0 +1,488 @@
+# delivery.py
+"""
+Send generated emails over SMTP.
+
+    python app/delivery.py emails.jsonl --sender "Alex Doe <alex@example.com>" --host smtp.example.com --starttls
+
+Reads pipeline.py / email_writers JSONL output; every record needs a "to"
+address (give jobs a "to" field in the pipeline input). The SMTP password, if
+any, comes from the SMTP_PASSWORD environment variable. Delivery status is
+kept in a SQLite file, so running the command again only sends what has not
+been sent yet.
+"""
+import argparse
+import hashlib
+import json
+import os
+import queue
+import quopri
+import random
+import smtplib
+import socket
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter
+from email.utils import formatdate, parseaddr
+
+from email_generator import split_subject
+from email_writers import _header_value
+
+STATUSES = ('sent', 'retrying', 'deferred', 'failed')
+
+
+def is_transient(error):
+    """
+    True for failures worth retrying later: 4yz replies (RFC 5321) and lost
+    or refused connections. 5yz replies are permanent, and so is any other
+    smtplib error (such as SMTPNotSupportedError), although every
+    SMTPException is also an OSError.
+    """
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    if isinstance(error, smtplib.SMTPException):
+        return False
+    # Socket errors: refused or reset connections, timeouts, DNS failures
+    return isinstance(error, OSError)
+
+
+def message_key(recipient, email_text):
+    """Stable id of a message: the same email to the same address is sent once"""
+    return hashlib.sha256(f"{recipient}\0{email_text}".encode('utf-8')).hexdigest()[:32]
+
+
+def build_message(email_text, sender, recipient, key):
+    """
+    RFC 5322 bytes for a generated email: its "Subject:" line becomes the
+    Subject header and the rest the body, quoted-printable unless ASCII.
+    """
+    subject, body = split_subject(email_text)
+    domain = parseaddr(sender)[1].rpartition('@')[2] or 'localhost'
+    headers = [
+        f"From: {_header_value(sender)}",
+        f"To: {_header_value(recipient)}",
+        f"Subject: {_header_value(subject)}",
+        f"Date: {formatdate(localtime=True)}",
+        f"Message-ID: <{key}@{domain}>",
+        'MIME-Version: 1.0',
+    ]
+    body = body.replace('\r\n', '\n')
+    if body.isascii():
+        headers += ['Content-Type: text/plain; charset="us-ascii"', 'Content-Transfer-Encoding: 7bit']
+        payload = body.encode('ascii')
+    else:
+        headers += ['Content-Type: text/plain; charset="utf-8"', 'Content-Transfer-Encoding: quoted-printable']
+        payload = quopri.encodestring(body.encode('utf-8'))
+    return ('\r\n'.join(headers) + '\r\n\r\n').encode('ascii') + payload.replace(b'\n', b'\r\n')
+
+
+class TokenBucket:
+    """
+    rate tokens per second, with up to burst of them saved up while idle.
+    reserve() takes the next token, possibly one that only exists in the
+    future, and returns how long to wait for it, so callers sleep outside
+    the lock and are served in arrival order.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._stamp = time.monotonic()
+
+    def reserve(self):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+            self._stamp = now
+            self._tokens -= 1
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+
+class RateLimiter:
+    """A global message rate and a per-recipient-domain rate, either optional"""
+
+    def __init__(self, rate=None, per_domain=None, burst=1):
+        self.per_domain = per_domain
+        self.burst = burst
+        self._global = TokenBucket(rate, burst) if rate else None
+        self._lock = threading.Lock()
+        self._domains = {}
+
+    def wait(self, domain):
+        """Block until a message to domain may go out; returns the seconds waited"""
+        wait = self._global.reserve() if self._global else 0.0
+        if self.per_domain:
+            with self._lock:
+                bucket = self._domains.get(domain)
+                if bucket is None:
+                    bucket = self._domains[domain] = TokenBucket(self.per_domain, self.burst)
+            wait = max(wait, bucket.reserve())
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class _Connection:
+    __slots__ = ('smtp', 'sent', 'last_used')
+
+    def __init__(self, smtp):
+        self.smtp = smtp
+        self.sent = 0
+        self.last_used = time.monotonic()
+
+
+class SmtpPool:
+    """
+    Up to size persistent, authenticated SMTP connections shared by sending
+    threads.
+
+    Connecting, EHLO, STARTTLS and AUTH happen once per connection rather
+    than once per message. A connection goes back to the pool after each
+    message and is replaced after max_per_connection messages, when it
+    broke, or when a NOOP shows an idle one was dropped by the server.
+    smtplib has no PIPELINING (RFC 2920) support, so each connection still
+    waits for every reply; throughput comes from reuse and from the number
+    of connections sending at once.
+    """
+
+    def __init__(self, host='localhost', port=25, size=4, starttls=False, use_ssl=False, username=None,
+                 password=None, timeout=30, max_per_connection=100, idle_check=30, local_hostname=None):
+        self.host = host
+        self.port = port
+        self.size = size
+        self.starttls = starttls
+        self.use_ssl = use_ssl
+        self.username = username
+        self.password = password
+        self.timeout = timeout
+        self.max_per_connection = max_per_connection
+        self.idle_check = idle_check
+        # smtplib looks up the FQDN for every connection otherwise
+        self.local_hostname = local_hostname or socket.getfqdn()
+        self.stats = Counter()
+        self._lock = threading.Lock()
+        # Signalled whenever a connection is returned or a slot frees up,
+        # so a waiting thread can take the one or open a connection in the other
+        self._changed = threading.Condition(self._lock)
+        self._idle = []
+        self._open = 0
+
+    def _connect(self):
+        cls = smtplib.SMTP_SSL if self.use_ssl else smtplib.SMTP
+        smtp = cls(self.host, self.port, timeout=self.timeout, local_hostname=self.local_hostname)
+        try:
+            smtp.ehlo()
+            if self.starttls:
+                smtp.starttls()
+                smtp.ehlo()
+            if self.username:
+                smtp.login(self.username, self.password or '')
+        except Exception:
+            smtp.close()
+            raise
+        return _Connection(smtp)
+
+    def acquire(self):
+        """An open connection, waiting for one to come back when all size are in use"""
+        while True:
+            with self._changed:
+                while not self._idle and self._open >= self.size:
+                    self._changed.wait()
+                connection = self._idle.pop() if self._idle else None
+                if connection is None:
+                    self._open += 1
+            if connection is None:
+                try:
+                    connection = self._connect()
+                except Exception:
+                    with self._changed:
+                        self._open -= 1
+                        self._changed.notify()
+                    raise
+                with self._lock:
+                    self.stats['connections_opened'] += 1
+                return connection
+            if time.monotonic() - connection.last_used > self.idle_check:
+                try:
+                    alive = connection.smtp.noop()[0] == 250
+                except (smtplib.SMTPException, OSError):
+                    alive = False
+                if not alive:
+                    self.release(connection, discard=True)
+                    continue
+            with self._lock:
+                self.stats['connections_reused'] += 1
+            return connection
+
+    def release(self, connection, discard=False):
+        """Return a connection; discard closes it (after an error, or once it has sent enough)"""
+        connection.last_used = time.monotonic()
+        if discard or connection.sent >= self.max_per_connection:
+            self._quit(connection)
+            with self._changed:
+                self._open -= 1
+                self.stats['connections_closed'] += 1
+                self._changed.notify()
+        else:
+            with self._changed:
+                self._idle.append(connection)
+                self._changed.notify()
+
+    @staticmethod
+    def _quit(connection):
+        try:
+            connection.smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            connection.smtp.close()
+
+    def close(self):
+        """Close every idle connection"""
+        with self._changed:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            self._quit(connection)
+        with self._changed:
+            self._open -= len(idle)
+            self._changed.notify_all()
+
+
+class DeliveryLog:
+    """
+    Durable delivery status of every message, in a SQLite file: its key,
+    recipient, subject, status (one of STATUSES), attempts and last error.
+    Messages already sent are skipped by the next
+    run. The database is in WAL mode and shared by all sending threads.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute('''CREATE TABLE IF NOT EXISTS deliveries (
+            key TEXT PRIMARY KEY,
+            recipient TEXT NOT NULL,
+            subject TEXT,
+            status TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            error TEXT,
+            updated REAL NOT NULL
+        )''')
+
+    def status(self, key):
+        with self._lock:
+            row = self._db.execute('SELECT status FROM deliveries WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def record(self, key, recipient, subject, status, attempts, error=None):
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO deliveries (key, recipient, subject, status, attempts, error, updated)'
+                ' VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (key, recipient, subject, status, attempts, error, time.time())
+            )
+
+    def counts(self):
+        """Messages per status"""
+        with self._lock:
+            return Counter(dict(self._db.execute('SELECT status, COUNT(*) FROM deliveries GROUP BY status')))
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class Mailer:
+    """
+    Delivers generated emails through an SmtpPool.
+
+    Each message is rate limited (global and per recipient domain, see
+    RateLimiter), sent on a pooled connection and recorded in the optional
+    DeliveryLog. Transient failures (see is_transient) are retried up to
+    retries times with exponential backoff plus random jitter, after which
+    the message is left 'deferred' for a later run; permanent ones are
+    'failed' at once.
+    """
+
+    def __init__(self, pool, sender, log=None, limiter=None, retries=3, backoff_factor=1.0, max_backoff=60,
+                 jitter=0.5):
+        self.pool = pool
+        self.sender = sender
+        self.envelope_sender = parseaddr(sender)[1] or sender
+        self.log = log
+        self.limiter = limiter
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.stats = Counter()
+        self._stats_lock = threading.Lock()
+
+    def _count(self, key, amount=1):
+        with self._stats_lock:
+            self.stats[key] += amount
+
+    def _backoff(self, attempt):
+        backoff = min(self.max_backoff, self.backoff_factor * 2 ** (attempt - 1))
+        return backoff + random.uniform(0, backoff * self.jitter)
+
+    def send(self, recipient, email_text, key=None):
+        """Send one generated email to recipient; returns its final status"""
+        key = key or message_key(recipient, email_text)
+        if self.log and self.log.status(key) == 'sent':
+            self._count('skipped')
+            return 'sent'
+        subject = split_subject(email_text)[0]
+        message = build_message(email_text, self.sender, recipient, key)
+        address = parseaddr(recipient)[1] or recipient
+        domain = address.rpartition('@')[2].lower()
+        attempt = 0
+        while True:
+            attempt += 1
+            if self.limiter:
+                waited = self.limiter.wait(domain)
+                if waited:
+                    self._count('rate_limited_seconds', waited)
+            try:
+                connection = self.pool.acquire()
+            except Exception as e:
+                error = e
+            else:
+                try:
+                    connection.smtp.sendmail(self.envelope_sender, [address], message)
+                except (smtplib.SMTPException, OSError) as e:
+                    # After a reply error smtplib has already sent RSET and
+                    # the connection is fine; anything else may have broken it
+                    broken = not isinstance(e, (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused))
+                    self.pool.release(connection, discard=broken)
+                    error = e
+                else:
+                    connection.sent += 1
+                    self.pool.release(connection)
+                    self._count('sent')
+                    if self.log:
+                        self.log.record(key, recipient, subject, 'sent', attempt)
+                    return 'sent'
+            transient = is_transient(error)
+            if not transient or attempt > self.retries:
+                status = 'deferred' if transient else 'failed'
+                self._count(status)
+                if self.log:
+                    self.log.record(key, recipient, subject, status, attempt, error=repr(error))
+                return status
+            self._count('retries')
+            if self.log:
+                self.log.record(key, recipient, subject, 'retrying', attempt, error=repr(error))
+            time.sleep(self._backoff(attempt))
+
+    def deliver(self, messages, workers=None):
+        """
+        Send (recipient, email_text) pairs, or dicts with "to" and "email"
+        (and optionally an "id"), from workers threads (the pool size by
+        default) and return report(). messages is read lazily.
+        """
+        workers = workers or self.pool.size
+        pending = queue.Queue(workers * 4)
+        started = time.perf_counter()
+
+        def work():
+            while True:
+                item = pending.get()
+                if item is None:
+                    return
+                if isinstance(item, dict):
+                    recipient, email_text, key = item.get('to'), item.get('email'), item.get('id')
+                else:
+                    (recipient, email_text), key = item, None
+                if not recipient or email_text is None:
+                    self._count('invalid')
+                    continue
+                try:
+                    self.send(recipient, email_text, key)
+                except Exception:
+                    self._count('errors')
+
+        threads = [threading.Thread(target=work, daemon=True) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        try:
+            for item in messages:
+                pending.put(item)
+        finally:
+            for _ in threads:
+                pending.put(None)
+            for thread in threads:
+                thread.join()
+            self._count('elapsed', time.perf_counter() - started)
+        return self.report()
+
+    def report(self):
+        """Counters, the pool's connection counters and messages sent per second"""
+        elapsed = self.stats.get('elapsed', 0.0)
+        return dict(
+            self.stats,
+            **self.pool.stats,
+            messages_per_second=self.stats.get('sent', 0) / elapsed if elapsed else 0.0
+        )
+
+
+def read_messages(path):
+    """{"to", "email", "id"} dicts from email_writers JSONL records"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            email_text = record.get('email')
+            if email_text is None and record.get('body') is not None:
+                email_text = f"Subject: {record.get('subject') or ''}\n\n{record['body']}"
+            yield {'to': record.get('to'), 'email': email_text, 'id': record.get('id')}
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument('input', help='JSONL of generated emails with a "to" field')
+    ap.add_argument('--sender', required=True, help='From address, e.g. "Alex Doe <alex@example.com>"')
+    ap.add_argument('--host', default='localhost')
+    ap.add_argument('--port', type=int, default=None, help='default 465 with --ssl, else 587 with --starttls, else 25')
+    ap.add_argument('--starttls', action='store_true')
+    ap.add_argument('--ssl', action='store_true')
+    ap.add_argument('--username', help='SMTP login (password from SMTP_PASSWORD)')
+    ap.add_argument('--pool', type=int, default=4, help='SMTP connections sending at once')
+    ap.add_argument('--rate', type=float, help='messages per second overall')
+    ap.add_argument('--per-domain-rate', type=float, help='messages per second to any one recipient domain')
+    ap.add_argument('--retries', type=int, default=3)
+    ap.add_argument('--status', default='deliveries.sqlite', help='delivery status database')
+    args = ap.parse_args()
+
+    port = args.port or (465 if args.ssl else 587 if args.starttls else 25)
+    pool = SmtpPool(args.host, port, size=args.pool, starttls=args.starttls, use_ssl=args.ssl,
+                    username=args.username, password=os.environ.get('SMTP_PASSWORD'))
+    log = DeliveryLog(args.status)
+    limiter = RateLimiter(args.rate, args.per_domain_rate) if args.rate or args.per_domain_rate else None
+    mailer = Mailer(pool, args.sender, log=log, limiter=limiter, retries=args.retries)
+    try:
+        report = mailer.deliver(read_messages(args.input))
+    finally:
+        pool.close()
+    counts = log.counts()
+    log.close()
+    print(f"{report.get('sent', 0)} sent, {report.get('skipped', 0)} already sent, "
+          f"{report.get('deferred', 0)} deferred, {report.get('failed', 0)} failed, "
+          f"{report.get('invalid', 0)} without a recipient; {report['messages_per_second']:.1f} messages/s",
+          file=sys.stderr)
+    print(f"status database {args.status}: " + ', '.join(f"{status} {counts.get(status, 0)}" for status in STATUSES),
+          file=sys.stderr)
+    sys.exit(1 if report.get('failed') or report.get('deferred') or report.get('errors') else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+# experience.py
+import re
+from bisect import bisect_left
+from collections import namedtuple
+
+ExperienceRange = namedtuple('ExperienceRange', ['min_years', 'max_years', 'text'])
+ExperienceRange.__doc__ = """
+Years of experience asked for by a posting. max_years is None for open
+ended requirements ("5+ years"); text is the display form ("3-5 Years").
+"""
+
+_NUMBER_WORDS = {
+    'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6, 'seven': 7,
+    'eight': 8, 'nine': 9, 'ten': 10, 'eleven': 11, 'twelve': 12, 'fifteen': 15, 'twenty': 20
+}
+_NUMBER = r'(?:\d{1,2}|' + '|'.join(_NUMBER_WORDS) + r')'
+
+# Every quantifier is bounded, so each match attempt inspects a constant
+# number of characters and a full scan stays linear in the text length
+_YEARS_RE = re.compile(
+    r'(?<![\w.])(' + _NUMBER + r')(?:\s{0,3}(\+|plus|or more))?'
+    r'(?:\s{0,3}(?:-|–|—|to)\s{0,3}(' + _NUMBER + r'))?'
+    r'\s{0,3}\+?\s{0,3}(?:\(\d{1,2}\)\s{0,3})?(?:years?|yrs?)\b',
+    re.IGNORECASE
+)
+_ANCHOR_RE = re.compile(r'experience|minimum|at least', re.IGNORECASE)
+# "Experience: 3+" style requirements that never mention years
+_BARE_RE = re.compile(r'experiences?\W{0,5}(?:of\W{0,3})?(\d{1,2})(\+?)(?![\d.%])', re.IGNORECASE)
+
+
+def _to_int(token):
+    token = token.lower()
+    return _NUMBER_WORDS[token] if token in _NUMBER_WORDS else int(token)
+
+
+def _format(min_years, max_years, open_ended):
+    if max_years is not None and max_years != min_years:
+        return f"{min_years}-{max_years} Years"
+    if open_ended:
+        return f"{min_years}+ Years"
+    return f"{min_years} Year" + ("" if min_years == 1 else "s")
+
+
+class ExperienceExtractor:
+    """
+    Bounded-cost extraction of experience requirements.
+
+    One linear scan collects every "N years" style phrase and one more
+    collects the anchor words ("experience", "minimum", "at least"). The
+    phrase closest to an anchor, within window characters, is taken as the
+    requirement, falling back to the first phrase on the page. The nearest
+    anchor is found by bisection instead of re-scanning the text, so the
+    total cost stays linear however many anchors the page has.
+    """
+
+    def __init__(self, window=80):
+        self.window = window
+
+    def extract(self, text):
+        """Return an ExperienceRange for text, or None if nothing is found"""
+        if not text:
+            return None
+
+        anchors = [m.start() for m in _ANCHOR_RE.finditer(text)]
+        first = best = None
+        best_distance = self.window + 1
+        for match in _YEARS_RE.finditer(text):
+            if first is None:
+                first = match
+            distance = self._anchor_distance(anchors, match.start(), match.end())
+            if distance < best_distance:
+                best, best_distance = match, distance
+
+        match = best or first
+        if match is not None:
+            return self._to_range(match)
+
+        bare = _BARE_RE.search(text)
+        if bare:
+            years = int(bare.group(1))
+            return ExperienceRange(years, None if bare.group(2) else years,
+                                   _format(years, None, bool(bare.group(2))))
+        return None
+
+    def _anchor_distance(self, anchors, start, end):
+        # Distance from the span to the closest anchor on either side
+        i = bisect_left(anchors, start)
+        distance = self.window + 1
+        if i < len(anchors):
+            distance = max(anchors[i] - end, 0)
+        if i > 0:
+            distance = min(distance, start - anchors[i - 1])
+        return distance
+
+    @staticmethod
+    def _to_range(match):
+        low = _to_int(match.group(1))
+        high = _to_int(match.group(3)) if match.group(3) else None
+        open_ended = bool(match.group(2)) or '+' in match.group(0)
+        if high is not None and high < low:
+            low, high = high, low
+        if high is None and not open_ended:
+            high = low
+        return ExperienceRange(low, high, _format(low, high, open_ended))
@@ -0,0 +1,96 @@
+# extraction.py
+from bs4.element import CData, NavigableString, Tag
+
+
+def _class_contains(classes, *needles):
+    # Mirrors CSS [class*="x"], which matches against the space-joined value
+    joined = " ".join(classes)
+    return all(needle in joined for needle in needles)
+
+
+# (selector, predicate) pairs in the priority order used by SimpleScraper.
+# Predicates receive the tag name and its class list, and replicate the CSS
+# selector next to them so a single walk can bucket every candidate.
+ROLE_SELECTORS = [
+    ('h1[class*="job"][class*="title"]',
+     lambda name, classes, tag: name == 'h1' and _class_contains(classes, 'job', 'title')),
+    ('h1[class*="position"][class*="title"]',
+     lambda name, classes, tag: name == 'h1' and _class_contains(classes, 'position', 'title')),
+    ('.job-title', lambda name, classes, tag: 'job-title' in classes),
+    ('.position-title', lambda name, classes, tag: 'position-title' in classes),
+    ('[data-cy="job-title"]', lambda name, classes, tag: tag.get('data-cy') == 'job-title'),
+    ('h1', lambda name, classes, tag: name == 'h1'),
+    ('title', lambda name, classes, tag: name == 'title'),
+]
+
+SKILL_SECTION_SELECTORS = [
+    ('.skills', lambda name, classes, tag: 'skills' in classes),
+    ('.requirements', lambda name, classes, tag: 'requirements' in classes),
+    ('.qualifications', lambda name, classes, tag: 'qualifications' in classes),
+    ('.responsibilities', lambda name, classes, tag: 'responsibilities' in classes),
+    ('[class*="skill"]', lambda name, classes, tag: _class_contains(classes, 'skill')),
+    ('[class*="requirement"]', lambda name, classes, tag: _class_contains(classes, 'requirement')),
+    ('[class*="qualification"]', lambda name, classes, tag: _class_contains(classes, 'qualification')),
+]
+
+DESCRIPTION_SELECTORS = [
+    ('.job-description', lambda name, classes, tag: 'job-description' in classes),
+    ('.position-description', lambda name, classes, tag: 'position-description' in classes),
+    ('.description', lambda name, classes, tag: 'description' in classes),
+    ('[class*="description"]', lambda name, classes, tag: _class_contains(classes, 'description')),
+    ('.role-details', lambda name, classes, tag: 'role-details' in classes),
+    ('.job-details', lambda name, classes, tag: 'job-details' in classes),
+    ('section', lambda name, classes, tag: name == 'section'),
+    ('div[class*="content"]', lambda name, classes, tag: name == 'div' and _class_contains(classes, 'content')),
+]
+
+
+class PageIndex:
+    """
+    Single-pass index over a parsed job page.
+
+    One walk over the tree collects the page text together with the
+    candidate nodes for every role, skills-section and description selector,
+    so the extractors never have to re-scan the document.
+    """
+
+    def __init__(self, soup):
+        self.soup = soup
+        self.title = None
+        self.role_candidates = [[] for _ in ROLE_SELECTORS]
+        self.description_candidates = [[] for _ in DESCRIPTION_SELECTORS]
+        self.skill_sections = []
+        self.paragraphs = []
+
+        text_types = getattr(soup, 'interesting_string_types', (NavigableString, CData))
+        strings = []
+        for node in soup.descendants:
+            if isinstance(node, Tag):
+                self._index_tag(node)
+            elif type(node) in text_types:
+                strings.append(node)
+
+        self.text = "".join(strings)
+
+    def _index_tag(self, tag):
+        name = tag.name
+        classes = tag.get('class') or []
+        if isinstance(classes, str):
+            classes = classes.split()
+
+        if name == 'title' and self.title is None:
+            self.title = tag
+        if name == 'p':
+            self.paragraphs.append(tag)
+
+        for i, (_, matches) in enumerate(ROLE_SELECTORS):
+            if matches(name, classes, tag):
+                self.role_candidates[i].append(tag)
+        for i, (_, matches) in enumerate(DESCRIPTION_SELECTORS):
+            if matches(name, classes, tag):
+                self.description_candidates[i].append(tag)
+        if classes:
+            for _, matches in SKILL_SECTION_SELECTORS:
+                if matches(name, classes, tag):
+                    self.skill_sections.append(tag)
+                    break
@@ -0,0 +1,139 @@
+# http_cache.py
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+
+class HttpCache:
+    """
+    Persistent, size-bounded cache of scraped pages keyed by URL.
+
+    Each entry keeps the response validators (ETag / Last-Modified) together
+    with the job record extracted from the page, so a 304 Not Modified answer
+    can be served without downloading or re-parsing anything. Entries younger
+    than ttl seconds are served without contacting the server at all, and the
+    least recently used entries are evicted once the cache grows past
+    max_bytes on disk.
+
+    Since the records are derived data, every entry is tagged with the
+    version of the extractor that produced it, and an entry written by
+    another version is a miss.
+    """
+
+    def __init__(self, directory, ttl=3600, max_bytes=50 * 1024 * 1024):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+        # key -> [size, last access]; file mtimes double as access times so
+        # the LRU order survives restarts
+        self._index = {}
+        for name in os.listdir(directory):
+            if name.endswith('.json'):
+                stat = os.stat(os.path.join(directory, name))
+                self._index[name[:-5]] = [stat.st_size, stat.st_mtime]
+        self._total = sum(size for size, _ in self._index.values())
+
+    @staticmethod
+    def _key(url):
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.json')
+
+    def get(self, url, version=None):
+        """Return the cached entry for url if version wrote it, or None"""
+        key = self._key(url)
+        with self._lock:
+            if key not in self._index:
+                return None
+            try:
+                with open(self._path(key), 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                self._forget(key)
+                return None
+            if entry.get('version') != version:
+                self._forget(key)
+                return None
+            now = time.time()
+            self._index[key][1] = now
+            try:
+                os.utime(self._path(key), (now, now))
+            except OSError:
+                pass
+        return entry
+
+    def is_fresh(self, entry):
+        """True if the entry can be served without revalidation"""
+        return time.time() - entry.get('stored_at', 0) < self.ttl
+
+    @staticmethod
+    def conditional_headers(entry):
+        """Request headers that let the server answer 304 Not Modified"""
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def put(self, url, response_headers, result, version=None):
+        """Store the validators from response_headers with the result version extracted"""
+        entry = {
+            'url': url,
+            'version': version,
+            'etag': response_headers.get('ETag'),
+            'last_modified': response_headers.get('Last-Modified'),
+            'stored_at': time.time(),
+            'result': result
+        }
+        self._write(self._key(url), entry)
+
+    def revalidated(self, url, entry, response_headers):
+        """Restart the TTL of an entry after the server answered 304"""
+        entry = dict(entry)
+        entry['etag'] = response_headers.get('ETag') or entry.get('etag')
+        entry['last_modified'] = response_headers.get('Last-Modified') or entry.get('last_modified')
+        entry['stored_at'] = time.time()
+        self._write(self._key(url), entry)
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._index):
+                self._forget(key)
+
+    def _write(self, key, entry):
+        data = json.dumps(entry).encode('utf-8')
+        with self._lock:
+            # Write to a temp file first so readers never see a partial entry
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(key))
+
+            self._total -= self._index.get(key, [0])[0]
+            self._index[key] = [len(data), time.time()]
+            self._total += len(data)
+            self._evict()
+
+    def _evict(self):
+        if self._total <= self.max_bytes:
+            return
+        for key, _ in sorted(self._index.items(), key=lambda item: item[1][1]):
+            if self._total <= self.max_bytes:
+                break
+            self._forget(key)
+
+    def _forget(self, key):
+        size, _ = self._index.pop(key, (0, 0))
+        self._total -= size
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
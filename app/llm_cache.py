@@ -0,0 +1,119 @@
+# llm_cache.py
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+
+class LlmCache:
+    """
+    Persistent cache of LLM responses in a SQLite file.
+
+    Entries are keyed by a hash of the model name, temperature and fully
+    rendered prompt (see key()), which is only safe for deterministic calls,
+    i.e. temperature 0. Each entry remembers how long the call that produced
+    it took, so hits can report the latency they saved. Entries older than
+    ttl seconds are treated as missing, and the least recently used entries
+    are evicted once the stored responses exceed max_bytes.
+    """
+
+    def __init__(self, path, ttl=7 * 24 * 3600, max_bytes=50 * 1024 * 1024):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        # hits, misses, expired, stores, evictions and latency_saved seconds
+        self.stats = Counter()
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute('''CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY,
+            response TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            latency REAL NOT NULL,
+            created REAL NOT NULL,
+            used REAL NOT NULL
+        )''')
+        self._db.execute('CREATE INDEX IF NOT EXISTS responses_used ON responses (used)')
+        self._total = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+    @staticmethod
+    def key(model, temperature, prompt):
+        return hashlib.sha256(json.dumps([model, temperature, prompt]).encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """The cached response for key, or None if missing or expired"""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute('SELECT response, latency, created FROM responses WHERE key = ?',
+                                   (key,)).fetchone()
+            if row is None:
+                self.stats['misses'] += 1
+                return None
+            response, latency, created = row
+            if self.ttl is not None and now - created > self.ttl:
+                self._delete(key)
+                self.stats['expired'] += 1
+                self.stats['misses'] += 1
+                return None
+            self._db.execute('UPDATE responses SET used = ? WHERE key = ?', (now, key))
+            self.stats['hits'] += 1
+            self.stats['latency_saved'] += latency
+        return response
+
+    def put(self, key, response, latency):
+        """Store response, produced by a call that took latency seconds"""
+        size = len(response.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            self._delete(key)
+            self._db.execute('INSERT INTO responses (key, response, size, latency, created, used)'
+                             ' VALUES (?, ?, ?, ?, ?, ?)', (key, response, size, latency, now, now))
+            self._total += size
+            self.stats['stores'] += 1
+            self._evict()
+
+    def _delete(self, key):
+        row = self._db.execute('SELECT size FROM responses WHERE key = ?', (key,)).fetchone()
+        if row:
+            self._db.execute('DELETE FROM responses WHERE key = ?', (key,))
+            self._total -= row[0]
+
+    def _evict(self):
+        """Drop least recently used entries until the total fits in max_bytes"""
+        if self._total <= self.max_bytes:
+            return
+        excess = self._total - self.max_bytes
+        victims = []
+        for key, size in self._db.execute('SELECT key, size FROM responses ORDER BY used'):
+            victims.append((key,))
+            excess -= size
+            self._total -= size
+            if excess <= 0:
+                break
+        self._db.executemany('DELETE FROM responses WHERE key = ?', victims)
+        self.stats['evictions'] += len(victims)
+
+    def report(self):
+        """Counters plus the hit rate and the number and size of stored entries"""
+        with self._lock:
+            entries = self._db.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+            lookups = self.stats['hits'] + self.stats['misses']
+            counters = dict.fromkeys(('hits', 'misses', 'expired', 'stores', 'evictions', 'latency_saved'), 0)
+            counters.update(self.stats)
+            return dict(counters, entries=entries, bytes=self._total,
+                        hit_rate=self.stats['hits'] / lookups if lookups else 0.0)
+
+    def clear(self):
+        with self._lock:
+            self._db.execute('DELETE FROM responses')
+            self._total = 0
+
+    def close(self):
+        with self._lock:
+            self._db.close()
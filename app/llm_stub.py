@@ -0,0 +1,70 @@
+# llm_stub.py
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import namedtuple
+
+# What Chain reads from an LLM reply, as on langchain's AIMessage
+StubMessage = namedtuple('StubMessage', ['content'])
+
+_PAGE_RE = re.compile(r'### SCRAPED TEXT FROM WEBSITE:\s*(.*?)\s*### INSTRUCTION:', re.DOTALL)
+_JOB_DESCRIPTION_RE = re.compile(r'### JOB DESCRIPTION:\s*(.*?)\s*### INSTRUCTION:', re.DOTALL)
+# Postings in page text the stub can "read": Role: ... Experience: ... Skills: ... Description: ...
+_POSTING_RE = re.compile(
+    r'Role:\s*(?P<role>.+?)\s*Experience:\s*(?P<experience>.+?)\s*Skills:\s*(?P<skills>.+?)\s*'
+    r'Description:\s*(?P<description>.+?)(?=\s*Role:|\s*$)',
+    re.DOTALL
+)
+
+
+class StubLLM:
+    """
+    Offline stand-in for ChatGroq with the same invoke(prompt).content
+    interface, for exercising Chain (and its cache) without an API key.
+
+    Replies are deterministic. Extraction prompts get the JSON list of the
+    postings written in the page text as "Role: ... Experience: ...
+    Skills: ... Description: ..."; email prompts get a short email naming
+    the job. Each call sleeps latency seconds plus latency_per_token for
+    every prompt token (about 4 characters), and a prompt over
+    context_tokens gets a non-JSON refusal, like a real model whose context
+    is exceeded.
+    """
+
+    def __init__(self, model_name='stub', temperature=0, latency=0.0, latency_per_token=0.0,
+                 context_tokens=None):
+        self.model_name = model_name
+        self.temperature = temperature
+        self.latency = latency
+        self.latency_per_token = latency_per_token
+        self.context_tokens = context_tokens
+        self.calls = 0
+        self.prompt_tokens = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def count_tokens(text):
+        return len(text) // 4 + 1
+
+    def invoke(self, prompt):
+        tokens = self.count_tokens(prompt)
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += tokens
+        delay = self.latency + self.latency_per_token * tokens
+        if delay:
+            time.sleep(delay)
+        if self.context_tokens is not None and tokens > self.context_tokens:
+            return StubMessage(f"The input is too long ({tokens} tokens, limit {self.context_tokens}).")
+        page = _PAGE_RE.search(prompt)
+        if page:
+            jobs = [{key: value.strip() for key, value in match.groupdict().items()}
+                    for match in _POSTING_RE.finditer(page.group(1))]
+            return StubMessage(json.dumps(jobs))
+        job = _JOB_DESCRIPTION_RE.search(prompt)
+        description = job.group(1) if job else prompt
+        tag = hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:8]
+        return StubMessage(f"Subject: Regarding your opening ({tag})\n\nDear Hiring Manager,\n\n"
+                           f"We read about the role: {description[:200]}\n\nBest regards,\nMohan")
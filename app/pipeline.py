@@ -0,0 +1,517 @@
+# pipeline.py
+"""
+Headless batch run of the app: job URLs and/or manual job records from a CSV,
+JSONL or plain URL list in, one generated email per job out.
+
+    python app/pipeline.py jobs.csv emails.jsonl --user me.json [--portfolio app/resource/my_portfolio.csv]
+
+Each input record is a job: a "url" to scrape, manual fields (role, skills,
+company, experience, description), or both, the manual fields then overriding
+what was scraped. Running the same command again resumes an interrupted run.
+"""
+import argparse
+import csv
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlparse
+
+import requests
+from email_generator import EmailGenerator
+from email_writers import FORMATS, EmailWriter
+from portfolio import MODES, Portfolio
+from scraper import HostLimiter, SimpleScraper
+from skills import default_matcher
+
+USER_FIELDS = ('name', 'role', 'company', 'email', 'phone', 'linkedin')
+STAGES = ('fetch', 'parse', 'query', 'generate', 'write')
+
+
+def read_jobs(path):
+    """
+    Job records from a .csv file with a header row, a .jsonl file of
+    objects, or a file of one URL per line. Empty fields are dropped, and a
+    bare string (a JSONL string or a line of a URL list) is a url.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if ext == '.csv':
+            for row in csv.DictReader(f):
+                yield {key.strip().lower(): value.strip() for key, value in row.items()
+                       if key and isinstance(value, str) and value.strip()}
+        elif ext in ('.jsonl', '.ndjson'):
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    raise ValueError(f"{path}:{line_no}: invalid JSON ({e})") from None
+                if isinstance(record, str):
+                    record = {'url': record}
+                if not isinstance(record, dict):
+                    raise ValueError(f"{path}:{line_no}: expected a JSON object or a URL string")
+                yield {key: value for key, value in record.items() if value not in (None, '')}
+        else:
+            for line in f:
+                if line.strip() and not line.lstrip().startswith('#'):
+                    yield {'url': line.strip()}
+
+
+class Checkpoint:
+    """
+    Finished input records of a run, kept next to its output.
+
+    After each batch of output is flushed, one JSON line with the output
+    size and the indices just written is appended. Resuming truncates the
+    output back to the last recorded size, so records written after the
+    final checkpoint line (a batch cut short by a crash) are dropped and
+    written again, exactly once.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.done = set()
+        self.size = 0
+        valid = 0
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        size, done = entry['size'], entry['done']
+                    except (ValueError, KeyError, TypeError):
+                        break  # a line cut short by a crash, and anything after it
+                    if not line.endswith(b'\n'):
+                        break
+                    self.size = size
+                    self.done.update(done)
+                    valid += len(line)
+            os.truncate(path, valid)
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def reset(self):
+        """Forget every finished record"""
+        self._file.truncate(0)
+        self.done.clear()
+        self.size = 0
+
+    def mark(self, size, indices):
+        self._file.write(json.dumps({'size': size, 'done': indices}) + '\n')
+        self._file.flush()
+        self.size = size
+        self.done.update(indices)
+
+    def close(self):
+        self._file.close()
+
+
+_worker = None
+
+
+class _Worker:
+    """Parsing, portfolio and generator state of one pool process"""
+
+    def __init__(self, options, scraper=None):
+        # In a pool process, a scraper configured like the pipeline's
+        self.scraper = scraper or SimpleScraper(**options['scraper'])
+        self.portfolio = Portfolio(options['portfolio_path'], mode=options['portfolio_mode'])
+        self.generator = EmailGenerator(options['template_path'])
+        self.user_info = options['user_info']
+        self.seed = options['seed']
+        self.top_n = options['top_n']
+
+    def process(self, batch):
+        """
+        Parse, query and generate for a batch of (index, record, body,
+        encoding, error) items. Returns (results, stats) where results are
+        (index, job, email, error) tuples, email None when error is set.
+        """
+        stats = Counter()
+        results = []
+        jobs = []
+        started = time.perf_counter()
+        for index, record, body, encoding, error in batch:
+            if error:
+                results.append((index, record, None, error))
+                continue
+            job = dict(record)
+            if body is not None:
+                try:
+                    job = self.scraper.parse_job_page(body, record['url'], encoding)
+                except Exception as e:
+                    results.append((index, record, None, f'Could not parse the page: {str(e)}'))
+                    continue
+                job.update((key, value) for key, value in record.items() if key != 'url')
+                if 'experience' in record and 'experience_years' not in record:
+                    # The scraped range would otherwise outrank the manual text
+                    years = self.scraper.experience_extractor.extract(str(record['experience']))
+                    job['experience_years'] = [years.min_years, years.max_years] if years else None
+                stats['parse'] += 1
+            jobs.append((index, job))
+        stats['parse_seconds'] += time.perf_counter() - started
+        if not jobs:
+            return results, stats
+
+        started = time.perf_counter()
+        links = self.portfolio.query_links_batch([job.get('skills', '') for _, job in jobs], self.top_n)
+        stats['query'] += len(jobs)
+        stats['query_seconds'] += time.perf_counter() - started
+
+        started = time.perf_counter()
+        if self.seed is None:
+            emails = self.generator.generate_emails([job for _, job in jobs], links, self.user_info)
+        else:
+            # Seeded per input record, so the output does not depend on how jobs were batched
+            emails = (next(self.generator.generate_emails([job], [job_links], self.user_info,
+                                                          seed=self.seed + index))
+                      for (index, job), job_links in zip(jobs, links))
+        results.extend((index, job, email, None) for (index, job), email in zip(jobs, emails))
+        stats['generate'] += len(jobs)
+        stats['generate_seconds'] += time.perf_counter() - started
+        return results, stats
+
+
+def _init_worker(options):
+    global _worker
+    _worker = _Worker(options)
+
+
+def _process_batch(batch):
+    return _worker.process(batch)
+
+
+class Pipeline:
+    """
+    Scrape -> portfolio query -> email generation over a whole file of jobs.
+
+    The stages are threads and a process pool joined by bounded queues, so
+    memory stays flat however long the input is. A reader feeds
+    fetch_workers threads that download pages (I/O-bound; per-host limited
+    like SimpleScraper.scrape_many) and pass the raw bodies on. A
+    dispatcher groups them into batches of up to batch_size for
+    process_workers processes, which parse the pages, query the portfolio
+    and render the emails (CPU-bound). The calling thread writes each
+    finished batch and checkpoints it, so output grows incrementally in
+    completion order, every record carrying its input index.
+    process_workers=0 runs the CPU-bound stages in the dispatcher thread.
+
+    Jobs that fail (unreachable pages, unparsable records) are counted and
+    passed to on_error, but not written or checkpointed, so a resumed run
+    tries them again.
+
+    scraper (a SimpleScraper by default) downloads every page. Its parser
+    and skill matcher are also passed to the pool processes, which parse
+    with a scraper of their own; with process_workers=0 it parses too.
+    """
+
+    def __init__(self, user_info, portfolio_path=None, portfolio_mode='tfidf', template_path=None,
+                 fetch_workers=8, process_workers=None, batch_size=16, queue_size=256, per_host=2,
+                 timeout=10, seed=None, top_n=3, scraper=None, on_error=None):
+        self.options = {
+            'portfolio_path': portfolio_path,
+            'portfolio_mode': portfolio_mode,
+            'template_path': template_path,
+            'user_info': {field: user_info.get(field, '') for field in USER_FIELDS},
+            'seed': seed,
+            'top_n': top_n
+        }
+        self.fetch_workers = max(1, fetch_workers)
+        if process_workers is None:
+            # One process per CPU; on a single CPU a pool would only add pickling
+            process_workers = os.cpu_count() or 1
+            process_workers = process_workers if process_workers > 1 else 0
+        self.process_workers = process_workers
+        self.batch_size = max(1, batch_size)
+        self.queue_size = queue_size
+        self.per_host = per_host
+        self.timeout = timeout
+        self.scraper = scraper or SimpleScraper()
+        # Pool processes parse with a scraper of their own, so they get its
+        # parsing configuration; the default skill matcher is built there
+        # rather than pickled
+        matcher = self.scraper.skill_matcher
+        self.options['scraper'] = {'parser': self.scraper.parser,
+                                   'skill_matcher': None if matcher is default_matcher() else matcher}
+        self.on_error = on_error
+        self.stats = Counter()
+        self._stats_lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def _count(self, stats):
+        with self._stats_lock:
+            self.stats.update(stats)
+
+    def report(self):
+        """
+        Pipeline counters, plus for each stage the items it handled, the
+        time spent in it summed over its workers, and its rate both per
+        second of the run and per second of work (one worker's throughput)
+        """
+        elapsed = self.stats.get('elapsed', 0.0)
+        stages = {}
+        for stage in STAGES:
+            items = self.stats.get(stage, 0)
+            busy = self.stats.get(f'{stage}_seconds', 0.0)
+            stages[stage] = {
+                'items': items,
+                'busy_seconds': busy,
+                'per_second': items / elapsed if elapsed else 0.0,
+                'per_busy_second': items / busy if busy else 0.0
+            }
+        return dict(
+            self.stats,
+            stages=stages,
+            emails_per_second=self.stats.get('written', 0) / elapsed if elapsed else 0.0
+        )
+
+    def _put(self, q, item):
+        """Blocking put that gives up once the run is stopping"""
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _read(self, records, done, fetch_q):
+        try:
+            for index, record in enumerate(records):
+                if index in done:
+                    self._count({'skipped': 1})
+                    continue
+                self._count({'read': 1})
+                if not self._put(fetch_q, (index, record)):
+                    return
+        except Exception as e:
+            self._count({'read_errors': 1})
+            if self.on_error:
+                self.on_error(None, None, f'Could not read the input: {str(e)}')
+        finally:
+            for _ in range(self.fetch_workers):
+                self._put(fetch_q, None)
+
+    def _download(self, url, limiter):
+        """(body, encoding, error) for one url, within the per-host limits and timeout"""
+        if not isinstance(url, str) or not url.startswith(('http://', 'https://')):
+            return None, None, 'Invalid URL format. Please include http:// or https://'
+        started = time.monotonic()
+        host = urlparse(url).netloc.lower()
+        slot = limiter.acquire(host, timeout=self.timeout)
+        if slot is None:
+            return None, None, f'Deadline of {self.timeout}s exceeded while waiting for {host}'
+        try:
+            remaining = self.timeout - (time.monotonic() - started) if self.timeout is not None else None
+            response, body = self.scraper.fetch_html(url, timeout=remaining)
+            if body is None:
+                return None, None, 'Server answered 304 to an unconditional request'
+            return body, self.scraper._declared_charset(response), None
+        except requests.exceptions.RequestException as e:
+            return None, None, f'Failed to access the website: {str(e)}'
+        except Exception as e:
+            return None, None, f'An error occurred: {str(e)}'
+        finally:
+            slot.release()
+
+    def _fetch(self, fetch_q, parse_q, limiter):
+        try:
+            while True:
+                item = fetch_q.get()
+                if item is None:
+                    return
+                index, record = item
+                body = encoding = error = None
+                if record.get('url'):
+                    started = time.perf_counter()
+                    body, encoding, error = self._download(record['url'], limiter)
+                    self._count({'fetch': 1, 'fetch_seconds': time.perf_counter() - started,
+                                 'fetch_failed': 1 if error else 0})
+                elif not record.get('role'):
+                    error = 'A job record needs a url or a role'
+                if not self._put(parse_q, (index, record, body, encoding, error)):
+                    return
+        finally:
+            self._put(parse_q, None)
+
+    def _dispatch(self, parse_q, results_q, slots, executor, worker):
+        running = self.fetch_workers
+        while running:
+            slots.acquire()
+            # Gather while a slot was awaited: a busy pool gets full batches
+            batch = []
+            while running and len(batch) < self.batch_size:
+                try:
+                    item = parse_q.get(timeout=0.1) if not batch else parse_q.get_nowait()
+                except queue.Empty:
+                    if batch or self._stop.is_set():
+                        break
+                    continue
+                if item is None:
+                    running -= 1
+                else:
+                    batch.append(item)
+            if self._stop.is_set():
+                return
+            if not batch:
+                slots.release()
+                continue
+            if executor is None:
+                results_q.put(self._outcome(batch, worker.process, batch))
+            else:
+                future = executor.submit(_process_batch, batch)
+                future.add_done_callback(lambda f, batch=batch: results_q.put(self._outcome(batch, f.result)))
+        # Every slot comes back once the writer has taken all batches
+        for _ in range(self.max_in_flight):
+            slots.acquire()
+        results_q.put(None)
+
+    @staticmethod
+    def _outcome(batch, fn, *args):
+        """fn(*args), or every job of batch failed when it raises"""
+        try:
+            return fn(*args)
+        except Exception as e:
+            return [(item[0], item[1], None, f'Processing failed: {e!r}') for item in batch], Counter()
+
+    @property
+    def max_in_flight(self):
+        """Batches being processed or waiting for the writer at any time"""
+        return max(2, 2 * self.process_workers)
+
+    def run(self, input_path, output_path, checkpoint_path=None, format=None, sender=None):
+        """
+        Process every job of input_path into output_path (JSONL, CSV or mbox,
+        by extension unless format is given) and return report(). Finished
+        records are listed in the checkpoint at checkpoint_path
+        (output_path + '.checkpoint' by default), and the run resumes after
+        them. output_path is started afresh when the checkpoint is new or
+        empty, or lists more output than output_path holds.
+        """
+        if not os.path.isfile(input_path):
+            raise FileNotFoundError(f"No such input file: {input_path}")
+        checkpoint = Checkpoint(checkpoint_path or output_path + '.checkpoint')
+        if not os.path.exists(output_path) or os.path.getsize(output_path) < checkpoint.size:
+            checkpoint.reset()
+        with open(output_path, 'ab'):
+            pass
+        os.truncate(output_path, checkpoint.size)
+        writer = EmailWriter(output_path, format=format, sender=sender, append=True)
+
+        self.stats = Counter()
+        self._stop.clear()
+        started = time.perf_counter()
+        executor = worker = None
+        if self.process_workers:
+            executor = ProcessPoolExecutor(self.process_workers, initializer=_init_worker,
+                                           initargs=(self.options,))
+            # Start the pool before any thread, so no process is forked
+            # while another thread holds a lock
+            executor.submit(int).result()
+        else:
+            worker = _Worker(self.options, self.scraper)
+
+        fetch_q = queue.Queue(self.queue_size)
+        parse_q = queue.Queue(self.queue_size)
+        # Unbounded, but holds at most max_in_flight batches: each one
+        # takes a slot that only the writer gives back
+        results_q = queue.Queue()
+        slots = threading.Semaphore(self.max_in_flight)
+        limiter = HostLimiter(self.per_host)
+        threads = [threading.Thread(target=self._read, args=(read_jobs(input_path), checkpoint.done, fetch_q))]
+        threads += [threading.Thread(target=self._fetch, args=(fetch_q, parse_q, limiter))
+                    for _ in range(self.fetch_workers)]
+        threads.append(threading.Thread(target=self._dispatch, args=(parse_q, results_q, slots, executor, worker)))
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+
+        try:
+            while True:
+                outcome = results_q.get()
+                if outcome is None:
+                    break
+                results, stats = outcome
+                self._count(stats)
+                write_started = time.perf_counter()
+                written = []
+                for index, job, email, error in results:
+                    if error:
+                        self._count({'failed': 1})
+                        if self.on_error:
+                            self.on_error(index, job, error)
+                        continue
+                    writer.write(email, job, index=index)
+                    written.append(index)
+                if written:
+                    checkpoint.mark(writer.flush(), written)
+                self._count({'write': len(written), 'written': len(written),
+                             'write_seconds': time.perf_counter() - write_started})
+                slots.release()
+        finally:
+            self._stop.set()
+            writer.close()
+            checkpoint.close()
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+            self._count({'elapsed': time.perf_counter() - started})
+        return self.report()
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument('input', help='.csv with a header row, .jsonl of job objects, or a file of URLs')
+    ap.add_argument('output', help='.jsonl, .csv or .mbox file the emails are appended to')
+    ap.add_argument('--user', required=True,
+                    help=f"JSON file with the sender's {', '.join(USER_FIELDS)} (linkedin optional)")
+    ap.add_argument('--format', choices=FORMATS, help='output format (default: from the output extension)')
+    ap.add_argument('--checkpoint', help='checkpoint file (default: OUTPUT.checkpoint)')
+    ap.add_argument('--portfolio', help='portfolio CSV or .npz snapshot (default: built-in sample)')
+    ap.add_argument('--mode', choices=MODES, default='tfidf', help='portfolio matching mode')
+    ap.add_argument('--templates', help='template pack JSON (default: templates/professional.json)')
+    ap.add_argument('--sender', help='From header for mbox output')
+    ap.add_argument('--fetch-workers', type=int, default=8)
+    ap.add_argument('--workers', type=int, default=None,
+                    help='processes for parsing and generation (default: one per CPU, 0: no pool)')
+    ap.add_argument('--batch-size', type=int, default=16)
+    ap.add_argument('--queue-size', type=int, default=256)
+    ap.add_argument('--per-host', type=int, default=2)
+    ap.add_argument('--timeout', type=float, default=10)
+    ap.add_argument('--top-n', type=int, default=3, help='portfolio links per email')
+    ap.add_argument('--seed', type=int, help='make template choices reproducible')
+    ap.add_argument('--stats', help='also write the final report to this JSON file')
+    args = ap.parse_args()
+
+    with open(args.user, 'r', encoding='utf-8') as f:
+        user_info = json.load(f)
+
+    def on_error(index, job, error):
+        print(f"job {index}: {error}", file=sys.stderr)
+
+    pipeline = Pipeline(user_info, portfolio_path=args.portfolio, portfolio_mode=args.mode,
+                        template_path=args.templates, fetch_workers=args.fetch_workers,
+                        process_workers=args.workers, batch_size=args.batch_size, queue_size=args.queue_size,
+                        per_host=args.per_host, timeout=args.timeout, seed=args.seed, top_n=args.top_n,
+                        on_error=on_error)
+    report = pipeline.run(args.input, args.output, checkpoint_path=args.checkpoint, format=args.format,
+                          sender=args.sender)
+
+    print(f"{report.get('written', 0)} emails written, {report.get('failed', 0)} failed, "
+          f"{report.get('skipped', 0)} already done; {report['elapsed']:.1f}s, "
+          f"{report['emails_per_second']:.1f} emails/s", file=sys.stderr)
+    for stage, numbers in report['stages'].items():
+        print(f"  {stage:<9} {numbers['items']:8d} items  {numbers['busy_seconds']:8.2f}s busy  "
+              f"{numbers['per_second']:9.1f}/s  {numbers['per_busy_second']:9.1f}/busy s", file=sys.stderr)
+    if args.stats:
+        with open(args.stats, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    sys.exit(1 if report.get('failed') or report.get('read_errors') else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,33 +1,346 @@
 # portfolio.py
-import pandas as pd
-from difflib import SequenceMatcher
+import hashlib
+import os
+import threading
+import time
+from collections import Counter, defaultdict, deque
+import numpy as np
+from scipy import sparse
 from typing import List, Dict, Any
+from bitset_index import BitsetIndex
+from portfolio_store import FIELDS, PortfolioStore
+from result_cache import ResultCache
+from skills import default_vocabulary
+from tfidf_index import TfidfIndex, skill_tokens
+from vector_index import HashingEmbedder, VectorIndex
+
+MODES = ("tfidf", "semantic", "skills")
+# A watched file must have been left alone this long before it is reloaded,
+# so a save still in progress is not picked up half-written
+SETTLE_SECONDS = 0.5
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
 
 class Portfolio:
     """
-    Simple portfolio manager that loads a DataFrame (or fallback sample)
-    and returns relevant portfolio links based on skill-string similarity.
+    Simple portfolio manager that loads a CSV (or fallback sample) into a
+    compact PortfolioStore and returns relevant portfolio links based on
+    shared skills.
+
+    Techstacks are indexed once into a sparse TF-IDF matrix plus its
+    inverted form (skill token -> rows), so a query only scores the rows
+    sharing at least one token with it and costs time proportional to
+    those matches rather than to the portfolio size. In semantic
+    mode items are embedded instead and searched through a VectorIndex.
+    In skills mode techstacks are reduced to canonical taxonomy skills,
+    held as packed bitsets and scored by Jaccard similarity (BitsetIndex).
+
+    Edits to the source file are applied incrementally by reload(): only
+    added or modified rows are re-tokenized or re-embedded, and the new
+    index replaces the old one in a single assignment, so a query running
+    meanwhile finishes on the old index and never sees a partial one.
+
+    Results are memoized in a bounded LRU cache keyed on the normalized
+    query (its sorted skill tokens or skill IDs) and top_n, which every
+    reload that changes the data invalidates.
     """
 
-    def __init__(self, file_path: str = None):
+    def __init__(self, file_path: str = None, mode: str = "tfidf", embedder=None,
+                 index_dir: str = None, exact: bool = False, nprobe: int = None,
+                 watch_interval: float = None, cache_size: int = 1024):
         """
         If file_path is given, it should be a CSV with columns:
-        'Techstack' and 'Links' (optionally 'Title' and 'Description').
-        Otherwise a small built-in sample dataset is used.
+        'Techstack' and 'Links' (optionally 'Title' and 'Description'),
+        or a .npz snapshot written by save_snapshot(), which loads without
+        pandas. Otherwise a small built-in sample dataset is used.
+
+        mode="semantic" matches on embeddings of techstack and description
+        (HashingEmbedder unless embedder is given), using approximate IVF
+        search with nprobe lists (a third of them by default, see
+        VectorIndex.search), or exact search when exact is set. With
+        index_dir the vector index is persisted there; an index built from
+        the same file (size and mtime) by the same embedder is memory-mapped
+        on the next start instead of being rebuilt, and the CSV is not read.
+
+        mode="skills" matches on canonical skills from the bundled taxonomy,
+        so aliases ("JS", "JavaScript") count as the same skill and words
+        outside the taxonomy are ignored.
+
+        With watch_interval set, queries check the file at most that often
+        (mtime, size, then content hash) and reload it in the background
+        once it changed and has been left alone for SETTLE_SECONDS.
+
+        cache_size bounds the number of memoized query results; 0 turns
+        the cache off.
         """
-        if file_path:
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}, got {mode!r}")
+        self.file_path = file_path
+        self.mode = mode
+        self.exact = exact
+        self.nprobe = nprobe
+        self.index_dir = index_dir
+        self.watch_interval = watch_interval
+        self.stats = Counter()
+        self._stats_lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._last_check = time.monotonic()
+        # Stamp of the file version the last reload failed on
+        self._failed_stamp = None
+        self._cache = ResultCache(cache_size) if cache_size else None
+
+        self._stamp = self._source_stamp()
+        if mode == "semantic":
+            self.embedder = embedder or HashingEmbedder()
+            self._index = self._open_index(index_dir)
+            if self._index is None:
+                self._digest = self._source_digest()
+                self._index = self._build_vector_index(self._load_store())
+            else:
+                self._digest = self._index.meta.get("sha256")
+        elif mode == "skills":
+            self._digest = self._source_digest()
+            self._skills = BitsetIndex.build(self._load_store(), default_vocabulary())
+        else:
+            self._digest = self._source_digest()
+            self._tfidf = TfidfIndex.build(self._load_store())
+
+    @property
+    def store(self) -> PortfolioStore:
+        """The current portfolio rows"""
+        if self.mode == "semantic":
+            index = self._index
+            rows = [index.row(i) for i in range(len(index))]
+            return PortfolioStore.from_columns({field: [row[field] for row in rows] for field in FIELDS})
+        return self._current_index().store
+
+    def _current_index(self):
+        if self.mode == "semantic":
+            return self._index
+        return self._skills if self.mode == "skills" else self._tfidf
+
+    @property
+    def data(self):
+        """The portfolio as a pandas DataFrame, built on each access"""
+        return self.store.to_frame()
+
+    def save_snapshot(self, path: str) -> None:
+        """Write the portfolio rows to a binary .npz snapshot"""
+        self.store.save(path)
+
+    def _load_store(self) -> PortfolioStore:
+        if self.file_path:
             try:
-                self.data = pd.read_csv(file_path)
+                return PortfolioStore.read(self.file_path)
             except Exception:
-                self.data = self._sample_data()
-        else:
-            self.data = self._sample_data()
-        # Ensure expected columns exist
-        if "Techstack" not in self.data.columns or "Links" not in self.data.columns:
-            self.data = self._sample_data()
+                pass
+        return PortfolioStore.from_records(self._sample_data())
+
+    def _score_postings(self, index: TfidfIndex, query) -> sparse.csr_matrix:
+        """
+        Scores of a single (1 x vocabulary) query for the rows on its
+        tokens' posting lists only, as a sparse 1 x portfolio row
+        """
+        postings = index.postings
+        starts = postings.indptr[query.indices]
+        ends = postings.indptr[query.indices + 1]
+        if not len(starts) or not (ends - starts).any():
+            return sparse.csr_matrix((1, len(index)), dtype=np.float32)
+        rows = np.concatenate([postings.indices[s:e] for s, e in zip(starts, ends)])
+        weights = np.concatenate([postings.data[s:e] * w for s, e, w in zip(starts, ends, query.data)])
+        candidates, inverse = np.unique(rows, return_inverse=True)
+        scores = np.bincount(inverse, weights=weights).astype(np.float32)
+        return sparse.csr_matrix((scores, candidates, [0, len(candidates)]), shape=(1, len(index)))
 
-    def _sample_data(self) -> pd.DataFrame:
-        return pd.DataFrame([
+    def _count(self, key: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self.stats[key] += amount
+
+    def _count_candidates(self, scores) -> None:
+        counts = np.diff(scores.indptr)
+        with self._stats_lock:
+            self.stats["queries"] += len(counts)
+            self.stats["candidates"] += int(counts.sum())
+            self.stats["no_candidates"] += int((counts == 0).sum())
+
+    def index_stats(self) -> Dict[str, Any]:
+        """Inverted index size, candidate-set and reload counters so far"""
+        with self._stats_lock:
+            stats = dict(self.stats)
+        index = self._current_index()
+        rows = len(index)
+        queries = stats.get("queries", 0)
+        mean = stats.get("candidates", 0) / queries if queries else 0.0
+        postings = getattr(index, "postings", None)
+        return dict(
+            stats,
+            rows=rows,
+            tokens=postings.shape[0] if postings is not None else 0,
+            postings=postings.nnz if postings is not None else 0,
+            cache_entries=len(self._cache) if self._cache is not None else 0,
+            cache_hits=self._cache.stats["hits"] if self._cache is not None else 0,
+            cache_misses=self._cache.stats["misses"] if self._cache is not None else 0,
+            mean_candidates=mean,
+            candidate_fraction=mean / rows if rows else 0.0
+        )
+
+    def _source_stamp(self):
+        """Identifies the portfolio file a saved vector index was built from"""
+        if not self.file_path or not os.path.exists(self.file_path):
+            return None
+        stat = os.stat(self.file_path)
+        return {"path": os.path.abspath(self.file_path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    def _source_digest(self):
+        try:
+            return _file_digest(self.file_path) if self.file_path else None
+        except OSError:
+            return None
+
+    def _open_index(self, index_dir: str):
+        """The saved index in index_dir if it matches the file and embedder, else None"""
+        if not index_dir:
+            return None
+        try:
+            index = VectorIndex.open(index_dir)
+        except (OSError, ValueError):
+            return None
+        if index.meta.get("embedder") != self.embedder.name or index.meta.get("source") != self._stamp:
+            return None
+        return index
+
+    def _build_vector_index(self, store: PortfolioStore, previous: VectorIndex = None) -> VectorIndex:
+        """
+        Vector index over the rows of store, reusing the stored vectors (and
+        centroids) of rows with unchanged content from previous
+        """
+        rows = list(store.rows())
+        vectors = np.zeros((len(rows), self.embedder.dim), dtype=np.float32)
+        fresh_at = list(range(len(rows)))
+        centroids = None
+        if previous is not None and len(previous):
+            available = defaultdict(deque)
+            for row_id, key in enumerate(previous.row_keys()):
+                available[key].append(row_id)
+            reused_at, reused_from, fresh_at = [], [], []
+            for i, row in enumerate(rows):
+                key = VectorIndex.encode_row(row)
+                if available.get(key):
+                    reused_at.append(i)
+                    reused_from.append(available[key].popleft())
+                else:
+                    fresh_at.append(i)
+            if reused_at:
+                vectors[reused_at] = previous.vectors_for(reused_from)
+            self._count("rows_reused", len(reused_at))
+            # Keep the trained lists while the portfolio size stays in range
+            if len(previous.centroids) ** 2 <= 4 * len(rows) <= 16 * len(previous.centroids) ** 2:
+                centroids = previous.centroids
+
+        if fresh_at:
+            texts = [" ".join(v for v in (rows[i]["techstack"], rows[i]["description"]) if isinstance(v, str))
+                     for i in fresh_at]
+            vectors[fresh_at] = self.embedder.embed(texts)
+        self._count("rows_indexed", len(fresh_at))
+
+        meta = {"embedder": self.embedder.name, "source": self._stamp, "sha256": self._digest}
+        index = VectorIndex.build(vectors, rows, meta=meta, centroids=centroids)
+        if self.index_dir:
+            index.save(self.index_dir)
+        return index
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Apply edits to the source file as an incremental index update.
+        Returns True if the portfolio changed. A file that cannot be read
+        or lacks the expected columns leaves the current index in place
+        and counts a reload error; the watcher then leaves that version of
+        the file alone until it changes again.
+        """
+        if not self.file_path:
+            return False
+        with self._reload_lock:
+            stamp = self._source_stamp()
+            if stamp is None or (stamp == self._stamp and not force):
+                return False
+            if stamp == self._failed_stamp and not force:
+                return False
+            digest = self._source_digest()
+            if digest == self._digest and not force:
+                # Touched but not changed
+                self._stamp = stamp
+                if self.mode == "semantic" and self.index_dir:
+                    self._index.meta["source"] = stamp
+                    self._index.save_meta(self.index_dir)
+                return False
+
+            try:
+                store = PortfolioStore.read(self.file_path)
+            except Exception:
+                return self._reload_failed(stamp)
+            if self._source_stamp() != stamp:
+                # Written to while we read it; the next check retries
+                return False
+            previous = self._stamp, self._digest
+            # The vector index records both in its metadata
+            self._stamp, self._digest = stamp, digest
+            try:
+                if self.mode == "semantic":
+                    self._index = self._build_vector_index(store, previous=self._index)
+                elif self.mode == "skills":
+                    index = BitsetIndex.build(store, default_vocabulary(), previous=self._skills)
+                    self._count("rows_reused", index.reused)
+                    self._count("rows_indexed", len(store) - index.reused)
+                    self._skills = index
+                else:
+                    index = TfidfIndex.build(store, previous=self._tfidf)
+                    self._count("rows_reused", index.reused)
+                    self._count("rows_indexed", len(store) - index.reused)
+                    self._tfidf = index
+            except Exception:
+                self._stamp, self._digest = previous
+                return self._reload_failed(stamp)
+            self._failed_stamp = None
+            if self._cache is not None:
+                self._cache.invalidate()
+            self._count("reloads")
+            return True
+
+    def _reload_failed(self, stamp) -> bool:
+        self._failed_stamp = stamp
+        self._count("reload_errors")
+        return False
+
+    def _reload_in_background(self) -> None:
+        try:
+            self.reload()
+        except Exception:
+            self._count("reload_errors")
+
+    def _check_source(self) -> None:
+        """Start a background reload when the watched file changed"""
+        now = time.monotonic()
+        if now - self._last_check < self.watch_interval:
+            return
+        self._last_check = now
+        stamp = self._source_stamp()
+        if stamp is None or stamp in (self._stamp, self._failed_stamp) or self._reload_lock.locked():
+            return
+        if not stamp["size"]:
+            # Truncated by a writer that has not flushed anything yet
+            return
+        if time.time() - stamp["mtime_ns"] / 1e9 >= SETTLE_SECONDS:
+            threading.Thread(target=self._reload_in_background, daemon=True).start()
+
+    def _sample_data(self) -> List[Dict[str, str]]:
+        return [
             {
                 "Title": "Personal Portfolio - Python & Web",
                 "Techstack": "Python, FastAPI, Flask, JavaScript, React, SQL, Docker",
@@ -52,35 +365,130 @@ class Portfolio:
                 "Description": "Design deliverables and case studies.",
                 "Links": "https://example.com/portfolio-design"
             }
-        ])
+        ]
 
     @staticmethod
-    def _similar(a: str, b: str) -> float:
-        return SequenceMatcher(None, a.lower(), b.lower()).ratio()
+    def _top_n(index, scores, top_n: int) -> List[List[Dict[str, Any]]]:
+        """
+        Result dicts for the top_n highest scores of every row of a sparse
+        (queries x portfolio) score matrix, best first (ties keep row order)
+        """
+        rows = len(index)
+        k = min(top_n, rows)
+        results = []
+        for i in range(scores.shape[0]):
+            start, end = scores.indptr[i], scores.indptr[i + 1]
+            candidates, values = scores.indices[start:end], scores.data[start:end]
+            if len(candidates) > k:
+                keep = np.argpartition(-values, k - 1)[:k]
+                candidates, values = candidates[keep], values[keep]
+            elif len(candidates) < k:
+                # Too few matches: pad with the first unmatched rows at score 0
+                padding = np.setdiff1d(np.arange(min(rows, k + len(candidates))), candidates)[:k - len(candidates)]
+                candidates = np.concatenate([candidates, padding])
+                values = np.concatenate([values, np.zeros(len(padding), dtype=values.dtype)])
+            order = np.lexsort((candidates, -values))
+            results.append([dict(index.store.row(candidates[j]), similarity=float(values[j])) for j in order])
+        return results
 
     def query_links(self, skills: str, top_n: int = 3) -> List[Dict[str, Any]]:
         """
         Given a comma/space separated skills string, return a list of
         relevant portfolio items with a similarity score in [0,1].
         """
-        if not skills:
-            return []
+        return self.query_links_batch([skills], top_n)[0]
 
-        # Normalize input into a single string
-        skill_text = skills if isinstance(skills, str) else " ".join(skills)
+    def query_links_batch(self, skills_list: List[str], top_n: int = 3,
+                          max_cells: int = 2_000_000) -> List[List[Dict[str, Any]]]:
+        """
+        query_links for many skill strings at once, in input order.
 
-        results = []
-        for _, row in self.data.iterrows():
-            techstack = str(row.get("Techstack", ""))
-            # compute best similarity across the two strings
-            sim = self._similar(skill_text, techstack)
-            results.append({
-                "title": row.get("Title", techstack),
-                "links": row.get("Links", ""),
-                "techstack": techstack,
-                "description": row.get("Description", ""),
-                "similarity": sim
-            })
-
-        results = sorted(results, key=lambda x: x["similarity"], reverse=True)
-        return results[:top_n]
+        All queries are vectorized together and scored against the inverted
+        index with one sparse matrix multiply per chunk; chunks span at most
+        max_cells query x portfolio pairs, which bounds peak memory. Top-n
+        selection only looks at the non-zero scores of each query. Cached
+        queries skip all of this, and repeats within the batch are searched
+        once.
+        """
+        results: List[List[Dict[str, Any]]] = [[] for _ in skills_list]
+        # Normalize every input into a single string; empty ones stay []
+        texts = [skills if isinstance(skills, str) else " ".join(skills) for skills in skills_list]
+        todo = [i for i, (skills, text) in enumerate(zip(skills_list, texts)) if skills and text]
+        if not todo:
+            return results
+        if self.watch_interval is not None:
+            self._check_source()
+        if self._cache is None:
+            for i, top in zip(todo, self._search([texts[i] for i in todo], top_n, max_cells)):
+                results[i] = top
+            return results
+
+        # Read the generation first: results of a query that overlaps a
+        # reload are then dropped by put() instead of being cached
+        generation = self._cache.generation
+        pending = {}
+        for i in todo:
+            key = (self._cache_key(texts[i]), top_n)
+            cached = self._cache.get(key)
+            if cached is None:
+                pending.setdefault(key, []).append(i)
+            else:
+                results[i] = cached
+        if pending:
+            # Repeats within the batch are searched once
+            keys = list(pending)
+            for key, top in zip(keys, self._search([texts[pending[key][0]] for key in keys], top_n, max_cells)):
+                self._cache.put(key, top, generation)
+                for i in pending[key]:
+                    results[i] = [dict(result) for result in top]
+        return results
+
+    def _cache_key(self, text: str):
+        """Queries with equal keys have equal results"""
+        if self.mode == "semantic":
+            return text
+        if self.mode == "skills":
+            return tuple(self._skills.vocabulary.encode(text))
+        # Token order does not change a TF-IDF query vector, repeats do
+        return tuple(sorted(skill_tokens(text)))
+
+    def _search(self, texts: List[str], top_n: int, max_cells: int) -> List[List[Dict[str, Any]]]:
+        """Uncached results for non-empty query texts"""
+        results: List[List[Dict[str, Any]]] = [[] for _ in texts]
+        if self.mode == "semantic":
+            # One read of the attribute: a concurrent reload swaps in a new
+            # index without affecting this query
+            index = self._index
+            for i, vector in enumerate(self.embedder.embed(texts)):
+                hits = index.search(vector, top_n, exact=self.exact, nprobe=self.nprobe)
+                results[i] = [dict(index.row(row_id), similarity=score) for row_id, score in hits]
+            return results
+
+        if self.mode == "skills":
+            index = self._skills
+            for i, query in enumerate(index.transform(texts)):
+                scores = index.score(query)
+                self._count_candidates(scores)
+                results[i] = self._top_n(index, scores, top_n)[0]
+            return results
+
+        index = self._tfidf
+        if not len(index):
+            return results
+
+        queries = index.transform(texts)
+        if len(texts) == 1:
+            # A lone query walks its posting lists directly; a matrix product
+            # would cost O(portfolio size) in setup alone
+            scores = self._score_postings(index, queries)
+            self._count_candidates(scores)
+            results[0] = self._top_n(index, scores, top_n)[0]
+            return results
+
+        chunk = max(1, max_cells // len(index))
+        for start in range(0, len(texts), chunk):
+            scores = queries[start:start + chunk] @ index.postings
+            scores.eliminate_zeros()
+            self._count_candidates(scores)
+            results[start:start + chunk] = self._top_n(index, scores, top_n)
+        return results
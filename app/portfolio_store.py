@@ -0,0 +1,190 @@
+# portfolio_store.py
+import math
+
+import numpy as np
+
+FIELDS = ("title", "links", "techstack", "description")
+_MISSING = -1
+
+
+def _pack(strings):
+    """strings as one UTF-8 blob plus the offsets of each string in it"""
+    text = "".join(strings)
+    offsets = np.zeros(len(strings) + 1, dtype=np.int64)
+    if text.isascii():
+        # One character per byte: offsets follow from the string lengths
+        np.cumsum(np.fromiter(map(len, strings), dtype=np.int64, count=len(strings)), out=offsets[1:])
+        return text.encode("ascii"), offsets
+    encoded = [value.encode("utf-8") for value in strings]
+    np.cumsum(np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded)), out=offsets[1:])
+    return b"".join(encoded), offsets
+
+
+class PortfolioStore:
+    """
+    Compact, read-only table of portfolio rows.
+
+    Every distinct string is stored once, as UTF-8 in a single bytes blob
+    indexed by an offsets array, and the rows are an (n x 4) int32 array of
+    codes into that table. There is no Python object per row or per string:
+    result dicts are only decoded for the rows a query returns. pandas is
+    imported only when a CSV has to be parsed or a DataFrame is asked for,
+    and save()/load() write and read a binary snapshot that needs neither.
+    """
+
+    __slots__ = ("blob", "offsets", "codes", "hashes")
+
+    def __init__(self, blob, offsets, codes, hashes=None):
+        self.blob = blob
+        self.offsets = offsets
+        self.codes = codes
+        # Optional 64-bit content hash per row, used by match()
+        self.hashes = hashes
+
+    def __len__(self):
+        return len(self.codes)
+
+    @classmethod
+    def from_columns(cls, columns):
+        """columns maps each of FIELDS to a sequence of values; None/NaN is missing"""
+        table = {}
+        length = len(columns[FIELDS[0]])
+        codes = np.empty((length, len(FIELDS)), dtype=np.int32)
+        for j, field in enumerate(FIELDS):
+            column = codes[:, j]
+            for i, value in enumerate(columns[field]):
+                if value is None or (isinstance(value, float) and math.isnan(value)):
+                    column[i] = _MISSING
+                    continue
+                value = value if isinstance(value, str) else str(value)
+                code = table.get(value)
+                if code is None:
+                    code = table[value] = len(table)
+                column[i] = code
+        # dicts keep insertion order, which is code order
+        return cls(*_pack(list(table)), codes)
+
+    @classmethod
+    def from_frame(cls, data):
+        """Rows of a DataFrame with 'Techstack' and 'Links' (optionally 'Title' and 'Description')"""
+        import pandas as pd
+        techstacks = data["Techstack"].astype(str)
+        columns = [
+            data["Title"] if "Title" in data.columns else techstacks,
+            data["Links"],
+            techstacks,
+            data["Description"] if "Description" in data.columns else pd.Series([""] * len(data), dtype=object)
+        ]
+        values = []
+        for column in columns:
+            column = column.astype(object)
+            present = column.notna()
+            values.append(column.where(~present, column[present].astype(str)).to_numpy())
+        # One factorize over all four columns gives the shared string table
+        codes, uniques = pd.factorize(np.concatenate(values) if len(data) else np.array([], dtype=object))
+        codes = np.ascontiguousarray(codes.astype(np.int32).reshape(len(FIELDS), len(data)).T)
+        hashes = pd.util.hash_pandas_object(pd.DataFrame(dict(zip(FIELDS, values))), index=False).to_numpy()
+        return cls(*_pack(list(uniques)), codes, hashes)
+
+    @classmethod
+    def from_records(cls, records):
+        """Rows of a list of dicts keyed like the CSV columns"""
+        techstacks = [str(record["Techstack"]) for record in records]
+        return cls.from_columns({
+            "title": [record.get("Title", techstack) for record, techstack in zip(records, techstacks)],
+            "links": [record["Links"] for record in records],
+            "techstack": techstacks,
+            "description": [record.get("Description", "") for record in records]
+        })
+
+    @classmethod
+    def read(cls, path):
+        """Load a CSV file, or a snapshot written by save() if path ends in .npz"""
+        if path.endswith(".npz"):
+            return cls.load(path)
+        import pandas as pd
+        data = pd.read_csv(path)
+        # Ensure expected columns exist
+        if "Techstack" not in data.columns or "Links" not in data.columns:
+            raise ValueError(f"{path} needs 'Techstack' and 'Links' columns")
+        return cls.from_frame(data)
+
+    def save(self, path):
+        """Write a binary snapshot of the table"""
+        arrays = dict(blob=np.frombuffer(self.blob, dtype=np.uint8), offsets=self.offsets, codes=self.codes)
+        if self.hashes is not None:
+            arrays["hashes"] = self.hashes
+        with open(path, "wb") as f:
+            np.savez(f, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as snapshot:
+            hashes = snapshot["hashes"] if "hashes" in snapshot.files else None
+            return cls(snapshot["blob"].tobytes(), snapshot["offsets"], snapshot["codes"], hashes)
+
+    def strings(self):
+        """Every distinct string, by code"""
+        blob, offsets = self.blob, self.offsets.tolist()
+        return [blob[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(len(offsets) - 1)]
+
+    def value(self, i, field):
+        code = int(self.codes[i, FIELDS.index(field)])
+        return self.blob[self.offsets[code]:self.offsets[code + 1]].decode("utf-8") if code != _MISSING else math.nan
+
+    def column(self, field):
+        """Every row's value of field, as a list"""
+        strings = self.strings()
+        return [strings[c] if c != _MISSING else math.nan for c in self.codes[:, FIELDS.index(field)].tolist()]
+
+    def row(self, i):
+        """The result dict of row i (missing cells are NaN, as pandas reads them)"""
+        blob, offsets = self.blob, self.offsets
+        return {field: blob[offsets[c]:offsets[c + 1]].decode("utf-8") if c != _MISSING else math.nan
+                for field, c in zip(FIELDS, self.codes[i].tolist())}
+
+    def rows(self):
+        for i in range(len(self.codes)):
+            yield self.row(i)
+
+    def to_frame(self):
+        """The rows as a new DataFrame with the CSV column names"""
+        import pandas as pd
+        strings = self.strings()
+        return pd.DataFrame({field.capitalize(): [strings[c] if c != _MISSING else math.nan for c in column]
+                             for field, column in zip(FIELDS, self.codes.T.tolist())})
+
+    def match(self, previous):
+        """
+        Pair rows with the rows of previous that have the same content.
+        Returns (reused_at, reused_from, fresh_at): rows of self found in
+        previous, their row numbers there, and rows with new content.
+        Identical rows may all pair up with the same row of previous.
+        """
+        if self.hashes is not None and previous.hashes is not None:
+            # Both sides carry row hashes: match them with one sorted search
+            order = np.argsort(previous.hashes, kind="stable")
+            known = previous.hashes[order]
+            at = np.minimum(np.searchsorted(known, self.hashes), max(len(known) - 1, 0))
+            found = known[at] == self.hashes if len(known) else np.zeros(len(self), dtype=bool)
+            return np.flatnonzero(found), order[at[found]], np.flatnonzero(~found)
+
+        # Translate previous codes into this table; strings it lacks get -2
+        # and the extra last entry keeps missing cells (-1) missing
+        table = {s: code for code, s in enumerate(self.strings())}
+        remap = np.array([table.get(s, -2) for s in previous.strings()] + [_MISSING], dtype=np.int32)
+        old = np.ascontiguousarray(remap[previous.codes])
+        new = np.ascontiguousarray(self.codes)
+        row_type = np.dtype((np.void, new.dtype.itemsize * len(FIELDS)))
+        available = dict(zip(old.view(row_type).ravel().tolist(), range(len(old))))
+
+        reused_at, reused_from, fresh_at = [], [], []
+        for i, key in enumerate(new.view(row_type).ravel().tolist()):
+            j = available.get(key)
+            if j is not None:
+                reused_at.append(i)
+                reused_from.append(j)
+            else:
+                fresh_at.append(i)
+        return (np.array(reused_at, dtype=np.int64), np.array(reused_from, dtype=np.int64),
+                np.array(fresh_at, dtype=np.int64))
@@ -0,0 +1,55 @@
+# result_cache.py
+import threading
+from collections import Counter, OrderedDict
+
+
+class ResultCache:
+    """
+    Bounded in-memory LRU cache of query results.
+
+    Lookups and inserts are O(1): an OrderedDict keeps the entries in use
+    order, a hit moves its entry to the end and inserts past max_entries
+    evict from the front. invalidate() drops every entry and starts a new
+    generation; put() ignores results computed under an older generation,
+    so a query that overlapped an invalidation cannot store a stale result.
+    Results are copied on the way in and out, callers may mutate them.
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self.generation = 0
+        self.stats = Counter()
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """The cached results for key, or None"""
+        with self._lock:
+            results = self._entries.get(key)
+            if results is None:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+        return [dict(result) for result in results]
+
+    def put(self, key, results, generation):
+        """Store results computed while generation was current"""
+        results = [dict(result) for result in results]
+        with self._lock:
+            if generation != self.generation or self.max_entries <= 0:
+                return
+            self._entries[key] = results
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            self.generation += 1
+            self.stats["invalidations"] += 1
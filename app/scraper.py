@@ -1,15 +1,123 @@
 # scraper.py
 import re
+import threading
+import time
+from collections import Counter, OrderedDict, defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 import requests
 from bs4 import BeautifulSoup
 from urllib.parse import urlparse
+from experience import ExperienceExtractor
+from extraction import PageIndex
+from skills import default_matcher
+from structured_data import (
+    find_job_posting, is_data_script, posting_company, posting_description_html,
+    posting_experience, posting_skills_text
+)
+from transport import Deadline, build_session, read_chunks, transport_stats
+
+# Content types worth parsing; anything else is rejected before download
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml')
+
+# Version of the record scrape_job_info extracts from a page. HttpCache
+# entries from other versions are misses, so bump it whenever a change to
+# extraction alters what a page yields.
+EXTRACTOR_VERSION = 2
+
+try:
+    import lxml  # noqa: F401
+    DEFAULT_PARSER = 'lxml'
+except ImportError:
+    DEFAULT_PARSER = 'html.parser'
+
+
+class HostLimiter:
+    """
+    Per-host concurrency and politeness limiter shared by concurrent fetches.
+
+    At most per_host requests run against a host at once, and when delay is
+    set, consecutive requests to the same host start at least delay seconds
+    apart.
+    """
+
+    def __init__(self, per_host=2, delay=0.0):
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._slots = defaultdict(lambda: threading.BoundedSemaphore(per_host))
+        self._next_start = {}
+        self._delays = {}
+
+    def set_delay(self, host, delay):
+        """Override the politeness delay for one host (e.g. robots.txt Crawl-delay)"""
+        with self._lock:
+            self._delays[host] = delay
+
+    def acquire(self, host, timeout=None):
+        """Wait for a slot on host; returns the slot to release, or None on timeout"""
+        started = time.monotonic()
+        with self._lock:
+            slot = self._slots[host]
+        if not slot.acquire(timeout=timeout):
+            return None
+        delay = self._delays.get(host, self.delay)
+        if delay:
+            with self._lock:
+                now = time.monotonic()
+                start_at = max(now, self._next_start.get(host, now))
+                self._next_start[host] = start_at + delay
+            wait = start_at - now
+            if timeout is not None and time.monotonic() - started + wait > timeout:
+                slot.release()
+                return None
+            if wait > 0:
+                time.sleep(wait)
+        return slot
+    
+    def try_acquire(self, host):
+        """
+        Take a slot on host without waiting. Returns (slot, 0.0) when a
+        request may start now, (None, seconds) while the politeness delay
+        has seconds left to run, and (None, None) while every slot is busy.
+        """
+        with self._lock:
+            now = time.monotonic()
+            start_at = self._next_start.get(host, now)
+            if start_at > now:
+                return None, start_at - now
+            if not self._slots[host].acquire(blocking=False):
+                return None, None
+            delay = self._delays.get(host, self.delay)
+            if delay:
+                self._next_start[host] = now + delay
+            return self._slots[host], 0.0
+
 
 class SimpleScraper:
-    def __init__(self):
+    def __init__(self, parser=None, cache=None, skill_matcher=None, max_bytes=2 * 1024 * 1024,
+                 session=None):
+        # BeautifulSoup tree builder; lxml is used when installed since it
+        # parses large pages several times faster than html.parser
+        self.parser = parser or DEFAULT_PARSER
+        # Optional HttpCache; repeat scrapes then revalidate with ETag /
+        # Last-Modified instead of downloading and parsing the page again
+        self.cache = cache
+        # Compiled skill taxonomy (see skills.py); shared across instances
+        self.skill_matcher = skill_matcher or default_matcher()
+        self.experience_extractor = ExperienceExtractor()
+        # Pages are streamed and cut off at max_bytes, bounding the memory a
+        # single scrape can take however large the page is
+        self.max_bytes = max_bytes
+        # How pages were extracted: 'structured' (JSON-LD / embedded JSON
+        # fast path) versus 'heuristic' (selector cascade), plus how many
+        # downloads were 'truncated' at max_bytes or stopped early
+        # ('early_stop') once a JobPosting payload had arrived and parsed
+        self.stats = Counter()
+        self._stats_lock = threading.Lock()
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
-        self.session = requests.Session()
+        # Pooled keep-alive transport with retries and backoff (transport.py)
+        self.session = session or build_session()
         self.session.headers.update(self.headers)
     
     def _extract_company_from_url(self, url):
@@ -21,6 +129,20 @@ class SimpleScraper:
         except:
             return "The Company"
     
+    def _error_fallback(self, url, error, description):
+        """Placeholder job record returned when a page cannot be scraped"""
+        return {
+            'error': error,
+            'role': 'Professional Role',
+            'experience': 'Experience varies',
+            'experience_years': None,
+            'skills': 'Relevant skills',
+            'description': description,
+            'company': self._extract_company_from_url(url),
+            'source': 'error_fallback',
+            'url': url
+        }
+    
     def _clean_text(self, text):
         """Clean and normalize text"""
         if not text:
@@ -29,21 +151,10 @@ class SimpleScraper:
         text = re.sub(r'\n+', ' ', text)   # Replace newlines
         return text.strip()
     
-    def _extract_role(self, soup, url):
+    def _extract_role(self, page, url):
         """Extract job role from page content"""
-        # Common selectors for job titles
-        role_selectors = [
-            'h1[class*="job"][class*="title"]',
-            'h1[class*="position"][class*="title"]',
-            '.job-title',
-            '.position-title',
-            '[data-cy="job-title"]',
-            'h1',
-            'title'
-        ]
-        
-        for selector in role_selectors:
-            elements = soup.select(selector)
+        # Candidates are bucketed per selector in priority order by PageIndex
+        for elements in page.role_candidates:
             for element in elements:
                 text = self._clean_text(element.get_text())
                 if text and len(text) > 5 and len(text) < 100:
@@ -52,7 +163,7 @@ class SimpleScraper:
                     return text
         
         # Fallback: try to extract from URL or page title
-        title = soup.find('title')
+        title = page.title
         if title:
             title_text = self._clean_text(title.get_text())
             # Remove common suffixes
@@ -63,90 +174,53 @@ class SimpleScraper:
         
         return "Professional Role"
     
-    def _extract_experience(self, soup):
-        """Extract experience requirements"""
-        experience_patterns = [
-            r'experience.*?(\d+[\+\-]?\d*.*?years?)',
-            r'(\d+[\+\-]?\d*.*?years?.*?experience)',
-            r'minimum.*?(\d+).*?years',
-            r'(\d+\+?)\s*years',
-            r'experience.*?(\d+\+?)',
-        ]
-        
-        text = soup.get_text().lower()
-        
-        for pattern in experience_patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE | re.DOTALL)
-            for match in matches:
-                exp_text = self._clean_text(match.group(1))
-                if exp_text and len(exp_text) < 50:
-                    return exp_text.title()
-        
-        return "Experience varies"
+    def _extract_experience(self, text):
+        """Extract experience requirements as an ExperienceRange, or None"""
+        return self.experience_extractor.extract(text)
     
-    def _extract_skills(self, soup):
+    @staticmethod
+    def _experience_fields(experience):
+        """The 'experience' / 'experience_years' record fields for a range"""
+        if experience is None:
+            return {'experience': "Experience varies", 'experience_years': None}
+        return {
+            'experience': experience.text,
+            'experience_years': [experience.min_years, experience.max_years]
+        }
+    
+    def _extract_skills(self, page):
         """Extract required skills"""
-        skill_keywords = [
-            'python', 'javascript', 'java', 'react', 'node', 'sql', 'cloud', 'aws', 'azure',
-            'docker', 'kubernetes', 'machine learning', 'ai', 'data analysis', 'communication',
-            'leadership', 'management', 'excel', 'word', 'powerpoint', 'project management',
-            'agile', 'scrum', 'marketing', 'sales', 'customer service', 'technical', 'design',
-            'development', 'programming', 'coding', 'analytics', 'finance', 'accounting',
-            'hr', 'human resources', 'recruitment', 'training', 'education', 'healthcare',
-            'engineering', 'manufacturing', 'logistics', 'supply chain', 'retail', 'ecommerce'
-        ]
-        
-        text = soup.get_text().lower()
-        found_skills = []
-        
-        # Look for skills sections
-        skill_section_selectors = [
-            '.skills', '.requirements', '.qualifications', '.responsibilities',
-            '[class*="skill"]', '[class*="requirement"]', '[class*="qualification"]'
-        ]
-        
-        skill_text = ""
-        for selector in skill_section_selectors:
-            elements = soup.select(selector)
-            for element in elements:
-                skill_text += " " + element.get_text().lower()
-        
-        if not skill_text:
-            skill_text = text
+        # Prefer the skills/requirements sections; nested matches are skipped
+        # so their text is not counted twice. Tags are compared by identity:
+        # bs4 hashes a Tag by serializing it, ancestors up to <html> included
+        sections = {id(element) for element in page.skill_sections}
+        skill_text = " ".join(
+            element.get_text(" ") for element in page.skill_sections
+            if not any(id(parent) in sections for parent in element.parents)
+        )
         
-        # Extract skills
-        for skill in skill_keywords:
-            if skill in skill_text and skill not in found_skills:
-                found_skills.append(skill)
+        if not skill_text.strip():
+            skill_text = page.text
         
-        return ', '.join(found_skills[:8]) if found_skills else "Various relevant skills"
+        found_skills = self.skill_matcher.rank(skill_text, limit=8)
+        return ', '.join(found_skills) if found_skills else "Various relevant skills"
     
-    def _extract_description(self, soup):
+    def _extract_description(self, page):
         """Extract job description"""
-        description_selectors = [
-            '.job-description',
-            '.position-description',
-            '.description',
-            '[class*="description"]',
-            '.role-details',
-            '.job-details',
-            'section',
-            'div[class*="content"]'
-        ]
-        
         description_text = ""
-        for selector in description_selectors:
-            elements = soup.select(selector)
+        # The last selector with a usable element wins, so walk them backwards
+        for elements in reversed(page.description_candidates):
             for element in elements:
                 text = self._clean_text(element.get_text())
                 if len(text) > 100 and len(text) < 2000:
                     description_text = text
                     break
+            if description_text:
+                break
         
         if not description_text:
             # Fallback: get meaningful text from the page
-            paragraphs = soup.find_all('p')
-            for p in paragraphs:
+            for p in page.paragraphs:
                 text = self._clean_text(p.get_text())
                 if len(text) > 50 and len(text) < 500:
                     description_text = text
@@ -157,60 +231,279 @@ class SimpleScraper:
         
         return description_text
     
-    def scrape_job_info(self, url):
+    def _job_from_posting(self, posting, url):
+        """Map a JobPosting payload onto the scrape_job_info record"""
+        description_html = posting_description_html(posting)
+        description = self._clean_text(BeautifulSoup(description_html, self.parser).get_text(" "))
+        skills = self.skill_matcher.rank(posting_skills_text(posting), limit=8)
+        if not skills:
+            skills = self.skill_matcher.rank(description, limit=8)
+        
+        # experienceRequirements is usually prose; fall back to the description
+        experience = (self._extract_experience(posting_experience(posting))
+                      or self._extract_experience(description))
+        
+        result = {
+            'role': self._clean_text(posting.get('title') or posting.get('name') or '') or "Professional Role",
+            'skills': ', '.join(skills) if skills else "Various relevant skills",
+            'description': description[:2000] or "This position requires a qualified professional with relevant experience and skills.",
+            'company': self._clean_text(posting_company(posting)) or self._extract_company_from_url(url),
+            'source': 'website',
+            'url': url
+        }
+        result.update(self._experience_fields(experience))
+        return result
+    
+    def transport_stats(self):
+        """Request, retry and connection-reuse counters for the scraper's session"""
+        return transport_stats(self.session)
+    
+    def _count(self, key):
+        with self._stats_lock:
+            self.stats[key] += 1
+    
+    @staticmethod
+    def _declared_charset(response):
+        """Charset from the Content-Type header, or None to let the parser sniff it"""
+        content_type = response.headers.get('Content-Type', '')
+        match = re.search(r'charset=["\']?([\w.:-]+)', content_type, re.IGNORECASE)
+        return match.group(1) if match else None
+    
+    @staticmethod
+    def _posting_arrived(body, start):
+        """
+        (arrived, resume): whether a data <script> mentioning JobPosting at
+        or after start has fully arrived and parses into a posting, and
+        where the next scan has to start. A script still downloading, or
+        one that fails to parse, does not count.
+        """
+        found = body.find(b'JobPosting', start)
+        while found != -1:
+            opened = body.rfind(b'<script', 0, found)
+            tag_end = body.find(b'>', opened)
+            if (opened != -1 and body.rfind(b'</script>', opened, found) == -1
+                    and re.search(rb'ld\+json|application/json|__NEXT_DATA__', body[opened:tag_end])):
+                closed = body.find(b'</script>', found)
+                if closed == -1:
+                    return False, found
+                if find_job_posting([body[tag_end + 1:closed].decode('utf-8', 'replace')]) is not None:
+                    return True, closed
+                found = body.find(b'JobPosting', closed)
+                continue
+            found = body.find(b'JobPosting', found + 1)
+        return False, max(len(body) - 16, start)
+    
+    def _read_capped(self, response, deadline, stop_early=True):
+        """
+        Read the streamed body up to max_bytes, stopping early where
+        possible. Returns (body, truncated), truncated True when the body
+        was cut at max_bytes.
+        """
+        body = bytearray()
+        scan_from = 0
+        for chunk in read_chunks(response, 64 * 1024, deadline):
+            body.extend(chunk)
+            if len(body) >= self.max_bytes:
+                del body[self.max_bytes:]
+                self._count('truncated')
+                return bytes(body), True
+            # A JobPosting payload is all the fast path needs, so the rest
+            # of the page does not have to be downloaded or parsed
+            if stop_early:
+                arrived, scan_from = self._posting_arrived(body, scan_from)
+                if arrived:
+                    self._count('early_stop')
+                    return bytes(body), False
+        return bytes(body), False
+    
+    def fetch_html(self, url, timeout=10, headers=None, stop_early=True, content_types=HTML_CONTENT_TYPES):
+        """
+        Fetch url as a streamed, size-capped HTML document.
+        
+        Returns (response, body) with the response already closed; body is
+        None when the server answered 304 Not Modified, and
+        response.truncated is True when body was cut at max_bytes. Content
+        types other than content_types (HTML by default, None for any) are
+        rejected before their body is read, and timeout
+        bounds the whole fetch, retries, backoff and every socket read
+        included (see transport.Deadline). With stop_early, the download
+        ends as soon as a JobPosting payload has been received and parsed.
+        """
+        if timeout is not None and timeout <= 0:
+            raise requests.exceptions.Timeout(f'No time left to fetch {url}')
+        deadline = Deadline(timeout) if timeout is not None else None
+        response = self.session.get(url, timeout=deadline, headers=headers, stream=True)
+        try:
+            if response.status_code == 304:
+                return response, None
+            response.raise_for_status()
+            content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+            if content_types and content_type and content_type not in content_types:
+                raise ValueError(f'Unsupported content type: {content_type}')
+            body, response.truncated = self._read_capped(response, deadline, stop_early)
+            return response, body
+        finally:
+            response.close()
+    
+    def parse_job_page(self, body, url, encoding=None):
+        """Extract the job record from a fetched page body"""
+        soup = BeautifulSoup(body, self.parser, from_encoding=encoding)
+        
+        # Remove unwanted elements, keeping any embedded JSON payloads
+        payloads = []
+        for element in soup(['script', 'style', 'nav', 'footer', 'header']):
+            if element.name == 'script' and is_data_script(element):
+                payloads.append(element.string)
+            element.decompose()
+        
+        # Fast path: ATS pages usually ship a schema.org JobPosting
+        posting = find_job_posting(payloads)
+        if posting is not None:
+            self._count('structured')
+            return self._job_from_posting(posting, url)
+        
+        # Index the page in one pass, then extract information
+        page = PageIndex(soup)
+        result = {
+            'role': self._extract_role(page, url),
+            'skills': self._extract_skills(page),
+            'description': self._extract_description(page),
+            'company': self._extract_company_from_url(url),
+            'source': 'website',
+            'url': url
+        }
+        result.update(self._experience_fields(self._extract_experience(page.text)))
+        self._count('heuristic')
+        return result
+    
+    def scrape_job_info(self, url, timeout=10):
         """Main method to scrape job information from URL"""
         try:
             # Validate URL
             if not url.startswith(('http://', 'https://')):
-                return {
-                    'error': 'Invalid URL format. Please include http:// or https://'
-                }
+                return self._error_fallback(
+                    url,
+                    'Invalid URL format. Please include http:// or https://',
+                    'Could not extract job details from the URL.'
+                )
             
-            # Fetch the webpage
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-            
-            # Parse HTML
-            soup = BeautifulSoup(response.content, 'html.parser')
+            # Serve from the cache while fresh, otherwise revalidate
+            entry = self.cache.get(url, EXTRACTOR_VERSION) if self.cache else None
+            if entry and self.cache.is_fresh(entry):
+                return dict(entry['result'])
             
-            # Remove unwanted elements
-            for element in soup(['script', 'style', 'nav', 'footer', 'header']):
-                element.decompose()
-            
-            # Extract information
-            company = self._extract_company_from_url(url)
-            role = self._extract_role(soup, url)
-            experience = self._extract_experience(soup)
-            skills = self._extract_skills(soup)
-            description = self._extract_description(soup)
+            # Fetch the webpage
+            headers = self.cache.conditional_headers(entry) if entry else None
+            response, body = self.fetch_html(url, timeout=timeout, headers=headers)
+            if body is None:
+                if not entry:
+                    raise ValueError('Server answered 304 to an unconditional request')
+                self.cache.revalidated(url, entry, response.headers)
+                return dict(entry['result'])
             
-            return {
-                'role': role,
-                'experience': experience,
-                'skills': skills,
-                'description': description,
-                'company': company,
-                'source': 'website',
-                'url': url
-            }
+            result = self.parse_job_page(body, url, self._declared_charset(response))
+            # A record taken from part of a page is not worth keeping
+            if self.cache and not response.truncated:
+                self.cache.put(url, response.headers, result, EXTRACTOR_VERSION)
+            return result
             
         except requests.exceptions.RequestException as e:
-            return {
-                'error': f'Failed to access the website: {str(e)}',
-                'role': 'Professional Role',
-                'experience': 'Experience varies',
-                'skills': 'Relevant skills',
-                'description': 'Could not extract job details from the URL.',
-                'company': self._extract_company_from_url(url),
-                'source': 'error_fallback'
-            }
+            return self._error_fallback(
+                url,
+                f'Failed to access the website: {str(e)}',
+                'Could not extract job details from the URL.'
+            )
         except Exception as e:
-            return {
-                'error': f'An error occurred: {str(e)}',
-                'role': 'Professional Role',
-                'experience': 'Experience varies',
-                'skills': 'Relevant skills',
-                'description': 'Error extracting job information.',
-                'company': self._extract_company_from_url(url),
-                'source': 'error_fallback'
-            }
+            return self._error_fallback(
+                url,
+                f'An error occurred: {str(e)}',
+                'Error extracting job information.'
+            )
+    
+    def _scrape_in_slot(self, url, timeout, slot):
+        try:
+            return self.scrape_job_info(url, timeout=timeout)
+        finally:
+            slot.release()
+    
+    def scrape_many(self, urls, max_workers=8, per_host=2, deadline=30, limiter=None):
+        """
+        Scrape many job URLs concurrently, yielding each result as soon as it
+        finishes (completion order, not input order).
+        
+        max_workers caps the total number of in-flight fetches and per_host
+        the fetches against any single host. URLs wait in a queue per host
+        and are handed to a worker only once their host has a free slot, so
+        a list dominated by one slow host does not hold up the others.
+        deadline is the wall-clock budget of each URL in seconds, from when
+        it reaches the front of its host's queue: it covers the wait for a
+        slot and the whole fetch (see fetch_html). Every yielded dict has
+        the same shape as the return value of scrape_job_info, including
+        error_fallback records.
+        
+        Pass a HostLimiter as limiter to share per-host limits and politeness
+        delays across several calls (per_host is then ignored). URLs still
+        queued when the consumer stops iterating are never fetched.
+        """
+        host_slots = limiter or HostLimiter(per_host)
+        queues = OrderedDict()
+        for url in urls:
+            if not isinstance(url, str) or not url.startswith(('http://', 'https://')):
+                yield self._error_fallback(
+                    url,
+                    'Invalid URL format. Please include http:// or https://',
+                    'Could not extract job details from the URL.'
+                )
+                continue
+            queues.setdefault(urlparse(url).netloc.lower(), deque()).append(url)
+        # When the URL at the front of each host's queue got there
+        fronts = dict.fromkeys(queues, time.monotonic())
+        
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        running = {}
+        try:
+            while queues or running:
+                next_check = 0.1
+                dispatched = True
+                while dispatched:
+                    # One URL per host per pass, so hosts take turns at free workers
+                    dispatched = False
+                    now = time.monotonic()
+                    for host in list(queues):
+                        pending = queues[host]
+                        while pending and deadline is not None and now - fronts[host] >= deadline:
+                            yield self._error_fallback(
+                                pending.popleft(),
+                                f'Deadline of {deadline}s exceeded while waiting for {host}',
+                                'Could not extract job details from the URL.'
+                            )
+                            fronts[host] = now
+                        if pending and len(running) < max_workers:
+                            slot, wait_for = host_slots.try_acquire(host)
+                            if slot is not None:
+                                remaining = deadline - (now - fronts[host]) if deadline is not None else None
+                                future = executor.submit(self._scrape_in_slot, pending.popleft(), remaining, slot)
+                                running[future] = slot
+                                fronts[host] = now
+                                dispatched = True
+                            elif wait_for is not None:
+                                next_check = min(next_check, wait_for)
+                        if not pending:
+                            del queues[host], fronts[host]
+                        elif deadline is not None:
+                            next_check = min(next_check, deadline - (now - fronts[host]))
+                
+                if running:
+                    done, _ = wait(running, timeout=max(next_check, 0), return_when=FIRST_COMPLETED)
+                    for future in done:
+                        del running[future]
+                        yield future.result()
+                elif queues:
+                    # Slots held elsewhere (a shared limiter) or a politeness delay
+                    time.sleep(max(next_check, 0))
+        finally:
+            # Fetches already running finish within their deadline
+            for future, slot in running.items():
+                if future.cancel():
+                    slot.release()
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,166 @@
+# skills.py
+import csv
+import os
+import re
+from collections import Counter
+from functools import lru_cache
+
+import numpy as np
+
+TAXONOMY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resource', 'skills_taxonomy.csv')
+
+# Skill-shaped tokens: keeps "c++", "c#", "node.js", ".net" and "r&d" whole,
+# while "-" and "/" split so "ci/cd" and "ci cd" tokenize the same way
+_TOKEN_RE = re.compile(r'\.?[A-Za-z0-9][A-Za-z0-9+#&]*(?:\.[A-Za-z0-9+#&]+)*')
+
+# Trie terminal key: tokens are never empty, and unlike a bare object() the
+# key survives pickling, so a matcher can be shipped to worker processes
+_END = ''
+
+
+def tokenize(text):
+    """Split text into skill-matching tokens, preserving case"""
+    return _TOKEN_RE.findall(text or "")
+
+
+class SkillMatcher:
+    """
+    Multi-pattern skill matcher over a token trie.
+
+    Every surface form (canonical name or alias) is tokenized and inserted
+    into a trie keyed on tokens, so matching is a single scan over the text's
+    tokens with a bounded walk from each position. The cost depends on the
+    text length and the longest phrase, not on the size of the taxonomy,
+    and matches always fall on token boundaries ("ai" never matches
+    "maintain"). Forms listed as exact are only matched with their original
+    casing, which keeps ambiguous names such as "Go" or "Spring" from
+    matching ordinary words.
+    """
+
+    def __init__(self, entries=()):
+        self._trie = {}
+        self.max_phrase = 0
+        self.canonical = []
+        for entry in entries:
+            self.add(*entry)
+
+    def add(self, skill, aliases=(), exact=()):
+        """Register a canonical skill with its case-insensitive aliases and exact-case forms"""
+        self.canonical.append(skill)
+        exact_lower = {form.lower() for form in exact}
+        forms = [(alias, False) for alias in aliases]
+        if skill.lower() not in exact_lower:
+            forms.insert(0, (skill, False))
+        forms.extend((form, True) for form in exact)
+
+        for form, case_sensitive in forms:
+            tokens = tokenize(form)
+            if not tokens:
+                continue
+            node = self._trie
+            for token in tokens:
+                node = node.setdefault(token.lower(), {})
+            # Terminal: list of (canonical, exact-case tokens or None)
+            node.setdefault(_END, []).append((skill, tuple(tokens) if case_sensitive else None))
+            self.max_phrase = max(self.max_phrase, len(tokens))
+
+    def find(self, text):
+        """Yield (canonical skill, token position) for every leftmost-longest match"""
+        tokens = tokenize(text)
+        lowered = [token.lower() for token in tokens]
+        n = len(tokens)
+        trie = self._trie
+        i = 0
+        while i < n:
+            node = trie.get(lowered[i])
+            best = None
+            j = i
+            while node is not None:
+                j += 1
+                for skill, exact in node.get(_END, ()):
+                    if exact is None or tuple(tokens[i:j]) == exact:
+                        best = (skill, j)
+                        break
+                if j >= n:
+                    break
+                node = node.get(lowered[j])
+            if best:
+                yield best[0], i
+                i = best[1]
+            else:
+                i += 1
+
+    def rank(self, text, limit=None):
+        """Canonical skills found in text, most frequent first, ties by first appearance"""
+        counts = Counter()
+        first_seen = {}
+        for skill, position in self.find(text):
+            counts[skill] += 1
+            first_seen.setdefault(skill, position)
+        ranked = sorted(counts, key=lambda skill: (-counts[skill], first_seen[skill]))
+        return ranked[:limit] if limit else ranked
+
+
+def load_taxonomy(path=TAXONOMY_PATH):
+    """
+    Build a SkillMatcher from a taxonomy CSV with columns 'Skill' and
+    optionally 'Aliases' and 'Exact' ('|'-separated surface forms).
+    """
+    matcher = SkillMatcher()
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            skill = (row.get('Skill') or '').strip()
+            if not skill:
+                continue
+            aliases = [a.strip() for a in (row.get('Aliases') or '').split('|') if a.strip()]
+            exact = [e.strip() for e in (row.get('Exact') or '').split('|') if e.strip()]
+            matcher.add(skill, aliases, exact)
+    return matcher
+
+
+@lru_cache(maxsize=None)
+def default_matcher():
+    """Shared matcher for the bundled taxonomy, compiled on first use"""
+    return load_taxonomy()
+
+
+class SkillVocabulary:
+    """
+    Interns every canonical skill of a SkillMatcher to a small integer ID,
+    so a text's skills can be held as a packed bitset: bit i of an array of
+    uint64 words is set when skill ID i occurs. Aliases resolve to their
+    canonical skill, so "JS" and "JavaScript" set the same bit.
+    """
+
+    def __init__(self, matcher):
+        self.matcher = matcher
+        self.ids = {}
+        for skill in matcher.canonical:
+            self.ids.setdefault(skill, len(self.ids))
+        self.skills = list(self.ids)
+        self.words = max(1, (len(self.ids) + 63) // 64)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def encode(self, text):
+        """Sorted IDs of the canonical skills found in text"""
+        return sorted({self.ids[skill] for skill, _ in self.matcher.find(text)})
+
+    def decode(self, bits):
+        """Canonical skills whose bits are set in one packed bitset"""
+        ids = np.flatnonzero(np.unpackbits(np.asarray(bits, dtype='<u8').view(np.uint8), bitorder='little'))
+        return [self.skills[i] for i in ids.tolist()]
+
+    def bitsets(self, texts):
+        """(len(texts) x words) uint64 array with one packed bitset per text"""
+        bits = np.zeros((len(texts), self.words * 64), dtype=bool)
+        for i, text in enumerate(texts):
+            bits[i, self.encode(text)] = True
+        return np.packbits(bits, axis=1, bitorder='little').view('<u8')
+
+
+@lru_cache(maxsize=None)
+def default_vocabulary():
+    """Skill IDs of the bundled taxonomy"""
+    return SkillVocabulary(default_matcher())
@@ -0,0 +1,103 @@
+# structured_data.py
+import html
+import json
+
+# Script types that carry machine-readable page data rather than code
+DATA_SCRIPT_TYPES = ('application/ld+json', 'application/json')
+
+# Bounds on how much of an embedded payload is searched for a posting
+_MAX_DEPTH = 12
+_MAX_NODES = 20000
+
+# Keys that, next to title and description, mark a plain JSON object as a job
+# posting when it carries no schema.org @type (e.g. Next.js page props)
+_POSTING_HINTS = ('datePosted', 'employmentType', 'hiringOrganization', 'jobLocation',
+                  'validThrough', 'experienceRequirements', 'qualifications')
+
+
+def is_data_script(tag):
+    """True for <script> tags holding JSON-LD or framework state such as __NEXT_DATA__"""
+    script_type = (tag.get('type') or '').split(';')[0].strip().lower()
+    return script_type in DATA_SCRIPT_TYPES or tag.get('id') == '__NEXT_DATA__'
+
+
+def _is_job_posting(node):
+    node_type = node.get('@type')
+    types = node_type if isinstance(node_type, list) else [node_type]
+    if 'JobPosting' in types:
+        return True
+    return (isinstance(node.get('title'), str) and isinstance(node.get('description'), str)
+            and any(key in node for key in _POSTING_HINTS))
+
+
+def _search(data):
+    # Iterative walk so deeply nested payloads cannot blow the stack
+    stack = [(data, 0)]
+    seen = 0
+    while stack and seen < _MAX_NODES:
+        node, depth = stack.pop()
+        seen += 1
+        if isinstance(node, dict):
+            if _is_job_posting(node):
+                return node
+            children = node.values()
+        elif isinstance(node, list):
+            children = node
+        else:
+            continue
+        if depth < _MAX_DEPTH:
+            stack.extend((child, depth + 1) for child in reversed(list(children))
+                         if isinstance(child, (dict, list)))
+    return None
+
+
+def find_job_posting(payloads):
+    """Return the first JobPosting-shaped object found in the raw JSON payloads"""
+    for payload in payloads:
+        if not payload:
+            continue
+        try:
+            data = json.loads(payload, strict=False)
+        except ValueError:
+            continue
+        posting = _search(data)
+        if posting is not None:
+            return posting
+    return None
+
+
+def _as_text(value):
+    if isinstance(value, list):
+        return ", ".join(_as_text(v) for v in value if v)
+    if isinstance(value, dict):
+        return _as_text(value.get('name') or value.get('description') or '')
+    return str(value) if value is not None else ""
+
+
+def posting_company(posting):
+    organization = posting.get('hiringOrganization')
+    if isinstance(organization, dict):
+        return _as_text(organization.get('name'))
+    return _as_text(organization)
+
+
+def posting_experience(posting):
+    """Experience text from experienceRequirements, or '' when absent"""
+    requirement = posting.get('experienceRequirements')
+    if isinstance(requirement, dict):
+        months = requirement.get('monthsOfExperience')
+        try:
+            years = max(1, round(float(months) / 12))
+        except (TypeError, ValueError):
+            return _as_text(requirement.get('description', ''))
+        return f"{years}+ Years"
+    return _as_text(requirement)
+
+
+def posting_description_html(posting):
+    """The description as HTML; JSON-LD frequently ships it entity-escaped"""
+    return html.unescape(_as_text(posting.get('description')))
+
+
+def posting_skills_text(posting):
+    return " ".join(_as_text(posting.get(key)) for key in ('skills', 'qualifications', 'occupationalCategory'))
@@ -0,0 +1,175 @@
+# template_pack.py
+import json
+import os
+import string
+import threading
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'templates')
+DEFAULT_PACK = os.path.join(TEMPLATES_DIR, 'professional.json')
+
+# The only names a template may use, filled in by EmailGenerator
+PLACEHOLDERS = frozenset({'role', 'company', 'industry', 'value', 'skills', 'experience', 'links'})
+LEVELS = ('technical', 'non_technical', 'executive')
+LEVEL_SECTIONS = ('greetings', 'introductions', 'value_propositions', 'achievement_statements')
+SHARED_SECTIONS = ('company_praise', 'portfolio_mentions', 'call_to_actions', 'closings')
+# Sections a pack may leave out; rendering skips them
+OPTIONAL_SECTIONS = ('achievement_statements',)
+
+_formatter = string.Formatter()
+
+
+class TemplateError(ValueError):
+    """A template pack that cannot be loaded"""
+
+
+class Template:
+    """
+    A str.format template split once into literal text and placeholder
+    names, so rendering does no parsing. literals always has one more item
+    than fields.
+    """
+
+    __slots__ = ('text', 'literals', 'fields')
+
+    def __init__(self, text):
+        self.text = text
+        self.literals = ['']
+        self.fields = []
+        for literal, field, spec, conversion in _formatter.parse(text):
+            self.literals[-1] += literal
+            if field is None:
+                continue
+            if field not in PLACEHOLDERS:
+                raise TemplateError(f"unknown placeholder {{{field}}} in {text!r}; "
+                                    f"allowed: {', '.join(sorted(PLACEHOLDERS))}")
+            if spec or conversion:
+                raise TemplateError(f"format specs and conversions are not supported: {text!r}")
+            self.fields.append(field)
+            self.literals.append('')
+
+    def render(self, values):
+        """The template with every placeholder replaced by values[name]"""
+        parts = [self.literals[0]]
+        for field, literal in zip(self.fields, self.literals[1:]):
+            parts.append(values[field])
+            parts.append(literal)
+        return ''.join(parts)
+
+
+class TemplatePack:
+    """
+    Compiled email templates for every role level.
+
+    A pack file is JSON in one of two layouts: per-level sections under
+    "technical", "non_technical" and "executive" next to a "shared" object
+    (see templates/professional.json), or flat, with every section at the
+    top level and used for all levels (see templates/email_templates.json).
+    Every template is compiled and its placeholders checked when the pack
+    is loaded, so a broken pack fails there and never while rendering.
+    """
+
+    def __init__(self, levels, shared, path=None):
+        self.levels = levels
+        self.shared = shared
+        self.path = path
+
+    @classmethod
+    def from_dict(cls, data, path=None):
+        if not isinstance(data, dict):
+            raise TemplateError(f"{path or 'template pack'}: expected a JSON object")
+        if any(level in data for level in LEVELS):
+            missing = [level for level in LEVELS if level not in data]
+            if missing:
+                raise TemplateError(f"{path or 'template pack'}: missing levels {', '.join(missing)}")
+            sources = {level: data[level] for level in LEVELS}
+            shared_source = data.get('shared', {})
+        else:
+            sources = {level: data for level in LEVELS}
+            shared_source = data
+
+        def compile_sections(source, names, where):
+            sections = {}
+            for name in names:
+                texts = source.get(name)
+                if texts is None and name in OPTIONAL_SECTIONS:
+                    texts = []
+                if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts) or \
+                        (not texts and name not in OPTIONAL_SECTIONS):
+                    raise TemplateError(f"{path or 'template pack'}: {where}{name} must be a non-empty list of strings")
+                try:
+                    sections[name] = [Template(text) for text in texts]
+                except TemplateError as e:
+                    raise TemplateError(f"{path or 'template pack'}: {where}{name}: {e}") from None
+            return sections
+
+        levels = {level: compile_sections(source, LEVEL_SECTIONS, f"{level}." if source is not data else '')
+                  for level, source in sources.items()}
+        shared = compile_sections(shared_source, SHARED_SECTIONS, 'shared.' if shared_source is not data else '')
+        return cls(levels, shared, path)
+
+    @classmethod
+    def load(cls, path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except ValueError as e:
+            raise TemplateError(f"{path}: invalid JSON ({e})") from None
+        return cls.from_dict(data, path)
+
+
+class TemplateLibrary:
+    """
+    The current TemplatePack of a file, reloaded when the file changes.
+
+    pack is replaced by a single assignment once the new file has loaded
+    and validated, so a render in progress keeps the pack it started with.
+    A file that fails to load leaves the previous pack in place. Packs are
+    shared by every library on the same unchanged file.
+    """
+
+    _loaded = {}
+    _loaded_lock = threading.Lock()
+
+    def __init__(self, path=DEFAULT_PACK):
+        self.path = path
+        self.errors = 0
+        self.last_error = None
+        self._stamp = self._file_stamp()
+        self.pack = self._load(self._stamp)
+
+    def _file_stamp(self):
+        stat = os.stat(self.path)
+        return os.path.abspath(self.path), stat.st_mtime_ns, stat.st_size
+
+    @classmethod
+    def _load(cls, stamp):
+        with cls._loaded_lock:
+            pack = cls._loaded.get(stamp)
+        if pack is None:
+            pack = TemplatePack.load(stamp[0])
+            with cls._loaded_lock:
+                # Keep only the newest version of each file
+                for key in [key for key in cls._loaded if key[0] == stamp[0]]:
+                    del cls._loaded[key]
+                cls._loaded[stamp] = pack
+        return pack
+
+    def reload(self):
+        """Load the file again if it changed; returns True if the pack was replaced"""
+        try:
+            stamp = self._file_stamp()
+        except OSError as e:
+            self.errors += 1
+            self.last_error = e
+            return False
+        if stamp == self._stamp:
+            return False
+        try:
+            pack = self._load(stamp)
+        except (OSError, TemplateError) as e:
+            self.errors += 1
+            self.last_error = e
+            return False
+        self._stamp = stamp
+        self.pack = pack
+        return True
@@ -0,0 +1,109 @@
+# tfidf_index.py
+import numpy as np
+from scipy import sparse
+from skills import tokenize
+
+
+def skill_tokens(text):
+    """Lowercased skill tokens ("Node.js, C++" -> ["node.js", "c++"])"""
+    return [token.lower() for token in tokenize(text)]
+
+
+def _count_matrix(token_lists, vocabulary):
+    """Raw token counts for token_lists, adding unseen tokens to vocabulary"""
+    indptr, indices = [0], []
+    for tokens in token_lists:
+        for token in tokens:
+            column = vocabulary.get(token)
+            if column is None:
+                column = vocabulary[token] = len(vocabulary)
+            indices.append(column)
+        indptr.append(len(indices))
+    counts = sparse.csr_matrix((np.ones(len(indices), dtype=np.float32), indices, indptr),
+                               shape=(len(token_lists), len(vocabulary)))
+    counts.sum_duplicates()
+    return counts
+
+
+def _weigh(counts, idf):
+    """counts (CSR) scaled by idf and l2-normalized per row, in place"""
+    counts.data *= idf[counts.indices]
+    row_of = np.repeat(np.arange(counts.shape[0]), np.diff(counts.indptr))
+    norms = np.sqrt(np.bincount(row_of, weights=counts.data ** 2, minlength=counts.shape[0]))
+    norms[norms == 0] = 1.0
+    counts.data /= norms[row_of].astype(np.float32)
+    return counts
+
+
+class TfidfIndex:
+    """
+    Immutable skill-token TF-IDF index over the rows of a PortfolioStore.
+
+    Weights follow TfidfVectorizer's defaults (raw counts, smoothed idf,
+    l2-normalized rows), so scores match a fresh sklearn fit. Next to the
+    weighted matrix it keeps the inverted form (token -> posting list of
+    rows and weights) and the raw per-row counts, so build() can derive the
+    index for an edited portfolio from the previous one by tokenizing only
+    the rows whose content changed; re-weighting is a few vectorized passes.
+    """
+
+    def __init__(self, store, vocabulary, counts):
+        self.store = store
+        self.vocabulary = vocabulary
+        self.counts = counts
+        self.df = np.bincount(counts.indices, minlength=len(vocabulary))
+        self.idf = (np.log((1 + len(store)) / (1 + self.df)) + 1).astype(np.float32)
+        self.matrix = _weigh(counts.copy(), self.idf)
+        # Inverted index: one posting list of (row, weight) per token
+        self.postings = self.matrix.T.tocsr()
+        self.reused = 0
+
+    def __len__(self):
+        return len(self.store)
+
+    @classmethod
+    def build(cls, store, previous=None):
+        """
+        Index the rows of store, reusing the token counts of rows with
+        unchanged content from previous
+        """
+        if previous is not None:
+            reused_at, reused_from, fresh_at = store.match(previous.store)
+        else:
+            reused_at = reused_from = np.zeros(0, dtype=np.int64)
+            fresh_at = np.arange(len(store))
+
+        vocabulary = dict(previous.vocabulary) if previous is not None else {}
+        if len(fresh_at) > len(store) // 4:
+            techstacks = store.column("techstack")
+            fresh_texts = [techstacks[i] for i in fresh_at]
+        else:
+            fresh_texts = [store.value(i, "techstack") for i in fresh_at.tolist()]
+        fresh = _count_matrix([skill_tokens(text) for text in fresh_texts], vocabulary)
+        parts = [fresh]
+        if len(reused_from):
+            old = previous.counts[reused_from]
+            old.resize((len(reused_from), len(vocabulary)))
+            parts.insert(0, old)
+        counts = sparse.vstack(parts, format='csr')
+        # vstack order is reused rows then fresh rows; put them back in file order
+        order = np.empty(len(store), dtype=np.int64)
+        order[np.concatenate([reused_at, fresh_at])] = np.arange(len(store))
+        counts = counts[order] if len(store) else sparse.csr_matrix((0, len(vocabulary)), dtype=np.float32)
+
+        # Drop tokens no row uses any more so the vocabulary cannot grow forever
+        used = np.bincount(counts.indices, minlength=len(vocabulary)) > 0
+        if not used.all():
+            remap = np.cumsum(used) - 1
+            vocabulary = {token: int(remap[column]) for token, column in vocabulary.items() if used[column]}
+            counts = sparse.csr_matrix((counts.data, remap[counts.indices], counts.indptr),
+                                       shape=(len(store), len(vocabulary)))
+
+        index = cls(store, vocabulary, counts)
+        index.reused = len(reused_at)
+        return index
+
+    def transform(self, texts):
+        """TF-IDF query vectors (len(texts) x vocabulary); unknown tokens are ignored"""
+        token_lists = [[t for t in skill_tokens(text) if t in self.vocabulary] for text in texts]
+        return _weigh(_count_matrix(token_lists, self.vocabulary), self.idf)
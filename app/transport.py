@@ -0,0 +1,228 @@
+# transport.py
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import DecodeError, ProtocolError, ReadTimeoutError
+from urllib3.util.retry import Retry
+from urllib3.util.timeout import Timeout
+
+# Statuses worth retrying: rate limiting and transient server-side failures
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# The Deadline of the request each thread is sending, for TransportRetry
+_active = threading.local()
+
+
+class Deadline(Timeout):
+    """
+    Timeout for a whole request, retries included: pass it as the timeout
+    of a request on a build_session() session. Every attempt's connect and
+    read timeouts are capped by the time left, and TransportRetry gives up
+    rather than wait past it for a backoff or a Retry-After.
+    """
+
+    def __init__(self, seconds):
+        super().__init__(connect=seconds, read=seconds)
+        self.seconds = seconds
+        self.expires = time.monotonic() + seconds
+
+    def remaining(self):
+        return self.expires - time.monotonic()
+
+    def clone(self):
+        # urllib3 clones the timeout for each attempt
+        left = max(self.remaining(), 0.001)
+        return Timeout(connect=left, read=left)
+
+
+class TransportRetry(Retry):
+    """
+    urllib3 Retry with random jitter on the exponential backoff and a cap on
+    how long a server's Retry-After header may make us wait.
+    """
+
+    def __init__(self, *args, jitter=0.5, max_retry_after=60, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.jitter = jitter
+        self.max_retry_after = max_retry_after
+
+    def new(self, **kwargs):
+        # Retry.new() rebuilds the object from its known parameters only
+        retry = super().new(**kwargs)
+        retry.jitter = self.jitter
+        retry.max_retry_after = self.max_retry_after
+        return retry
+
+    def increment(self, *args, **kwargs):
+        retry = super().increment(*args, **kwargs)
+        # Kept for the error raised when a Deadline stops the retries
+        retry.pool = kwargs.get('_pool')
+        return retry
+
+    def get_backoff_time(self):
+        backoff = super().get_backoff_time()
+        if backoff and self.jitter:
+            backoff += random.uniform(0, backoff * self.jitter)
+        return backoff
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, self.max_retry_after)
+
+    def sleep(self, response=None):
+        wait = None
+        if self.respect_retry_after_header and response:
+            wait = self.get_retry_after(response)
+        if not wait:
+            wait = self.get_backoff_time()
+        deadline = getattr(_active, 'deadline', None)
+        if deadline is not None and wait >= deadline.remaining():
+            url = self.history[-1].url if self.history else None
+            raise ReadTimeoutError(getattr(self, 'pool', None), url,
+                                   f'Retrying after {wait:.1f}s would pass the {deadline.seconds}s deadline')
+        if wait > 0:
+            time.sleep(wait)
+
+
+class TransportAdapter(HTTPAdapter):
+    """HTTPAdapter that counts requests, retries and connection reuse"""
+
+    def __init__(self, *args, **kwargs):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        timeout = kwargs.get('timeout')
+        _active.deadline = timeout if isinstance(timeout, Deadline) else None
+        try:
+            response = super().send(request, **kwargs)
+        except requests.exceptions.RequestException:
+            with self._lock:
+                self.requests += 1
+                self.failures += 1
+            raise
+        finally:
+            _active.deadline = None
+        retries = getattr(response.raw, 'retries', None)
+        with self._lock:
+            self.requests += 1
+            self.retries += len(retries.history) if retries else 0
+        return response
+
+    def stats(self):
+        """Counters for this adapter; connection counts cover pools still alive"""
+        connections = pooled_requests = 0
+        pools = self.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is not None:
+                connections += pool.num_connections
+                pooled_requests += pool.num_requests
+        with self._lock:
+            requests_sent, retries, failures = self.requests, self.retries, self.failures
+        return {
+            'requests': requests_sent,
+            'retries': retries,
+            'failures': failures,
+            'retry_rate': retries / requests_sent if requests_sent else 0.0,
+            'connections_opened': connections,
+            'connections_reused': max(pooled_requests - connections, 0),
+            'reuse_rate': (pooled_requests - connections) / pooled_requests if pooled_requests else 0.0
+        }
+
+
+def build_session(pool_connections=16, pool_maxsize=16, retries=3, backoff_factor=0.5,
+                  jitter=0.5, max_retry_after=60, status_forcelist=RETRY_STATUSES):
+    """
+    requests.Session with a tuned, instrumented transport.
+
+    pool_connections is the number of hosts whose connection pools are kept,
+    pool_maxsize the keep-alive connections kept per host (size it to the
+    per-host concurrency). Failed GET/HEAD requests and retryable statuses
+    are retried up to retries times with jittered exponential backoff,
+    honoring Retry-After on 429/503 up to max_retry_after seconds. Those
+    waits are unbounded in total unless the request's timeout is a Deadline.
+    """
+    retry = TransportRetry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=status_forcelist,
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+        jitter=jitter,
+        max_retry_after=max_retry_after
+    )
+    adapter = TransportAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                               max_retries=retry)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def _set_read_timeout(response, seconds):
+    connection = getattr(response.raw, 'connection', None) or getattr(response.raw, '_connection', None)
+    sock = getattr(connection, 'sock', None)
+    if sock is not None:
+        sock.settimeout(seconds)
+
+
+def read_chunks(response, chunk_size=64 * 1024, deadline=None):
+    """
+    Yield the body of a streamed response as it arrives, in pieces of at
+    most chunk_size bytes. With a Deadline, every socket read waits no
+    longer than the time left, so a body trickling in byte by byte cannot
+    outlast it either.
+    """
+    # urllib3 2's read1 returns whatever one socket read brings; older
+    # versions only have reads that fill a whole chunk
+    read1 = getattr(response.raw, 'read1', None)
+    chunks = None if read1 else response.iter_content(chunk_size)
+    while True:
+        if deadline is not None:
+            remaining = deadline.remaining()
+            if remaining <= 0:
+                raise requests.exceptions.ReadTimeout(f'Read exceeded the {deadline.seconds}s deadline')
+            _set_read_timeout(response, remaining)
+        if chunks is not None:
+            chunk = next(chunks, None)
+        else:
+            # The exceptions iter_content would raise for the same errors
+            try:
+                chunk = read1(chunk_size, decode_content=True)
+            except ReadTimeoutError as e:
+                raise requests.exceptions.ReadTimeout(e)
+            except ProtocolError as e:
+                raise requests.exceptions.ChunkedEncodingError(e)
+            except DecodeError as e:
+                raise requests.exceptions.ContentDecodingError(e)
+        if not chunk:
+            return
+        yield chunk
+
+
+def transport_stats(session):
+    """Combined TransportAdapter counters for every adapter mounted on session"""
+    totals = {}
+    adapters = {id(a): a for a in session.adapters.values() if isinstance(a, TransportAdapter)}
+    for adapter in adapters.values():
+        for key, value in adapter.stats().items():
+            if not key.endswith('_rate'):
+                totals[key] = totals.get(key, 0) + value
+    sent = totals.get('requests', 0)
+    pooled = totals.get('connections_opened', 0) + totals.get('connections_reused', 0)
+    totals['retry_rate'] = totals.get('retries', 0) / sent if sent else 0.0
+    totals['reuse_rate'] = totals.get('connections_reused', 0) / pooled if pooled else 0.0
+    return totals
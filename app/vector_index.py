@@ -0,0 +1,231 @@
+# vector_index.py
+import json
+import mmap
+import os
+import shutil
+import tempfile
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer
+
+# Indexes up to this many vectors are always searched exactly: a full scan
+# then costs about as much as probing enough lists for good recall
+EXACT_MAX_ROWS = 16384
+
+
+class HashingEmbedder:
+    """
+    Deterministic, offline text embedder: hashed character n-grams, L2
+    normalized. It needs no model download and gives the same vectors on
+    every machine, so saved indexes stay valid across runs.
+
+    Any object with a name, a dim and an embed(texts) method returning an
+    (n, dim) float32 array of unit vectors can be used in its place, e.g. a
+    wrapper around a sentence-transformers model for real semantic matches.
+    """
+
+    def __init__(self, dim=256, ngram_range=(3, 4)):
+        self.dim = dim
+        self.name = f"hashing-char{ngram_range[0]}{ngram_range[1]}-{dim}"
+        self._vectorizer = HashingVectorizer(analyzer='char_wb', ngram_range=ngram_range, n_features=dim,
+                                             alternate_sign=False, norm='l2', dtype=np.float32)
+
+    def embed(self, texts):
+        return self._vectorizer.transform(texts).toarray()
+
+
+def _kmeans(vectors, clusters, iterations=10, sample=20000, seed=0):
+    """Spherical k-means centroids for the IVF lists, trained on a sample"""
+    rng = np.random.default_rng(seed)
+    if len(vectors) > sample:
+        vectors = vectors[np.sort(rng.choice(len(vectors), sample, replace=False))]
+    centroids = vectors[rng.choice(len(vectors), clusters, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = _assign(vectors, centroids)
+        members = sparse.csr_matrix((np.ones(len(vectors), dtype=np.float32), (assignment, np.arange(len(vectors)))),
+                                    shape=(clusters, len(vectors)))
+        sums = np.asarray(members @ vectors)
+        empty = np.bincount(assignment, minlength=clusters) == 0
+        # Re-seed empty lists from random points so every list stays usable
+        sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()))]
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        centroids = sums / np.maximum(norms, 1e-12)
+    return centroids.astype(np.float32)
+
+
+def _assign(vectors, centroids, chunk=8192):
+    assignment = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), chunk):
+        assignment[start:start + chunk] = np.argmax(vectors[start:start + chunk] @ centroids.T, axis=1)
+    return assignment
+
+
+def _top_k(scores, k, ids):
+    # Positions of the k best scores, best first (ties go to the lower row id)
+    if k < len(scores):
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.lexsort((ids[candidates], -scores[candidates]))]
+
+
+class VectorIndex:
+    """
+    Cosine-similarity index over unit vectors with exact and IVF search.
+
+    Vectors are stored grouped by their nearest k-means centroid, so each
+    inverted list is a contiguous slice: approximate search scores the
+    centroids, then only the nprobe closest lists. Exact search scores every
+    vector. Saved indexes are directories of .npy files plus a JSON lines
+    row store; open() memory-maps all of them, so opening costs the same
+    whatever the index size and pages are read on demand.
+    """
+
+    def __init__(self, vectors, ids, centroids, offsets, rows, row_offsets, meta):
+        self.vectors = vectors
+        self.ids = ids
+        self.centroids = centroids
+        self.offsets = offsets
+        self.meta = meta
+        self._rows = rows
+        self._row_offsets = row_offsets
+
+    def __len__(self):
+        return len(self.ids)
+
+    @staticmethod
+    def encode_row(row):
+        """The JSON line a row is stored as; row_keys() returns these"""
+        return json.dumps(row, ensure_ascii=False)
+
+    @classmethod
+    def build(cls, vectors, rows, meta=None, clusters=None, centroids=None):
+        """
+        In-memory index over vectors (n x dim) and their n result rows.
+        Passing the centroids of a previous index skips k-means training.
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        count = len(vectors)
+        if clusters is None:
+            clusters = max(1, int(np.sqrt(count)))
+        clusters = max(1, min(clusters, count))
+
+        if count:
+            if centroids is None or not len(centroids):
+                centroids = _kmeans(vectors, clusters)
+            centroids = np.asarray(centroids, dtype=np.float32)
+            assignment = _assign(vectors, centroids)
+        else:
+            centroids = np.zeros((0, vectors.shape[1] if vectors.ndim == 2 else 0), dtype=np.float32)
+            assignment = np.zeros(0, dtype=np.int32)
+        ids = np.argsort(assignment, kind='stable').astype(np.int32)
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(assignment, minlength=len(centroids)))])
+
+        encoded = [cls.encode_row(row).encode('utf-8') + b'\n' for row in rows]
+        row_offsets = np.concatenate([[0], np.cumsum([len(line) for line in encoded], dtype=np.int64)])
+        meta = dict(meta or {}, count=count, dim=int(vectors.shape[1]) if vectors.ndim == 2 else 0,
+                    clusters=len(centroids))
+        return cls(vectors[ids], ids, centroids, offsets.astype(np.int64), b"".join(encoded),
+                   row_offsets.astype(np.int64), meta)
+
+    def save(self, directory):
+        """Write the index to directory, replacing any previous index atomically"""
+        parent = os.path.dirname(os.path.abspath(directory))
+        os.makedirs(parent, exist_ok=True)
+        tmp = tempfile.mkdtemp(dir=parent, prefix='.index-')
+        try:
+            for name, array in (('vectors.npy', self.vectors), ('ids.npy', self.ids),
+                                ('centroids.npy', self.centroids), ('offsets.npy', self.offsets),
+                                ('row_offsets.npy', self._row_offsets)):
+                np.save(os.path.join(tmp, name), np.asarray(array))
+            with open(os.path.join(tmp, 'rows.jsonl'), 'wb') as f:
+                f.write(self._rows[:])
+            with open(os.path.join(tmp, 'meta.json'), 'w', encoding='utf-8') as f:
+                json.dump(self.meta, f)
+
+            old = None
+            if os.path.exists(directory):
+                old = tempfile.mkdtemp(dir=parent, prefix='.index-old-')
+                os.replace(directory, os.path.join(old, 'index'))
+            os.replace(tmp, directory)
+            if old:
+                shutil.rmtree(old, ignore_errors=True)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+
+    def save_meta(self, directory):
+        """Rewrite only meta.json of the index saved in directory"""
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix='.meta-')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self.meta, f)
+            os.replace(tmp, os.path.join(directory, 'meta.json'))
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    @classmethod
+    def open(cls, directory):
+        """Memory-map a saved index; raises OSError/ValueError if it is missing or broken"""
+        with open(os.path.join(directory, 'meta.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        arrays = {name: np.load(os.path.join(directory, name + '.npy'), mmap_mode='r')
+                  for name in ('vectors', 'ids', 'centroids', 'offsets', 'row_offsets')}
+        with open(os.path.join(directory, 'rows.jsonl'), 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            rows = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        if len(arrays['ids']) != meta.get('count') or len(arrays['row_offsets']) != meta['count'] + 1:
+            raise ValueError(f"inconsistent vector index in {directory}")
+        return cls(arrays['vectors'], arrays['ids'], arrays['centroids'], arrays['offsets'],
+                   rows, arrays['row_offsets'], meta)
+
+    def row(self, row_id):
+        """The stored result row for row_id"""
+        start, end = self._row_offsets[row_id], self._row_offsets[row_id + 1]
+        return json.loads(self._rows[start:end])
+
+    def row_keys(self):
+        """The stored JSON line of every row, by row id"""
+        # JSON escapes newlines inside strings, so every b"\n" ends a row
+        return bytes(self._rows[:]).decode('utf-8').split('\n')[:-1]
+
+    def vectors_for(self, row_ids):
+        """The stored vectors of row_ids, in that order"""
+        positions = np.empty(len(self.ids), dtype=np.int64)
+        positions[self.ids] = np.arange(len(self.ids))
+        return np.asarray(self.vectors[positions[np.asarray(row_ids, dtype=np.int64)]])
+
+    def search(self, query, k, exact=False, nprobe=None):
+        """
+        [(row_id, score)] for the k vectors most similar to the unit vector
+        query, best first. Approximate search widens past nprobe lists until
+        it has at least k candidates.
+
+        nprobe defaults to a third of the lists. Fewer lists are faster but
+        miss more neighbours: with HashingEmbedder vectors at 100k rows
+        (316 lists), recall@10 is 0.65 at 8 lists, 0.81 at 32 and 0.92 at
+        106, the last still three times faster than exact search
+        (benchmarks/bench_semantic.py). Up to EXACT_MAX_ROWS vectors the
+        search is exact regardless.
+        """
+        k = min(k, len(self.ids))
+        if k <= 0:
+            return []
+        query = np.asarray(query, dtype=np.float32)
+        if nprobe is None:
+            nprobe = max(1, -(-len(self.centroids) // 3))
+        if exact or len(self.ids) <= EXACT_MAX_ROWS or len(self.centroids) <= nprobe:
+            scores = self.vectors @ query
+            return [(int(self.ids[p]), float(scores[p])) for p in _top_k(scores, k, self.ids)]
+
+        probes = np.argsort(-(self.centroids @ query), kind='stable')
+        sizes = self.offsets[probes + 1] - self.offsets[probes]
+        probed = max(nprobe, int(np.searchsorted(np.cumsum(sizes), k)) + 1)
+        # Each list is a contiguous slice, so scoring it reads the map in place
+        lists = sorted((int(self.offsets[c]), int(self.offsets[c + 1])) for c in probes[:probed])
+        scores = np.concatenate([self.vectors[start:end] @ query for start, end in lists])
+        positions = np.concatenate([np.arange(start, end) for start, end in lists])
+        best = _top_k(scores, k, self.ids[positions])
+        return [(int(self.ids[positions[p]]), float(scores[p])) for p in best]
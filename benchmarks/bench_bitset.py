@@ -0,0 +1,81 @@
+# bench_bitset.py
+"""
+Skill-set scoring with packed bitsets: build cost, memory and per-query
+latency of Portfolio(mode="skills") next to the TF-IDF index, with the
+popcount Jaccard scores checked against Python sets.
+
+    python benchmarks/bench_bitset.py [--repeat N] [--sizes 10000,100000,500000] [--queries 200]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+import numpy as np
+from bench_portfolio import QUERY, best_of, synthetic_portfolio, synthetic_queries
+from portfolio import Portfolio
+from skills import default_vocabulary
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def check_scores(portfolio, queries, rows=2000):
+    """Largest difference between the bitset scores and set-based Jaccard"""
+    vocabulary = default_vocabulary()
+    index = portfolio._skills
+    row_sets = [set(vocabulary.encode(index.store.value(i, "techstack"))) for i in range(min(rows, len(index)))]
+    worst = 0.0
+    for query, bits in zip(queries, index.transform(queries)):
+        wanted = set(vocabulary.encode(query))
+        scores = index.score(bits).toarray().ravel()
+        for i, skills in enumerate(row_sets):
+            union = len(skills | wanted)
+            expected = len(skills & wanted) / union if union else 0.0
+            worst = max(worst, abs(scores[i] - expected))
+    return worst
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument('--repeat', type=int, default=20)
+    ap.add_argument('--sizes', default='10000,100000,500000')
+    ap.add_argument('--queries', type=int, default=200)
+    args = ap.parse_args()
+
+    queries = synthetic_queries(args.queries)
+    print(f"{len(default_vocabulary())} skills, {default_vocabulary().words} words per bitset; "
+          f"query {QUERY!r}, best of {args.repeat}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in (int(s) for s in args.sizes.split(',')):
+            path = os.path.join(tmp, f"portfolio_{rows}.csv")
+            synthetic_portfolio(rows).to_csv(path, index=False)
+            skills, build = timed(lambda: Portfolio(path, mode="skills"))
+            tfidf, tfidf_build = timed(lambda: Portfolio(path))
+            index = skills._skills
+            print(f"\n{rows} rows   build {build:5.2f} s (tfidf {tfidf_build:5.2f} s)   "
+                  f"bitsets {index.bits.nbytes / 2 ** 20:5.1f} MiB")
+
+            bitset = best_of(args.repeat, lambda: skills.query_links(QUERY))
+            sparse = best_of(args.repeat, lambda: tfidf.query_links(QUERY))
+            print(f"  single query     bitset {bitset * 1000:7.3f} ms   tfidf {sparse * 1000:7.3f} ms")
+
+            bits = index.transform([QUERY])[0]
+            kernel = best_of(args.repeat, lambda: index.score(bits))
+            print(f"  scoring kernel   {kernel * 1000:7.3f} ms   "
+                  f"({rows / kernel / 1e6:6.1f} M rows/s, {np.count_nonzero(bits)} active words)")
+
+            _, bulk = timed(lambda: skills.query_links_batch(queries))
+            _, tfidf_bulk = timed(lambda: tfidf.query_links_batch(queries))
+            print(f"  {len(queries)} queries      bitset {bulk * 1000:7.1f} ms   tfidf {tfidf_bulk * 1000:7.1f} ms")
+            print(f"  max |score - set Jaccard| {check_scores(skills, queries[:20]):.2e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+# bench_cache.py
+"""
+Portfolio query result cache: hit rate and per-query latency on a skewed
+stream of repeated skill sets (in shuffled order and case), cold against
+warm, and warm lookup cost as the portfolio grows.
+
+    python benchmarks/bench_cache.py [--sizes 10000,100000] [--queries 5000] [--distinct 300] [--cache 1024]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+from bench_portfolio import synthetic_portfolio, synthetic_queries
+from portfolio import Portfolio
+
+
+def query_stream(count, distinct, seed=5):
+    """count queries over distinct skill sets with Zipf-like popularity,
+    each repeat reshuffled and recased"""
+    rng = random.Random(seed)
+    pool = [q.split(", ") for q in synthetic_queries(distinct)]
+    weights = [1 / (rank + 1) for rank in range(distinct)]
+    stream = []
+    for skills in rng.choices(pool, weights, k=count):
+        skills = rng.sample(skills, len(skills))
+        stream.append(", ".join(s.upper() if rng.random() < 0.3 else s for s in skills))
+    return stream
+
+
+def run(portfolio, stream):
+    start = time.perf_counter()
+    for skills in stream:
+        portfolio.query_links(skills)
+    return (time.perf_counter() - start) / len(stream)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument('--sizes', default='10000,100000')
+    ap.add_argument('--queries', type=int, default=5000)
+    ap.add_argument('--distinct', type=int, default=300)
+    ap.add_argument('--cache', type=int, default=1024)
+    args = ap.parse_args()
+
+    stream = query_stream(args.queries, args.distinct)
+    print(f"{args.queries} queries over {args.distinct} skill sets, cache of {args.cache} entries")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in (int(s) for s in args.sizes.split(',')):
+            path = os.path.join(tmp, f"portfolio_{rows}.csv")
+            synthetic_portfolio(rows).to_csv(path, index=False)
+            print(f"\n{rows} rows")
+            for mode in ('tfidf', 'skills'):
+                uncached = Portfolio(path, mode=mode, cache_size=0)
+                cached = Portfolio(path, mode=mode, cache_size=args.cache)
+                off = run(uncached, stream)
+                cold = run(cached, stream)
+                stats = cached.index_stats()
+                hit_rate = stats['cache_hits'] / (stats['cache_hits'] + stats['cache_misses'])
+                warm = run(cached, stream)
+                same = all(cached.query_links(q) == uncached.query_links(q) for q in stream[:200])
+                print(f"  {mode:<7} no cache {off * 1e6:8.1f} us   first pass {cold * 1e6:8.1f} us "
+                      f"(hit rate {hit_rate:.0%})   warm {warm * 1e6:6.1f} us   same results: {same}")
+
+
+if __name__ == '__main__':
+    main()
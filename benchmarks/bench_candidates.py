@@ -0,0 +1,84 @@
+# bench_candidates.py
+"""
+Query cost of the inverted skill-token index: it should follow the number of
+rows sharing a token with the query, not the portfolio size.
+
+    python benchmarks/bench_candidates.py [--repeat N] [--sizes 10000,100000,500000] [--matches 10,100,1000,10000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+import pandas as pd
+from portfolio import Portfolio
+
+BACKGROUND = [f"tool{i}" for i in range(2000)]
+
+
+def planted_portfolio(rows, matches, seed=7):
+    """
+    rows items over a 2000-token background vocabulary, where the token
+    "match<m>" is planted in exactly m rows for each m in matches
+    """
+    rng = random.Random(seed)
+    stacks = [rng.sample(BACKGROUND, 5) for _ in range(rows)]
+    for m in matches:
+        for row in rng.sample(range(rows), min(m, rows)):
+            stacks[row].append(f"match{m}")
+    return pd.DataFrame({
+        "Techstack": [", ".join(stack) for stack in stacks],
+        "Links": [f"https://example.com/project-{i}" for i in range(rows)]
+    })
+
+
+def best_of(repeat, fn):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def full_scan(portfolio, text):
+    """Score every row, as query_links did before the inverted index"""
+    index = portfolio._tfidf
+    scores = (index.matrix @ index.transform([text]).T).toarray().ravel()
+    return scores.argsort()[::-1][:3]
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument('--repeat', type=int, default=20)
+    ap.add_argument('--sizes', default='10000,100000,500000')
+    ap.add_argument('--matches', default='10,100,1000,10000')
+    args = ap.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(',')]
+    matches = [int(m) for m in args.matches.split(',')]
+    print(f"best of {args.repeat}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in sizes:
+            path = os.path.join(tmp, f"portfolio_{rows}.csv")
+            planted_portfolio(rows, matches).to_csv(path, index=False)
+            portfolio = Portfolio(path)
+            print(f"\n{rows} rows")
+            for m in matches:
+                if m > rows:
+                    continue
+                query = f"match{m}"
+                indexed = best_of(args.repeat, lambda: portfolio.query_links(query))
+                scan = best_of(args.repeat, lambda: full_scan(portfolio, query))
+                print(f"  {m:>6} matching rows   inverted index {indexed * 1000:7.3f} ms"
+                      f"   full scan {scan * 1000:7.3f} ms")
+            stats = portfolio.index_stats()
+            print(f"  mean candidates {stats['mean_candidates']:.0f}, no-candidate queries {stats.get('no_candidates', 0)}")
+
+
+if __name__ == '__main__':
+    main()
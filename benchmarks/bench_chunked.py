@@ -0,0 +1,90 @@
+# bench_chunked.py
+"""
+Chunked job extraction on an oversized careers page: one prompt (which the
+stub LLM refuses past its context window, like the real one) against
+map-reduce extraction over overlapping chunks, run serially and concurrently.
+
+    python benchmarks/bench_chunked.py [--jobs 200] [--context 2000] [--chunk 1500]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+from chains import PROMPT_EXTRACT, Chain, OutputParserException
+from chunking import estimate_tokens, split_text
+from llm_stub import StubLLM
+from utils import clean_text
+
+ROLES = ['Data Engineer', 'Product Designer', 'Account Executive', 'Backend Developer', 'HR Generalist',
+         'Site Reliability Engineer', 'Marketing Manager', 'QA Analyst']
+SKILLS = ['Python', 'SQL', 'Figma', 'Salesforce', 'Go', 'Kubernetes', 'Excel', 'Selenium', 'Spark', 'AWS']
+WORDS = ('build maintain design scale secure automate analyse deliver support improve pipelines services '
+         'dashboards customers campaigns releases tests platforms budgets teams partners models reports '
+         'infrastructure products outreach hiring onboarding forecasts experiments integrations').split()
+
+
+def careers_page(count, seed=5):
+    """HTML of count postings, each a few sentences, after some navigation"""
+    rng = random.Random(seed)
+    postings, expected = [], []
+    for i in range(count):
+        role = rng.choice(ROLES)
+        description = ' '.join(rng.sample(WORDS, 12)) + f' in office {i}'
+        skills = ', '.join(rng.sample(SKILLS, 3))
+        expected.append((role, description))
+        postings.append(f'<div class="job"><h2>Role: {role}</h2><p>Experience: {rng.randint(1, 10)} years.</p>'
+                        f'<p>Skills: {skills}</p><p>Description: {description}.</p></div>')
+    nav = '<nav>Home. About us. Life at the company. Benefits. Open positions.</nav>'
+    return '<html><body>' + nav + ''.join(postings) + '</body></html>', expected
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument('--jobs', type=int, default=200)
+    ap.add_argument('--context', type=int, default=2000, help='stub context window, tokens')
+    ap.add_argument('--chunk', type=int, default=1500, help='chunk budget, tokens')
+    ap.add_argument('--latency', type=float, default=0.3, help='stub seconds per call')
+    ap.add_argument('--per-token', type=float, default=0.0002, help='stub seconds per prompt token')
+    args = ap.parse_args()
+    failed = False
+
+    html, expected = careers_page(args.jobs)
+    text = clean_text(html)
+    chunks = split_text(text, args.chunk, args.chunk // 8)
+    print(f"{args.jobs} postings, {estimate_tokens(text)} tokens of page text, "
+          f"{len(chunks)} chunks of <= {args.chunk} tokens, context {args.context}")
+
+    def llm():
+        return StubLLM(latency=args.latency, latency_per_token=args.per_token, context_tokens=args.context)
+
+    start = time.perf_counter()
+    try:
+        Chain(llm()).extract_jobs(text)
+        print("  one prompt            unexpectedly succeeded")
+    except OutputParserException as e:
+        print(f"  one prompt            failed in {time.perf_counter() - start:5.2f} s: {e}")
+
+    wanted = {(role, description) for role, description in expected}
+    for label, workers in (('chunked, serial', 1), ('chunked, concurrent', len(chunks))):
+        chain = Chain(llm(), chunk_tokens=args.chunk, max_workers=workers)
+        start = time.perf_counter()
+        jobs = chain.extract_jobs(text)
+        elapsed = time.perf_counter() - start
+        found = {(job['role'], job['description'].rstrip('.')) for job in jobs}
+        print(f"  {label:<21} {elapsed:5.2f} s   {len(jobs)} jobs from {chain.stats['calls']} calls, "
+              f"{len(wanted & found)}/{len(wanted)} postings found, {len(jobs) - len(found & wanted)} extra")
+        failed = failed or found != wanted or len(jobs) != len(wanted)
+
+    one_chunk = args.latency + args.per_token * (args.chunk + estimate_tokens(PROMPT_EXTRACT.format(page_data='')))
+    print(f"  (one chunk alone takes about {one_chunk:.2f} s)")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+# bench_classifier.py
+"""
+Job classification speed and labels: the keyword loops EmailGenerator used to
+run per email against JobClassifier, with and without its per-text memo.
+
+Labels are pinned by benchmarks/classification_golden.json, written from the
+previous keyword loops. The one intended difference is the 'IT' keyword, which
+could never match a lowercased title before; those records are marked
+"fixed" and hold the corrected labels. Exits non-zero when any label differs.
+
+    python benchmarks/bench_classifier.py                 # check labels, time
+    python benchmarks/bench_classifier.py --update-golden # rewrite the golden file
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(HERE, '..', 'app'))
+
+from classifier import JobClassifier
+
+GOLDEN_PATH = os.path.join(HERE, 'classification_golden.json')
+
+ROLES = ['Senior Software Engineer', 'Data Analyst', 'Director of Sales', 'Backend Developer', 'Product Manager',
+         'VP Engineering', 'Chief Data Officer', 'Head of Marketing', 'Managing Director, Capital Markets',
+         'Executive Assistant', 'Technical Writer', 'Account Manager', 'Nurse Practitioner', 'Edit Assistant',
+         'Cloud Architect', 'IT Support Specialist', 'Head of IT', 'IT Project Manager', 'Store Manager',
+         'Recruiter', 'Codeveloper Relations Lead', 'Network Administrator', 'Security Guard', '', None]
+SKILLS = ['Python, SQL, AWS, Docker', 'Sales, CRM, negotiation', 'Excel, PowerPoint', 'IT, helpdesk, Windows',
+          'patient care, triage', 'React, frontend testing', 'it support', '', None]
+COMPANIES = ['DataTech', 'First Capital Bank', 'HealthCare Plus', 'ShopStore', 'Globex Consulting Services',
+             'Acme', 'Pharmacorp', 'E-Commerce Hub', 'Investment Advisors', 'Techno Care Retail', '', None]
+EXPERIENCE = ['', '2+ years', '5 years', '10+ years', 'at least 3 years', 'senior', None]
+YEARS = [None, [], [None, 4], [1, 3], [3, 5], [8, None], [12, 15]]
+
+_NUMBER_RE = re.compile(r'\d+')
+
+
+def legacy_classify(job):
+    """The keyword loops as EmailGenerator ran them before JobClassifier"""
+    role, skills, company = job.get('role'), job.get('skills'), job.get('company')
+    role_lower = (role or '').lower()
+
+    years = job.get('experience_years')
+    if years and years[0] is not None:
+        years = years[0]
+    else:
+        numbers = _NUMBER_RE.findall(job.get('experience') or '')
+        years = int(numbers[0]) if numbers else 3
+    if any(k in role_lower for k in ['director', 'vp', 'vice president', 'c-level', 'chief', 'executive',
+                                     'head of', 'senior vice president', 'managing director']):
+        level = "executive"
+    elif years >= 8:
+        level = "executive"
+    elif years >= 3:
+        level = "technical" if any(w in role_lower for w in ['developer', 'engineer', 'technical']) \
+            else "non_technical"
+    else:
+        level = "non_technical"
+
+    skills_lower = (skills or '').lower()
+    technical = any(k in role_lower or k in skills_lower for k in [
+        'developer', 'engineer', 'programmer', 'technical', 'technology', 'software', 'data', 'system', 'network',
+        'IT', 'devops', 'cyber', 'security', 'analyst', 'architect', 'scientist', 'database', 'cloud', 'backend',
+        'frontend', 'fullstack', 'code', 'programming', 'technical'])
+
+    industry = "industry"
+    if company:
+        company_lower = company.lower()
+        for name, words in [('technology', ['tech', 'software', 'computer', 'data', 'cloud']),
+                            ('financial services', ['finance', 'bank', 'investment', 'capital']),
+                            ('healthcare', ['health', 'medical', 'pharma', 'care']),
+                            ('retail', ['retail', 'shop', 'store', 'commerce']),
+                            ('professional services', ['consulting', 'advisor', 'services'])]:
+            if any(w in company_lower for w in words):
+                industry = name
+                break
+
+    template = "executive" if level == "executive" else ("technical" if technical else "non_technical")
+    return {'level': level, 'technical': technical, 'industry': industry, 'template': template}
+
+
+def labels(classification):
+    return dict(classification._asdict())
+
+
+def sample_jobs(count, seed=21):
+    rng = random.Random(seed)
+    return [{'role': rng.choice(ROLES), 'skills': rng.choice(SKILLS), 'company': rng.choice(COMPANIES),
+             'experience': rng.choice(EXPERIENCE), 'experience_years': rng.choice(YEARS)} for _ in range(count)]
+
+
+def golden_records(classifier):
+    """Every role with every skills, company and experience variant once, plus a random sample"""
+    jobs = [{'role': role, 'skills': skills, 'company': company, 'experience': experience,
+             'experience_years': years}
+            for role in ROLES for skills, company, experience, years in zip(
+                SKILLS * 2, COMPANIES, EXPERIENCE * 2, YEARS * 2)]
+    jobs += sample_jobs(300)
+    records = []
+    for job in jobs:
+        expected = legacy_classify(job)
+        record = {'job': job, **expected}
+        fixed = labels(classifier.classify(job['role'], job['skills'], job['company'], job['experience'],
+                                           job['experience_years']))
+        uses_it = any(re.search(r'\bIT\b', job.get(key) or '') for key in ('role', 'skills'))
+        if uses_it and fixed != expected:
+            # Only the technical flag (and the template it picks) may change
+            assert {k for k in fixed if fixed[k] != expected[k]} <= {'technical', 'template'}, (job, fixed)
+            record.update(fixed, fixed='IT keyword')
+        records.append(record)
+    return records
+
+
+def best_of(repeat, fn):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument('--jobs', type=int, default=20000)
+    ap.add_argument('--repeat', type=int, default=3)
+    ap.add_argument('--update-golden', action='store_true')
+    args = ap.parse_args()
+
+    if args.update_golden:
+        records = golden_records(JobClassifier())
+        with open(GOLDEN_PATH, 'w', encoding='utf-8') as f:
+            json.dump(records, f, indent=1)
+            f.write('\n')
+        print(f"{len(records)} records ({sum('fixed' in r for r in records)} fixed) written to {GOLDEN_PATH}")
+        return
+
+    with open(GOLDEN_PATH, encoding='utf-8') as f:
+        golden = json.load(f)
+    classifier = JobClassifier()
+    results = classifier.classify_many([record['job'] for record in golden])
+    mismatches = []
+    for record, result in zip(golden, results):
+        got = labels(result)
+        if any(got[key] != record[key] for key in got):
+            mismatches.append((record, got))
+    print(f"golden labels: {len(golden) - len(mismatches)}/{len(golden)} match "
+          f"({sum('fixed' in r for r in golden)} carry the IT keyword fix)")
+    for record, got in mismatches[:10]:
+        print(f"  {record['job']}\n    expected {({k: record[k] for k in got})}\n    got      {got}")
+
+    batch = sample_jobs(args.jobs)
+    print(f"\n{args.jobs} jobs, best of {args.repeat}")
+    legacy = best_of(args.repeat, lambda: [legacy_classify(job) for job in batch])
+
+    def per_call():
+        # A fresh classifier each round, so its memo starts empty
+        fresh = JobClassifier()
+        return [fresh.classify(job['role'], job['skills'], job['company'], job['experience'],
+                               job['experience_years']) for job in batch]
+
+    def uncached():
+        fresh = JobClassifier(cache_size=0)
+        return [fresh.classify(job['role'], job['skills'], job['company'], job['experience'],
+                               job['experience_years']) for job in batch]
+
+    unmemoized = best_of(args.repeat, uncached)
+    memoized = best_of(args.repeat, per_call)
+    for name, elapsed in [('legacy keyword loops', legacy), ('classify, no memo', unmemoized),
+                          ('classify', memoized)]:
+        print(f"  {name:<22} {args.jobs / elapsed:10.0f} jobs/s   {elapsed / args.jobs * 1e6:6.2f} us/job")
+
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+# bench_delivery.py
+"""
+SMTP delivery throughput against a local sink: a fresh connection per message
+against pooled persistent connections at growing pool sizes, plus retry,
+rate-limit and resume checks.
+
+    python benchmarks/bench_delivery.py [--messages 2000] [--latency 0.002] [--pools 1,2,4,8,16]
+"""
+import argparse
+import email
+import itertools
+import os
+import smtplib
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(HERE, '..', 'app'))
+sys.path.append(HERE)
+
+from bench_templates import LINKS, USER, jobs
+from delivery import DeliveryLog, Mailer, RateLimiter, SmtpPool, build_message, message_key
+from email_generator import EmailGenerator
+from smtp_sink import SmtpSink
+
+SENDER = f"{USER['name']} <{USER['email']}>"
+DOMAINS = ['example.com', 'example.org', 'example.net', 'mail.test']
+
+
+def messages(count):
+    """(recipient, email_text) pairs spread over a few recipient domains"""
+    emails = EmailGenerator().generate_emails(jobs(count), itertools.repeat(LINKS), USER, seed=1)
+    return [(f"hr{i}@{DOMAINS[i % len(DOMAINS)]}", text) for i, text in enumerate(emails)]
+
+
+def connection_per_message(sink, batch):
+    """What sending through a one-shot tool amounts to: connect, EHLO, send, QUIT every time"""
+    for recipient, text in batch:
+        with smtplib.SMTP(sink.host, sink.port, local_hostname='bench') as smtp:
+            smtp.sendmail(USER['email'], [recipient], build_message(text, SENDER, recipient,
+                                                                    message_key(recipient, text)))
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument('--messages', type=int, default=2000)
+    ap.add_argument('--latency', type=float, default=0.002, help='sink delay per SMTP reply, seconds')
+    ap.add_argument('--pools', default='1,2,4,8,16')
+    args = ap.parse_args()
+    batch = messages(args.messages)
+    failed = False
+
+    print(f"{args.messages} messages, {args.latency * 1000:.1f} ms per SMTP reply")
+    with SmtpSink(args.latency) as sink:
+        sample = batch[:max(1, args.messages // 10)]
+        start = time.perf_counter()
+        connection_per_message(sink, sample)
+        print(f"  connection per message   {len(sample) / (time.perf_counter() - start):8.1f} messages/s")
+
+    for size in [int(size) for size in args.pools.split(',')]:
+        with SmtpSink(args.latency) as sink:
+            pool = SmtpPool(sink.host, sink.port, size=size, max_per_connection=10 ** 6, local_hostname='bench')
+            report = Mailer(pool, SENDER).deliver(batch)
+            pool.close()
+            print(f"  pool of {size:<3}              {report['messages_per_second']:8.1f} messages/s   "
+                  f"{report.get('connections_opened', 0)} connections, {report.get('retries', 0)} retries")
+            if len(sink.messages) != len(batch):
+                print(f"    sink received {len(sink.messages)} of {len(batch)}")
+                failed = True
+
+    # Subject header and body survive the trip
+    first = email.message_from_bytes(sink.messages[0][2])
+    expected = {text.partition('\n')[0][len('Subject: '):] for _, text in batch}
+    print(f"  delivered Subject headers match the generated emails: {first['Subject'] in expected}")
+
+    with SmtpSink(latency=0.0) as sink, tempfile.TemporaryDirectory() as tmp:
+        # One transient failure (retried), one permanent, the rest fine
+        mixed = batch[:20] + [('temp-fail@example.com', batch[0][1]), ('reject@example.com', batch[1][1])]
+        log = DeliveryLog(os.path.join(tmp, 'status.sqlite'))
+        pool = SmtpPool(sink.host, sink.port, size=4, local_hostname='bench')
+        mailer = Mailer(pool, SENDER, log=log, backoff_factor=0.05)
+        report = mailer.deliver(mixed)
+        counts = log.counts()
+        print(f"  retry run: sent {report.get('sent', 0)}, retries {report.get('retries', 0)}, "
+              f"failed {report.get('failed', 0)}; status db {dict(counts)}")
+        failed = failed or counts != {'sent': 21, 'failed': 1}
+
+        again = Mailer(pool, SENDER, log=log).deliver(mixed)
+        print(f"  resumed run skips sent messages: skipped {again.get('skipped', 0)}, "
+              f"sent {again.get('sent', 0)} (sink holds {len(sink.messages)})")
+        failed = failed or again.get('sent', 0) != 0 or len(sink.messages) != 21
+
+        limited = Mailer(pool, SENDER, limiter=RateLimiter(per_domain=50))
+        one_domain = [(f"hr{i}@example.com", text) for i, (_, text) in enumerate(batch[:100])]
+        report = limited.deliver(one_domain)
+        print(f"  per-domain limit 50/s over 100 messages: {report['messages_per_second']:.1f} messages/s")
+        pool.close()
+        log.close()
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+# bench_experience.py
+"""
+Adversarial experience-extraction benchmark. The page repeats "experience"
+with numbers but never "years", which drives the legacy DOTALL patterns
+into scanning to the end of the text from every anchor. The bounded
+ExperienceExtractor should grow linearly with the page size.
+
+    python benchmarks/bench_experience.py [--sizes 100,200,400,1600]
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+from experience import ExperienceExtractor
+
+LEGACY_PATTERNS = [
+    r'experience.*?(\d+[\+\-]?\d*.*?years?)',
+    r'(\d+[\+\-]?\d*.*?years?.*?experience)',
+    r'minimum.*?(\d+).*?years',
+    r'(\d+\+?)\s*years',
+    r'experience.*?(\d+\+?)',
+]
+
+# Legacy scans grow cubically here (x8 per doubling); skip them past this size
+LEGACY_LIMIT = 200
+
+
+def legacy_extract(text):
+    text = text.lower()
+    for pattern in LEGACY_PATTERNS:
+        for match in re.finditer(pattern, text, re.IGNORECASE | re.DOTALL):
+            exp_text = match.group(1).strip()
+            if exp_text and len(exp_text) < 50:
+                return exp_text.title()
+    return "Experience varies"
+
+
+def adversarial_text(repeats):
+    return "Relevant experience with 24/7 on-call rotations for team 42. " * repeats
+
+
+def timed(fn, text):
+    start = time.perf_counter()
+    fn(text)
+    return time.perf_counter() - start
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument('--sizes', default='100,200,400,1600,6400,25600')
+    args = ap.parse_args()
+
+    extractor = ExperienceExtractor()
+    previous = None
+    for repeats in (int(s) for s in args.sizes.split(',')):
+        text = adversarial_text(repeats)
+        bounded = timed(extractor.extract, text)
+        legacy = f"{timed(legacy_extract, text) * 1000:10.1f} ms" if repeats <= LEGACY_LIMIT else f"{'skipped':>13}"
+        growth = f"x{bounded / previous:4.1f}" if previous else "     "
+        previous = bounded
+        print(f"{len(text) / 1024:7.0f} KiB   legacy {legacy}   bounded {bounded * 1000:7.2f} ms {growth}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+# bench_extraction.py
+"""
+Per-page extraction benchmark: the legacy selector cascade (one soup.select()
+per selector and a fresh get_text() per extractor) against the single-pass
+PageIndex engine, for each available parser backend.
+
+    python benchmarks/bench_extraction.py [--repeat N] [--sections N]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+from bs4 import BeautifulSoup
+from extraction import PageIndex, ROLE_SELECTORS, SKILL_SECTION_SELECTORS, DESCRIPTION_SELECTORS
+from scraper import SimpleScraper
+
+PARSERS = ['html.parser', 'lxml']
+
+
+def build_page(sections):
+    """A careers page shaped like the big ATS listings: many cards and lists"""
+    teams = ['Platform', 'Payments', 'Search', 'Growth', 'Infrastructure', 'Mobile']
+    cards = []
+    for i in range(sections):
+        team = teams[i % len(teams)]
+        cards.append(
+            f'<div class="card content-block"><h2>{team} team</h2>'
+            f'<p>Our {team} team builds reliable systems for customers across the globe and '
+            f'maintains a high bar for engineering quality and collaboration.</p>'
+            f'<ul class="perks"><li>Remote friendly</li><li>Learning budget</li></ul></div>'
+        )
+    return (
+        '<html><head><title>Senior Data Engineer | Careers</title>'
+        '<script>var x = 1;</script><style>p {}</style></head><body>'
+        '<header><nav><a href="/">Home</a></nav></header>'
+        '<h1 class="job-title">Senior Data Engineer</h1>'
+        '<section class="job-description"><p>' + 'We are looking for an engineer to design data pipelines. ' * 5 + '</p></section>'
+        '<div class="requirements"><ul><li>5+ years of experience with Python and SQL</li>'
+        '<li>Docker, Kubernetes and AWS</li><li>Strong communication skills</li></ul></div>'
+        + ''.join(cards) +
+        '<footer>Copyright</footer></body></html>'
+    )
+
+
+def legacy_extract(scraper, soup, url):
+    """The pre-PageIndex extraction: every selector re-walks the whole tree"""
+    class LegacyPage:
+        pass
+
+    page = LegacyPage()
+    page.title = soup.find('title')
+    page.role_candidates = [soup.select(sel) for sel, _ in ROLE_SELECTORS]
+    experience = scraper._extract_experience(soup.get_text())
+    page.text = soup.get_text()
+    sections = []
+    for sel, _ in SKILL_SECTION_SELECTORS:
+        sections.extend(soup.select(sel))
+    page.skill_sections = sections
+    page.description_candidates = [soup.select(sel) for sel, _ in DESCRIPTION_SELECTORS]
+    page.paragraphs = soup.find_all('p')
+    return (scraper._extract_role(page, url), experience,
+            scraper._extract_skills(page), scraper._extract_description(page))
+
+
+def index_extract(scraper, soup, url):
+    page = PageIndex(soup)
+    return (scraper._extract_role(page, url), scraper._extract_experience(page.text),
+            scraper._extract_skills(page), scraper._extract_description(page))
+
+
+def run(html, parser, extract, repeat):
+    scraper = SimpleScraper(parser=parser)
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        soup = BeautifulSoup(html, parser)
+        for element in soup(['script', 'style', 'nav', 'footer', 'header']):
+            element.decompose()
+        result = extract(scraper, soup, 'https://example.com/jobs/1')
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument('--repeat', type=int, default=5)
+    ap.add_argument('--sections', type=int, default=2000)
+    args = ap.parse_args()
+
+    html = build_page(args.sections).encode('utf-8')
+    print(f"page size: {len(html) / 1024:.0f} KiB, best of {args.repeat}")
+
+    baseline = None
+    for parser in PARSERS:
+        try:
+            BeautifulSoup('<p></p>', parser)
+        except Exception:
+            print(f"{parser:12s} not installed, skipped")
+            continue
+        legacy_t, legacy_r = run(html, parser, legacy_extract, args.repeat)
+        index_t, index_r = run(html, parser, index_extract, args.repeat)
+        if legacy_r != index_r:
+            print(f"{parser}: results differ\n  legacy: {legacy_r}\n  index:  {index_r}")
+            sys.exit(1)
+        if baseline is None:
+            baseline = legacy_t
+        print(f"{parser:12s} legacy {legacy_t * 1000:8.1f} ms   single-pass {index_t * 1000:8.1f} ms"
+              f"   speedup vs legacy html.parser {baseline / index_t:5.2f}x")
+
+
+if __name__ == '__main__':
+    main()
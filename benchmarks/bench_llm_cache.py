@@ -0,0 +1,100 @@
+# bench_llm_cache.py
+"""
+LLM response cache: Chain.extract_jobs and write_mail over a batch of pages
+with a slow StubLLM, cold and then warm from the SQLite cache, plus TTL expiry,
+size eviction and a cache reopened by a new process.
+
+    python benchmarks/bench_llm_cache.py [--pages 20] [--latency 0.2]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+from chains import Chain
+from llm_cache import LlmCache
+from llm_stub import StubLLM
+
+ROLES = ['Data Engineer', 'Product Designer', 'Account Executive', 'Backend Developer', 'HR Generalist']
+
+
+def page_text(i):
+    role = ROLES[i % len(ROLES)]
+    return (f"Careers at Company{i}. Role: {role} Experience: {2 + i % 5} years "
+            f"Skills: Python, SQL, communication Description: Join team {i} to build data products.")
+
+
+def run(chain, pages):
+    start = time.perf_counter()
+    jobs = [chain.extract_jobs(text) for text in pages]
+    emails = [chain.write_mail(page_jobs[0], ['https://example.com/portfolio']) for page_jobs in jobs]
+    return time.perf_counter() - start, jobs, emails
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument('--pages', type=int, default=20)
+    ap.add_argument('--latency', type=float, default=0.2, help='stub LLM seconds per call')
+    args = ap.parse_args()
+    pages = [page_text(i) for i in range(args.pages)]
+    failed = False
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'llm.sqlite')
+        llm = StubLLM(latency=args.latency)
+        uncached, jobs, emails = run(Chain(llm), pages)
+        chain = Chain(llm, cache=LlmCache(path))
+        cold, _, _ = run(chain, pages)
+        warm, warm_jobs, warm_emails = run(chain, pages)
+        stats = chain.cache_stats()
+        calls = 2 * args.pages
+        print(f"{args.pages} pages, {calls} calls, stub latency {args.latency * 1000:.0f} ms")
+        print(f"  no cache   {uncached:7.2f} s")
+        print(f"  cold cache {cold:7.2f} s")
+        print(f"  warm cache {warm:7.3f} s   {warm / calls * 1e6:8.0f} us per call")
+        print(f"  hit rate {stats['hit_rate']:.0%}, latency saved {stats['latency_saved']:.2f} s, "
+              f"model calls {stats['llm_calls']}")
+        same = warm_jobs == jobs and warm_emails == emails
+        print(f"  cached replies identical: {same}")
+        failed = failed or not same or stats['llm_calls'] != calls
+        chain.cache.close()
+
+        # A new process (here: a new connection) starts warm
+        reopened = Chain(StubLLM(latency=args.latency), cache=LlmCache(path))
+        elapsed, _, _ = run(reopened, pages)
+        print(f"  reopened cache {elapsed:7.3f} s, model calls {reopened.cache_stats()['llm_calls']}")
+        failed = failed or reopened.cache_stats()['llm_calls'] != 0
+        reopened.cache.close()
+
+        expiring = Chain(StubLLM(), cache=LlmCache(os.path.join(tmp, 'ttl.sqlite'), ttl=0.2))
+        expiring.extract_jobs(pages[0])
+        time.sleep(0.3)
+        expiring.extract_jobs(pages[0])
+        print(f"  ttl: expired {expiring.cache.stats['expired']}, model calls {expiring.cache_stats()['llm_calls']}")
+        failed = failed or expiring.cache_stats()['llm_calls'] != 2
+
+        small = LlmCache(os.path.join(tmp, 'small.sqlite'), max_bytes=4000)
+        bounded = Chain(StubLLM(), cache=small)
+        for text in pages:
+            bounded.write_mail({'role': text}, [])
+        report = small.report()
+        print(f"  max_bytes 4000: {report['entries']} entries, {report['bytes']} bytes, "
+              f"{report['evictions']} evicted")
+        failed = failed or report['bytes'] > 4000
+
+        refusing = Chain(StubLLM(context_tokens=10), cache=LlmCache(os.path.join(tmp, 'refuse.sqlite')))
+        try:
+            refusing.extract_jobs(pages[0])
+        except ValueError as e:
+            print(f"  unparsable reply raised ({e}) and cached: {refusing.cache.report()['entries'] > 0}")
+            failed = failed or refusing.cache.report()['entries'] > 0
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+# bench_memory.py
+"""
+Portfolio row storage: resident memory and load time of the DataFrame +
+row-dict representation against PortfolioStore (from CSV and from a binary
+snapshot), and memory allocated per query by iterrows against the index.
+
+    python benchmarks/bench_memory.py [--rows 100000]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+VARIANTS = ('dataframe', 'store-csv', 'store-snapshot')
+
+
+def rss_bytes():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+def load(variant, path):
+    from portfolio_store import PortfolioStore
+    if variant == 'dataframe':
+        # What Portfolio held before: the DataFrame plus one result dict per row
+        import pandas as pd
+        data = pd.read_csv(path)
+        rows = [{"title": t, "links": l, "techstack": s, "description": d} for t, l, s, d in
+                zip(data["Title"].tolist(), data["Links"].tolist(), data["Techstack"].tolist(),
+                    data["Description"].tolist())]
+        return data, rows
+    if variant == 'store-csv':
+        return PortfolioStore.read(path)
+    return PortfolioStore.load(path)
+
+
+def measure(variant, path):
+    """
+    Run in a fresh interpreter: RSS growth and time of one load, then the
+    memory a second load retains and peaks at according to tracemalloc
+    """
+    # Imports are shared costs, keep them out of the deltas
+    import numpy  # noqa: F401
+    import portfolio_store  # noqa: F401
+    if variant != 'store-snapshot':
+        import pandas  # noqa: F401
+
+    before = rss_bytes()
+    start = time.perf_counter()
+    held = load(variant, path)
+    elapsed = time.perf_counter() - start
+    rss = rss_bytes() - before
+    del held
+
+    tracemalloc.start()
+    held = load(variant, path)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(rss, retained, peak, elapsed, 'pandas' in sys.modules)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument('--rows', type=int, default=100000)
+    ap.add_argument('--measure', nargs=2, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.measure:
+        measure(*args.measure)
+        return
+
+    from bench_portfolio import QUERY, legacy_query_links, synthetic_portfolio
+    from portfolio import Portfolio
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'portfolio.csv')
+        snapshot = os.path.join(tmp, 'portfolio.npz')
+        synthetic_portfolio(args.rows).to_csv(path, index=False)
+        portfolio = Portfolio(path)
+        portfolio.save_snapshot(snapshot)
+
+        print(f"{args.rows} rows loaded in a fresh process each")
+        for variant in VARIANTS:
+            source = snapshot if variant == 'store-snapshot' else path
+            out = subprocess.run([sys.executable, __file__, '--measure', variant, source],
+                                 capture_output=True, text=True, check=True).stdout.split()
+            rss, retained, peak = (int(v) / 2 ** 20 for v in out[:3])
+            elapsed, pandas = float(out[3]), out[4] == 'True'
+            print(f"  {variant:<15} rss +{rss:6.1f} MiB   retained {retained:6.1f} MiB   peak {peak:6.1f} MiB"
+                  f"   load {elapsed * 1000:5.0f} ms   pandas: {'yes' if pandas else 'no'}")
+
+        data = portfolio.data
+        print("memory allocated per query (tracemalloc peak)")
+        for name, query in (('iterrows', lambda: legacy_query_links(data, QUERY)),
+                            ('index', lambda: portfolio.query_links(QUERY))):
+            query()
+            tracemalloc.start()
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            query()
+            peak = tracemalloc.get_traced_memory()[1] - base
+            tracemalloc.stop()
+            print(f"  {name:<15} {peak / 1024:10.1f} KiB")
+
+
+if __name__ == '__main__':
+    main()
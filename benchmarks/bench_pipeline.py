@@ -0,0 +1,149 @@
+# bench_pipeline.py
+"""
+End-to-end batch run against a local fixture server: the app's one-job-at-a-
+time scrape -> query_links -> generate_email loop against pipeline.py, plus a
+run killed midway and resumed from its checkpoint.
+
+    python benchmarks/bench_pipeline.py [--jobs 300] [--latency 0.02] [--workers 4]
+"""
+import argparse
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+APP = os.path.join(HERE, '..', 'app')
+sys.path.append(APP)
+sys.path.append(HERE)
+
+from bench_templates import USER
+from email_generator import EmailGenerator
+from fixture_server import FixtureServer
+from pipeline import Pipeline
+from portfolio import Portfolio
+from scraper import SimpleScraper
+
+CORPUS = os.path.join(HERE, 'corpus')
+# Typical postings; the stress pages of the corpus are bench_scraper's concern
+PAGES = ('small.html', 'jsonld.html')
+
+
+def write_inputs(tmp, server, count):
+    """A JSONL of job URLs with a few manual records mixed in, plus the sender file"""
+    rng = random.Random(7)
+    jobs_path = os.path.join(tmp, 'jobs.jsonl')
+    with open(jobs_path, 'w', encoding='utf-8') as f:
+        for i in range(count):
+            if i % 10 == 9:
+                record = {'role': 'Data Analyst', 'skills': 'SQL, Python, Tableau', 'company': 'ShopStore'}
+            else:
+                record = {'url': f"{server.url}/jobs/{i}/{rng.choice(PAGES)}"}
+            f.write(json.dumps(record) + '\n')
+    user_path = os.path.join(tmp, 'user.json')
+    with open(user_path, 'w', encoding='utf-8') as f:
+        json.dump(USER, f)
+    return jobs_path, user_path
+
+
+def fixture_pages(count):
+    bodies = {}
+    for name in PAGES:
+        with open(os.path.join(CORPUS, name), 'rb') as f:
+            bodies[name] = f.read()
+    return {f"/jobs/{i}/{name}": body for i in range(count) for name, body in bodies.items()}
+
+
+def serial(jobs_path):
+    """What the Streamlit app does per click, once per job"""
+    scraper, portfolio, generator = SimpleScraper(), Portfolio(), EmailGenerator()
+    emails = 0
+    with open(jobs_path, encoding='utf-8') as f:
+        for line in f:
+            record = json.loads(line)
+            job = scraper.scrape_job_info(record['url']) if 'url' in record else record
+            generator.generate_email(job, portfolio.query_links(job.get('skills', '')), USER)
+            emails += 1
+    return emails
+
+
+def indices(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line)['index'] for line in f]
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument('--jobs', type=int, default=300)
+    ap.add_argument('--latency', type=float, default=0.02)
+    ap.add_argument('--workers', type=int, default=4)
+    ap.add_argument('--fetch-workers', type=int, default=16)
+    args = ap.parse_args()
+    n = args.jobs
+    failed = False
+
+    with FixtureServer(fixture_pages(n), latency=args.latency) as server, \
+            tempfile.TemporaryDirectory() as tmp:
+        jobs_path, user_path = write_inputs(tmp, server, n)
+        print(f"{n} jobs, {args.latency * 1000:.0f} ms simulated latency per page, {os.cpu_count()} CPUs")
+
+        start = time.perf_counter()
+        serial(jobs_path)
+        elapsed = time.perf_counter() - start
+        print(f"  serial app loop      {n / elapsed:8.1f} emails/s")
+
+        for workers in (0, args.workers):
+            output = os.path.join(tmp, f'emails-{workers}.jsonl')
+            pipeline = Pipeline(USER, fetch_workers=args.fetch_workers, process_workers=workers,
+                                per_host=args.fetch_workers, seed=1)
+            report = pipeline.run(jobs_path, output)
+            label = f"pipeline, {workers} procs" if workers else "pipeline, no pool"
+            print(f"  {label:<20} {report['emails_per_second']:8.1f} emails/s   "
+                  f"written {report.get('written', 0)}, failed {report.get('failed', 0)}")
+            for stage, numbers in report['stages'].items():
+                print(f"    {stage:<9} {numbers['items']:6d} items  {numbers['per_second']:9.1f}/s  "
+                      f"{numbers['per_busy_second']:9.1f}/busy s")
+            if sorted(indices(output)) != list(range(n)):
+                print("    output does not hold every job exactly once")
+                failed = True
+
+        # Kill a CLI run once it has checkpointed something, then resume it
+        output = os.path.join(tmp, 'resumed.jsonl')
+        command = [sys.executable, os.path.join(APP, 'pipeline.py'), jobs_path, output, '--user', user_path,
+                   '--workers', str(args.workers), '--fetch-workers', '2', '--per-host', '2', '--seed', '1']
+        # In a session of its own, so the kill takes the pool processes down too
+        process = subprocess.Popen(command, stderr=subprocess.DEVNULL, start_new_session=True)
+        checkpoint = output + '.checkpoint'
+        deadline = time.monotonic() + 60
+        while process.poll() is None and time.monotonic() < deadline:
+            if os.path.exists(checkpoint) and os.path.getsize(checkpoint) > 0:
+                break
+            time.sleep(0.05)
+        time.sleep(0.3)
+        os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+        before = len(indices(output))
+        subprocess.run(command, stderr=subprocess.DEVNULL)
+        after = indices(output)
+        resumed_ok = sorted(after) == list(range(n))
+        print(f"  killed after {before} emails, resumed to {len(after)}: "
+              f"{'every job exactly once' if resumed_ok else 'MISMATCH'}")
+        with open(os.path.join(tmp, f'emails-{args.workers}.jsonl'), encoding='utf-8') as f:
+            uninterrupted = sorted(f, key=lambda line: json.loads(line)['index'])
+        with open(output, encoding='utf-8') as f:
+            resumed = sorted(f, key=lambda line: json.loads(line)['index'])
+        # The email date line is the only thing a seeded run may change
+        same = [line.split('Date: ')[0] for line in uninterrupted] == [line.split('Date: ')[0] for line in resumed]
+        print(f"  resumed output matches an uninterrupted seeded run: {same}")
+        failed = failed or not resumed_ok or not same
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
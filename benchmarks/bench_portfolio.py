@@ -0,0 +1,102 @@
+# bench_portfolio.py
+"""
+Portfolio.query_links cost as the portfolio grows: the legacy iterrows +
+SequenceMatcher loop against the TF-IDF sparse dot product, then a bulk run
+of per-job query_links calls against one query_links_batch call.
+
+    python benchmarks/bench_portfolio.py [--repeat N] [--sizes 10000,100000] [--queries 5000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from difflib import SequenceMatcher
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+import pandas as pd
+from portfolio import Portfolio
+from skills import default_matcher
+
+QUERY = "Python, SQL, AWS, Docker, Kubernetes, React, Node.js, PostgreSQL"
+
+
+def synthetic_portfolio(rows, seed=7):
+    """rows portfolio entries, each with 3-8 skills drawn from the taxonomy"""
+    rng = random.Random(seed)
+    skills = list(default_matcher().canonical)
+    return pd.DataFrame({
+        "Title": [f"Project {i}" for i in range(rows)],
+        "Techstack": [", ".join(rng.sample(skills, rng.randint(3, 8))) for _ in range(rows)],
+        "Description": [f"Case study {i}" for i in range(rows)],
+        "Links": [f"https://example.com/project-{i}" for i in range(rows)]
+    })
+
+
+def synthetic_queries(count, seed=11):
+    rng = random.Random(seed)
+    skills = list(default_matcher().canonical)
+    return [", ".join(rng.sample(skills, rng.randint(2, 8))) for _ in range(count)]
+
+
+def legacy_query_links(data, skill_text, top_n=3):
+    """The original implementation, kept here for comparison"""
+    results = []
+    for _, row in data.iterrows():
+        techstack = str(row.get("Techstack", ""))
+        sim = SequenceMatcher(None, skill_text.lower(), techstack.lower()).ratio()
+        results.append({
+            "title": row.get("Title", techstack),
+            "links": row.get("Links", ""),
+            "techstack": techstack,
+            "description": row.get("Description", ""),
+            "similarity": sim
+        })
+    results = sorted(results, key=lambda x: x["similarity"], reverse=True)
+    return results[:top_n]
+
+
+def best_of(repeat, fn):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument('--repeat', type=int, default=3)
+    ap.add_argument('--sizes', default='10000,100000')
+    ap.add_argument('--queries', type=int, default=5000)
+    args = ap.parse_args()
+
+    print(f"query: {QUERY!r}, best of {args.repeat}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in (int(s) for s in args.sizes.split(',')):
+            data = synthetic_portfolio(rows)
+            path = os.path.join(tmp, f"portfolio_{rows}.csv")
+            data.to_csv(path, index=False)
+
+            start = time.perf_counter()
+            portfolio = Portfolio(path)
+            build = time.perf_counter() - start
+
+            legacy = best_of(args.repeat, lambda: legacy_query_links(portfolio.data, QUERY))
+            tfidf = best_of(args.repeat, lambda: portfolio.query_links(QUERY))
+            print(f"{rows:>7} rows   legacy {legacy * 1000:9.1f} ms   tf-idf {tfidf * 1000:7.2f} ms"
+                  f"   ({legacy / tfidf:,.0f}x, index build {build * 1000:.0f} ms)")
+
+        queries = synthetic_queries(args.queries)
+        print(f"\nbulk run: {len(queries)} queries against {rows} rows")
+        single = best_of(1, lambda: [portfolio.query_links(q) for q in queries])
+        batch = best_of(args.repeat, lambda: portfolio.query_links_batch(queries))
+        print(f"  query_links loop {single:7.2f} s   query_links_batch {batch:6.2f} s"
+              f"   ({len(queries) / batch:,.0f} queries/s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+# bench_reload.py
+"""
+Incremental portfolio reload against a full rebuild after a small edit, and
+query latency while a watched portfolio reloads in the background.
+
+    python benchmarks/bench_reload.py [--rows 100000] [--edits 0.01] [--mode tfidf|semantic]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+import pandas as pd
+from bench_portfolio import synthetic_portfolio, synthetic_queries
+from portfolio import Portfolio
+
+
+def edit(data, fraction, seed=3):
+    """Modify, delete and append fraction of the rows, a third each"""
+    rng = random.Random(seed)
+    count = max(3, int(len(data) * fraction)) // 3
+    data = data.copy()
+    modified = rng.sample(range(len(data)), count)
+    data.loc[modified, "Techstack"] = data.loc[modified, "Techstack"] + ", Rust"
+    data = data.drop(index=rng.sample(sorted(set(range(len(data))) - set(modified)), count))
+    added = synthetic_portfolio(count, seed=seed)
+    added["Links"] = [f"https://example.com/added-{i}" for i in range(count)]
+    return pd.concat([data, added], ignore_index=True)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument('--rows', type=int, default=100000)
+    ap.add_argument('--edits', type=float, default=0.01)
+    ap.add_argument('--mode', default='tfidf', choices=('tfidf', 'semantic'))
+    args = ap.parse_args()
+
+    queries = synthetic_queries(200)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'portfolio.csv')
+        options = {'mode': args.mode}
+        if args.mode == 'semantic':
+            options['index_dir'] = os.path.join(tmp, 'portfolio.index')
+        original = synthetic_portfolio(args.rows)
+        original.to_csv(path, index=False)
+        portfolio = Portfolio(path, watch_interval=0.0, **options)
+
+        edited = edit(original, args.edits)
+        edited.to_csv(path, index=False)
+        start = time.perf_counter()
+        portfolio.reload()
+        incremental = time.perf_counter() - start
+
+        start = time.perf_counter()
+        Portfolio(path, mode=args.mode)
+        full = time.perf_counter() - start
+        print(f"{args.rows} rows, {args.edits:.0%} edited ({args.mode})   "
+              f"incremental reload {incremental:6.2f} s   full rebuild {full:6.2f} s")
+
+        # Query continuously while a watched portfolio picks up another edit
+        latencies, stop = [], threading.Event()
+
+        def query_loop():
+            i = 0
+            while not stop.is_set():
+                start = time.perf_counter()
+                portfolio.query_links(queries[i % len(queries)])
+                latencies.append(time.perf_counter() - start)
+                i += 1
+
+        worker = threading.Thread(target=query_loop)
+        worker.start()
+        time.sleep(0.2)
+        reloads = portfolio.stats['reloads']
+        edit(edited, args.edits, seed=4).to_csv(path, index=False)
+        deadline = time.monotonic() + 120
+        while portfolio.stats['reloads'] == reloads and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.2)
+        stop.set()
+        worker.join()
+        latencies.sort()
+        print(f"during background reload: {len(latencies)} queries   "
+              f"p50 {latencies[len(latencies) // 2] * 1000:.2f} ms   p99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f} ms   "
+              f"max {latencies[-1] * 1000:.2f} ms")
+        print({key: value for key, value in portfolio.index_stats().items() if key.startswith(('rows', 'reload'))})
+
+
+if __name__ == '__main__':
+    main()
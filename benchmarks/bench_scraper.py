@@ -0,0 +1,167 @@
+# bench_scraper.py
+"""
+Per-stage scraper benchmark and performance regression check.
+
+Serves the pages in benchmarks/corpus/ from a local stand-in HTTP server,
+times every stage of scrape_job_info separately and compares the best of
+--repeat runs with benchmarks/baseline.json. Exits non-zero when any stage is more than
+--threshold slower than its baseline (and slower by at least --min-delta ms,
+so sub-millisecond stages do not flap on timer noise).
+
+Timings are compared in units of a fixed pure-Python calibration workload
+timed in the same process, interleaved with the page runs, so a slower or
+busier machine moves the stages and the unit together and the check
+tracks the code, not the hardware. --min-delta is scaled the same way.
+
+    python benchmarks/bench_scraper.py                   # check against baseline
+    python benchmarks/bench_scraper.py --update-baseline # record a new baseline
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(HERE, '..', 'app'))
+sys.path.append(HERE)
+
+from bs4 import BeautifulSoup
+from extraction import PageIndex
+from fixture_server import FixtureServer
+from scraper import SimpleScraper
+from structured_data import find_job_posting, is_data_script
+
+CORPUS_DIR = os.path.join(HERE, 'corpus')
+BASELINE_PATH = os.path.join(HERE, 'baseline.json')
+
+
+def load_corpus():
+    pages = {}
+    for name in sorted(os.listdir(CORPUS_DIR)):
+        if name.endswith('.html'):
+            with open(os.path.join(CORPUS_DIR, name), 'rb') as f:
+                pages['/' + name] = f.read()
+    return pages
+
+
+def calibrate():
+    """Seconds one round of a fixed workload of string, dict, regex and sort operations takes"""
+    words = [f"skill{i % 251} years{i % 7}" for i in range(20000)]
+    start = time.perf_counter()
+    counts = {}
+    for word in " ".join(words).split():
+        counts[word] = counts.get(word, 0) + 1
+    re.findall(r'\w+ years\d', " ".join(words))
+    sorted(words, key=str.lower)
+    return time.perf_counter() - start
+
+
+def time_stages(scraper, url):
+    """One scrape_job_info run split into its stages; returns {stage: seconds}"""
+    timings = {}
+
+    def stage(name, fn, *args):
+        start = time.perf_counter()
+        value = fn(*args)
+        timings[name] = time.perf_counter() - start
+        return value
+
+    # stop_early=False so the heuristic stages see the full page
+    response, body = stage('fetch', scraper.fetch_html, url, 10, None, False)
+    encoding = scraper._declared_charset(response)
+    soup = stage('parse', lambda: BeautifulSoup(body, scraper.parser, from_encoding=encoding))
+
+    def decompose():
+        payloads = []
+        for element in soup(['script', 'style', 'nav', 'footer', 'header']):
+            if element.name == 'script' and is_data_script(element):
+                payloads.append(element.string)
+            element.decompose()
+        return payloads
+
+    payloads = stage('decompose', decompose)
+    stage('structured', find_job_posting, payloads)
+    page = stage('index', PageIndex, soup)
+    stage('_extract_role', scraper._extract_role, page, url)
+    stage('_extract_experience', scraper._extract_experience, page.text)
+    stage('_extract_skills', scraper._extract_skills, page)
+    stage('_extract_description', scraper._extract_description, page)
+    return timings
+
+
+def measure(repeat):
+    """
+    (unit, results): the best calibration round in seconds and, per page
+    and stage, the best of repeat runs. Each round times the calibration
+    workload and then every page, so all of them see the same load.
+    """
+    scraper = SimpleScraper()
+    units = []
+    runs = {}
+    with FixtureServer(load_corpus()) as server:
+        for _ in range(repeat):
+            units.append(min(calibrate() for _ in range(3)))
+            for path in sorted(server.pages):
+                runs.setdefault(path.lstrip('/'), []).append(time_stages(scraper, server.url + path))
+    results = {
+        page: {stage: min(run[stage] for run in page_runs) for stage in page_runs[0]}
+        for page, page_runs in runs.items()
+    }
+    return min(units), results
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument('--repeat', type=int, default=7)
+    ap.add_argument('--threshold', type=float, default=0.5,
+                    help='allowed slowdown as a fraction of the baseline (default 0.5 = 50%%)')
+    ap.add_argument('--min-delta', type=float, default=2.0,
+                    help='ignore slowdowns smaller than this many milliseconds (at the baseline\'s speed)')
+    ap.add_argument('--update-baseline', action='store_true')
+    args = ap.parse_args()
+
+    unit, current = measure(args.repeat)
+    if args.update_baseline:
+        with open(BASELINE_PATH, 'w') as f:
+            json.dump({
+                'unit_seconds': unit,
+                'pages': {page: {stage: seconds / unit for stage, seconds in stages.items()}
+                          for page, stages in current.items()}
+            }, f, indent=2, sort_keys=True)
+        print(f"baseline written to {BASELINE_PATH}")
+
+    baseline, scale = {}, 1.0
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as f:
+            recorded = json.load(f)
+        baseline = recorded.get('pages', {})
+        scale = unit / recorded['unit_seconds'] if recorded.get('unit_seconds') else 1.0
+    min_delta = args.min_delta * scale
+
+    print(f"calibration unit {unit * 1000:.2f} ms (x{scale:.2f} the baseline's); baselines below are scaled to it")
+    regressions = []
+    for page, stages in current.items():
+        print(f"\n{page}")
+        for stage, seconds in stages.items():
+            units = baseline.get(page, {}).get(stage)
+            note = ""
+            if units is not None:
+                base = units * unit
+                ratio = seconds / base if base else float('inf')
+                note = f"  baseline {base * 1000:8.2f} ms  x{ratio:5.2f}"
+                if seconds > base * (1 + args.threshold) and (seconds - base) * 1000 > min_delta:
+                    regressions.append((page, stage, base, seconds))
+                    note += "  REGRESSION"
+            print(f"  {stage:22s} {seconds * 1000:8.2f} ms{note}")
+
+    if regressions:
+        print(f"\n{len(regressions)} stage(s) slower than baseline by more than {args.threshold:.0%}:")
+        for page, stage, base, seconds in regressions:
+            print(f"  {page} {stage}: {base * 1000:.2f} ms -> {seconds * 1000:.2f} ms")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+# bench_semantic.py
+"""
+Semantic portfolio retrieval: cold start of a saved, memory-mapped vector
+index against rebuilding it, and exact against IVF query latency and recall.
+
+    python benchmarks/bench_semantic.py [--rows 100000] [--queries 200] [--nprobe N]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+from bench_portfolio import synthetic_portfolio, synthetic_queries
+from portfolio import Portfolio
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument('--rows', type=int, default=100000)
+    ap.add_argument('--queries', type=int, default=200)
+    ap.add_argument('--top', type=int, default=10)
+    ap.add_argument('--nprobe', type=int, default=None, help='IVF lists to probe (default: a third of them)')
+    args = ap.parse_args()
+
+    queries = synthetic_queries(args.queries)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'portfolio.csv')
+        index_dir = os.path.join(tmp, 'portfolio.index')
+        synthetic_portfolio(args.rows).to_csv(path, index=False)
+
+        _, build = timed(lambda: Portfolio(path, mode='semantic', index_dir=index_dir))
+        portfolio, cold = timed(lambda: Portfolio(path, mode='semantic', index_dir=index_dir, nprobe=args.nprobe))
+        print(f"{args.rows} rows   build + save {build:6.2f} s   cold start from index {cold * 1000:6.2f} ms")
+
+        embedder, index = portfolio.embedder, portfolio._index
+        vectors = embedder.embed(queries)
+        latency = {}
+        hits = {}
+        for exact in (True, False):
+            best = float('inf')
+            found = []
+            for vector in vectors:
+                result, elapsed = timed(lambda: index.search(vector, args.top, exact=exact, nprobe=args.nprobe))
+                best = min(best, elapsed)
+                found.append({row_id for row_id, _ in result})
+            latency[exact], hits[exact] = best, found
+        recall = sum(len(a & e) for a, e in zip(hits[False], hits[True])) / sum(len(e) for e in hits[True])
+        print(f"top-{args.top} search   exact {latency[True] * 1000:6.3f} ms   "
+              f"ivf (nprobe={args.nprobe or 'default'}) {latency[False] * 1000:6.3f} ms   recall@{args.top} {recall:.2f}")
+
+        _, per_query = timed(lambda: portfolio.query_links_batch(queries, args.top))
+        print(f"query_links_batch incl. embedding and rows: {per_query / len(queries) * 1000:.3f} ms/query")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+# bench_skills.py
+"""
+Skill matching cost as the taxonomy grows: the legacy per-keyword substring
+scan against the compiled token-trie SkillMatcher, over the same page text.
+
+    python benchmarks/bench_skills.py [--repeat N] [--sizes 100,1000,10000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+from skills import SkillMatcher, default_matcher
+
+WORDS = ['platform', 'engine', 'studio', 'cloud', 'stack', 'kit', 'flow', 'db', 'ops', 'lab']
+
+
+def synthetic_taxonomy(size, seed=7):
+    """The bundled skills padded with made-up tool names up to size entries"""
+    rng = random.Random(seed)
+    base = list(default_matcher().canonical)
+    entries = [(skill, (), ()) for skill in base[:size]]
+    i = 0
+    while len(entries) < size:
+        name = f"{rng.choice(WORDS)}{i} {rng.choice(WORDS)}"
+        entries.append((name, (f"{name.replace(' ', '-')}",), ()))
+        i += 1
+    return entries
+
+
+def page_text(kib=100):
+    sentence = ("We are hiring engineers with Python, SQL and AWS experience who maintain "
+                "Kubernetes clusters, build React front ends and mentor teammates through code review. ")
+    return sentence * (kib * 1024 // len(sentence))
+
+
+def best_of(repeat, fn):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument('--repeat', type=int, default=3)
+    ap.add_argument('--sizes', default='100,1000,10000,100000')
+    args = ap.parse_args()
+
+    text = page_text()
+    lowered = text.lower()
+    print(f"page text: {len(text) / 1024:.0f} KiB, best of {args.repeat}")
+    for size in (int(s) for s in args.sizes.split(',')):
+        entries = synthetic_taxonomy(size)
+        matcher = SkillMatcher(entries)
+        keywords = [skill for skill, _, _ in entries]
+        legacy = best_of(args.repeat, lambda: [k for k in keywords if k in lowered])
+        trie = best_of(args.repeat, lambda: matcher.rank(text))
+        print(f"{size:>7} skills   legacy scan {legacy * 1000:9.1f} ms   trie {trie * 1000:7.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
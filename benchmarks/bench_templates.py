@@ -0,0 +1,127 @@
+# bench_templates.py
+"""
+Email rendering throughput: the previous generate_email (nested dict literal
+per instance, str.format parsing on every call) against compiled template
+packs, plus the cost of creating an EmailGenerator.
+
+    python benchmarks/bench_templates.py [--emails 20000] [--repeat 3]
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.append(os.path.join(ROOT, 'app'))
+
+from email_generator import EmailGenerator
+from template_pack import DEFAULT_PACK
+
+USER = {'name': 'Alex Doe', 'role': 'Software Engineer', 'company': 'Acme', 'email': 'alex@example.com',
+        'phone': '+1 555 0100', 'linkedin': 'https://linkedin.com/in/alexdoe'}
+LINKS = [{'links': 'https://example.com/portfolio-python'}, {'links': 'https://example.com/portfolio-data'}]
+
+
+def jobs(count, seed=3):
+    rng = random.Random(seed)
+    roles = ['Senior Software Engineer', 'Data Analyst', 'Director of Sales', 'Backend Developer', 'Product Manager']
+    companies = ['DataTech', 'First Capital Bank', 'HealthCare Plus', 'ShopStore', 'Globex']
+    return [{
+        'role': rng.choice(roles),
+        'company': rng.choice(companies),
+        'experience': rng.choice(['', '2+ years', '5 years', '10+ years']),
+        'skills': 'Python, SQL, AWS, Docker',
+        'description': 'Build and run data services for our customers. ' * rng.randint(0, 6)
+    } for _ in range(count)]
+
+
+def legacy_generator():
+    """The EmailGenerator from before template packs, out of git history when available"""
+    def git(*args):
+        return subprocess.run(['git', *args], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+
+    try:
+        # Newest first: the parent of the commit that removed the dict literal
+        changed = git('log', '--format=%H', '-S', 'def _load_templates', '--', 'app/email_generator.py').split()
+        for rev in ['HEAD'] + [f'{commit}^' for commit in changed]:
+            source = git('show', f'{rev}:app/email_generator.py')
+            if 'def _load_templates' in source:
+                break
+        else:
+            return None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    namespace = {}
+    exec(compile(source, 'legacy_email_generator.py', 'exec'), namespace)
+    return namespace['EmailGenerator']
+
+
+def best_of(repeat, fn):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def render_all(generator, batch):
+    random.seed(0)
+    return [generator.generate_email(job, LINKS, USER) for job in batch]
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument('--emails', type=int, default=20000)
+    ap.add_argument('--repeat', type=int, default=3)
+    args = ap.parse_args()
+
+    batch = jobs(args.emails)
+    legacy = legacy_generator()
+    candidates = [('compiled pack', EmailGenerator)]
+    if legacy is not None:
+        candidates.insert(0, ('legacy format()', legacy))
+    else:
+        print("legacy generator not found in git history, skipping it")
+
+    print(f"{args.emails} emails, best of {args.repeat}")
+    outputs = {}
+    for name, cls in candidates:
+        created = best_of(args.repeat, lambda: [cls() for _ in range(1000)]) / 1000
+        generator = cls()
+        elapsed = best_of(args.repeat, lambda: render_all(generator, batch))
+        outputs[name] = render_all(generator, batch)
+        print(f"  {name:<16} {args.emails / elapsed:10.0f} emails/s   new instance {created * 1e6:7.1f} us")
+    if len(outputs) == 2:
+        print(f"  identical output: {outputs['legacy format()'] == outputs['compiled pack']}")
+
+    # Placeholder rendering alone: str.format against the pre-split templates
+    with open(DEFAULT_PACK, encoding='utf-8') as f:
+        texts = [t for section in json.load(f)['executive'].values() for t in section]
+    generator = EmailGenerator()
+    compiled = [t for section in generator.templates.levels['executive'].values() for t in section]
+    values = {'role': 'Engineer', 'company': 'Acme', 'industry': 'technology', 'value': 'innovation',
+              'skills': 'Python, SQL', 'experience': '5 years', 'links': 'https://example.com'}
+    n = 20000
+    fmt = best_of(args.repeat, lambda: [t.format(**values) for _ in range(n) for t in texts])
+    seg = best_of(args.repeat, lambda: [t.render(values) for _ in range(n) for t in compiled])
+    per = n * len(texts)
+    print(f"  {per} template renders   str.format {per / fmt / 1e6:5.2f} M/s   pre-split {per / seg / 1e6:5.2f} M/s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'pack.json')
+        with open(DEFAULT_PACK, encoding='utf-8') as src, open(path, 'w', encoding='utf-8') as dst:
+            dst.write(src.read())
+        generator = EmailGenerator(path, watch_interval=0)
+        os.utime(path, ns=(0, 0))
+        start = time.perf_counter()
+        generator.generate_email(batch[0], LINKS, USER)
+        print(f"  first email after a pack edit (hot reload included) {(time.perf_counter() - start) * 1000:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
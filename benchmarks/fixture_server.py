@@ -0,0 +1,72 @@
+# fixture_server.py
+"""
+Local stand-in HTTP server for the benchmarks. Serves an in-memory mapping
+of path -> body (str/bytes, or a (status, headers, body) tuple) from a
+background thread, with optional per-request latency to mimic real hosts.
+"""
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients that stop reading early (size caps, deadlines) reset the
+        # connection; that is expected here and not worth a traceback
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class FixtureServer:
+    def __init__(self, pages, latency=0.0):
+        self.pages = pages
+        self.latency = latency
+        self.hits = {}
+        self._lock = threading.Lock()
+        fixture = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body go out in separate writes; without this the
+            # delayed-ACK / Nagle interaction adds ~40 ms to small responses
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                with fixture._lock:
+                    fixture.hits[self.path] = fixture.hits.get(self.path, 0) + 1
+                if fixture.latency:
+                    time.sleep(fixture.latency)
+                page = fixture.pages.get(self.path)
+                if page is None:
+                    status, headers, body = 404, {}, b'not found'
+                elif isinstance(page, tuple):
+                    status, headers, body = page
+                else:
+                    status, headers, body = 200, {}, page
+                if isinstance(body, str):
+                    body = body.encode('utf-8')
+                self.send_response(status)
+                if 'Content-Type' not in headers:
+                    self.send_header('Content-Type', 'text/html; charset=utf-8')
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = _QuietServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def __enter__(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,103 @@
+# smtp_sink.py
+"""
+Local stand-in SMTP server for the benchmarks. Accepts every message into an
+in-memory list from a background thread (one thread per connection), with
+optional per-reply latency to mimic a remote server and optional failure
+injection: recipients whose address starts with "temp-fail" get a 451 on
+their first attempt, and those starting with "reject" a 550.
+"""
+import socketserver
+import threading
+import time
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    # Room for every pooled client connecting at once
+    request_queue_size = 128
+
+
+class SmtpSink:
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.messages = []
+        self.connections = 0
+        self.commands = 0
+        self._attempts = {}
+        self._lock = threading.Lock()
+        sink = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            # Replies are small writes; without this Nagle's algorithm holds
+            # them back until the client's delayed ACK
+            disable_nagle_algorithm = True
+
+            def reply(self, line):
+                if sink.latency:
+                    time.sleep(sink.latency)
+                self.wfile.write(line.encode('ascii') + b'\r\n')
+
+            def handle(self):
+                with sink._lock:
+                    sink.connections += 1
+                self.reply('220 sink ESMTP ready')
+                sender, recipients = None, []
+                while True:
+                    line = self.rfile.readline()
+                    if not line:
+                        return
+                    command = line.decode('utf-8', 'replace').strip()
+                    verb = command[:4].upper()
+                    with sink._lock:
+                        sink.commands += 1
+                    if verb == 'EHLO':
+                        self.wfile.write(b'250-sink\r\n250-8BITMIME\r\n250-SIZE 10485760\r\n')
+                        self.reply('250 SMTPUTF8')
+                    elif verb == 'HELO':
+                        self.reply('250 sink')
+                    elif verb == 'MAIL':
+                        sender, recipients = command[10:].split(' ')[0].strip('<>'), []
+                        self.reply('250 OK')
+                    elif verb == 'RCPT':
+                        address = command[8:].split(' ')[0].strip('<>')
+                        with sink._lock:
+                            attempt = sink._attempts[address] = sink._attempts.get(address, 0) + 1
+                        if address.startswith('reject'):
+                            self.reply('550 No such user')
+                        elif address.startswith('temp-fail') and attempt == 1:
+                            self.reply('451 Try again later')
+                        else:
+                            recipients.append(address)
+                            self.reply('250 OK')
+                    elif verb == 'DATA':
+                        self.reply('354 End data with <CR><LF>.<CR><LF>')
+                        data = bytearray()
+                        for line in self.rfile:
+                            if line == b'.\r\n':
+                                break
+                            data.extend(line[1:] if line.startswith(b'..') else line)
+                        with sink._lock:
+                            sink.messages.append((sender, recipients, bytes(data)))
+                        self.reply('250 OK queued')
+                    elif verb == 'RSET':
+                        sender, recipients = None, []
+                        self.reply('250 OK')
+                    elif verb == 'NOOP':
+                        self.reply('250 OK')
+                    elif verb == 'QUIT':
+                        self.reply('221 Bye')
+                        return
+                    else:
+                        self.reply('502 Command not implemented')
+
+        self.server = _Server(('127.0.0.1', 0), Handler)
+        self.host, self.port = self.server.server_address
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
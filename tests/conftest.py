@@ -0,0 +1,8 @@
+# conftest.py
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# The app modules import each other as top-level modules, and the tests
+# reuse the benchmarks' local fixture servers
+sys.path[:0] = [os.path.join(ROOT, 'app'), os.path.join(ROOT, 'benchmarks')]
@@ -0,0 +1,36 @@
+# test_classifier.py
+import json
+import os
+
+from classifier import JobClassifier
+
+GOLDEN_PATH = os.path.join(os.path.dirname(__file__), '..', 'benchmarks', 'classification_golden.json')
+
+
+def golden():
+    with open(GOLDEN_PATH, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_classify_matches_golden_labels():
+    classifier = JobClassifier()
+    for record in golden():
+        job = record['job']
+        result = classifier.classify(job['role'], job['skills'], job['company'], job['experience'],
+                                     job['experience_years'])
+        expected = {key: record[key] for key in result._fields}
+        assert result._asdict() == expected, job
+
+
+def test_classify_many_matches_classify():
+    records = golden()
+    classifier = JobClassifier()
+    results = classifier.classify_many([record['job'] for record in records])
+    assert [tuple(result) for result in results] == [
+        (record['level'], record['technical'], record['industry'], record['template']) for record in records]
+
+
+def test_it_keyword_is_case_sensitive():
+    classifier = JobClassifier()
+    assert classifier.is_technical('IT Support Specialist', '')
+    assert not classifier.is_technical('Sales Manager', 'edit it, submit it')
@@ -0,0 +1,54 @@
+# test_delivery.py
+import smtplib
+import socket
+import threading
+
+from delivery import Mailer, SmtpPool, is_transient
+from smtp_sink import SmtpSink
+
+
+def test_more_workers_than_connections_with_retirement():
+    # Every connection retires after one message, so waiting workers must be
+    # woken to open the next one rather than block for an idle connection
+    with SmtpSink() as sink:
+        pool = SmtpPool(sink.host, sink.port, size=1, max_per_connection=1, local_hostname='localhost')
+        mailer = Mailer(pool, 'Alex Doe <alex@example.com>')
+        messages = [(f'user{i}@example.com', 'Subject: Hello\n\nBody') for i in range(6)]
+        reports = []
+        thread = threading.Thread(target=lambda: reports.append(mailer.deliver(messages, workers=3)), daemon=True)
+        thread.start()
+        thread.join(10)
+        pool.close()
+        assert not thread.is_alive(), 'deliver() hung'
+        assert reports[0]['sent'] == 6
+        assert len(sink.messages) == 6
+        assert pool.stats['connections_opened'] == 6
+
+
+def test_broken_connections_free_their_slot():
+    with SmtpSink() as sink:
+        pool = SmtpPool(sink.host, sink.port, size=2, local_hostname='localhost')
+        first, second = pool.acquire(), pool.acquire()
+        acquired = []
+        waiter = threading.Thread(target=lambda: acquired.append(pool.acquire()), daemon=True)
+        waiter.start()
+        pool.release(first, discard=True)
+        waiter.join(5)
+        assert acquired, 'a discarded connection did not wake the waiting thread'
+        pool.release(second)
+        pool.release(acquired[0])
+        pool.close()
+
+
+def test_is_transient():
+    assert is_transient(smtplib.SMTPResponseException(451, b'Try again later'))
+    assert not is_transient(smtplib.SMTPResponseException(550, b'No such user'))
+    assert is_transient(smtplib.SMTPRecipientsRefused({'a@example.com': (452, b'Mailbox full')}))
+    assert not is_transient(smtplib.SMTPRecipientsRefused({'a@example.com': (550, b'No such user')}))
+    assert is_transient(smtplib.SMTPServerDisconnected('Connection unexpectedly closed'))
+    assert is_transient(ConnectionRefusedError())
+    assert is_transient(socket.timeout('timed out'))
+    # Every SMTPException is an OSError, but these are not worth retrying
+    assert not is_transient(smtplib.SMTPNotSupportedError('STARTTLS extension not supported by server.'))
+    assert not is_transient(smtplib.SMTPAuthenticationError(535, b'Authentication failed'))
+    assert not is_transient(smtplib.SMTPException('No suitable authentication method found.'))
@@ -0,0 +1,39 @@
+# test_pipeline.py
+from classifier import default_classifier
+from pipeline import _Worker
+
+PAGE = b'''<html><head><title>Data Analyst - Acme</title></head><body><h1>Data Analyst</h1>
+<p>Requirements: 2 years of experience with SQL and Python.</p></body></html>'''
+
+OPTIONS = {
+    'portfolio_path': None,
+    'portfolio_mode': 'tfidf',
+    'template_path': None,
+    'user_info': {'name': 'Alex Doe', 'role': 'Consultant', 'company': 'Example', 'email': 'alex@example.com',
+                  'phone': '', 'linkedin': ''},
+    'seed': 1,
+    'top_n': 3,
+    'scraper': {'parser': None, 'skill_matcher': None}
+}
+
+
+def process(record):
+    results, _ = _Worker(OPTIONS).process([(0, record, PAGE, None, None)])
+    (index, job, email, error), = results
+    assert error is None and email
+    return job
+
+
+def test_manual_experience_overrides_scraped_years():
+    scraped = process({'url': 'https://acme.example/jobs/1'})
+    assert scraped['experience_years'] == [2, 2]
+
+    job = process({'url': 'https://acme.example/jobs/1', 'experience': '10 years'})
+    assert job['experience'] == '10 years'
+    assert job['experience_years'] == [10, 10]
+    assert default_classifier().role_level(job['role'], job['experience'], job['experience_years']) == 'executive'
+
+
+def test_manual_experience_without_years_falls_back_to_the_text():
+    job = process({'url': 'https://acme.example/jobs/1', 'experience': 'senior'})
+    assert job['experience_years'] is None